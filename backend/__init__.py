@@ -5,7 +5,18 @@ A Flask backend for serving sports calendar ICS files.
 
 __version__ = "1.0.0"
 
-from .onefc_calendar import OneFcCalendar
-from .ufc_calendar import UfcCalendar
-
 __all__ = ["OneFcCalendar", "UfcCalendar"]
+
+
+def __getattr__(name: str):
+    # Imported on first use, so parse pool processes that only need
+    # backend.extraction do not build the calendars' shared state.
+    if name == "OneFcCalendar":
+        from .onefc_calendar import OneFcCalendar
+
+        return OneFcCalendar
+    if name == "UfcCalendar":
+        from .ufc_calendar import UfcCalendar
+
+        return UfcCalendar
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,15 +1,47 @@
-# pylint: disable=missing-timeout,logging-fstring-interpolation,missing-module-docstring
+# pylint: disable=logging-fstring-interpolation,missing-module-docstring,import-outside-toplevel
+from __future__ import annotations
+
 import logging
+import shutil
 import sys
+import threading
+import time
 from abc import ABCMeta, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, Callable, Iterator, TypeVar
 
 import pytz
-from ics import Calendar, Event
 import os
 import json
+import re
+
+from backend.event_store import EventStore
+from backend.fetcher import global_fetch_engine
+from backend.fingerprints import FingerprintStore
+from backend.http_client import global_http_client
+from backend.locks import FileLock
+from backend.page_cache import CachedPage, PageCache
+from backend.metrics import global_metrics
+from backend.parse_pool import global_parse_pool
+from backend.planner import global_refresh_planner
+from backend.parsing import HtmlParser, PageRegions, global_html_parser
+from backend.rendering import FragmentCache, RenderedCalendar, render_fragments
+from backend.repository import global_repository
+from backend.stats import StatsEngine
+from backend.views import CalendarQuery, CalendarViews
+
+if TYPE_CHECKING:
+    # bs4 and ics are imported on first use so startup stays fast
+    from bs4 import BeautifulSoup
+    from ics import Calendar, Event
+
+R = TypeVar("R")
+
+# UID lines of an unfolded ICS calendar
+UID_LINE = re.compile(r"^UID:(.*?)\r?$", re.MULTILINE)
 
 logging.basicConfig(
     stream=sys.stdout,
@@ -19,66 +51,23 @@ logging.basicConfig(
 
 
 class CacheManager:
+    """Cache status, scraping stats and cached pages of the backend.
+
+    Files are kept in ``data`` under the working directory, or in the
+    directory named by the ``CALENDAR_DATA_DIR`` environment variable.
+    """
+
     def __init__(self):
-        self.data_dir = Path("data")
-        self.data_dir.mkdir(exist_ok=True)
+        self.data_dir = Path(os.getenv("CALENDAR_DATA_DIR", "data"))
+        self.data_dir.mkdir(parents=True, exist_ok=True)
         self.cache_file = self.data_dir / "cache_info.json"
         self.stats_file = self.data_dir / "scraping_stats.json"
+        self.stats_lock_file = self.data_dir / "scraping_stats.lock"
+        self.stats = StatsEngine(self.stats_file, self.stats_lock_file)
+        self._cache_info: Dict[str, Any] = self._read_cache_info()
+        self.pages_dir = self.data_dir / "http_cache"
 
-    # ---- stats helpers (per-service) ----
-    def _default_service_stats(self) -> Dict[str, Any]:
-        return {
-            "daily_results": {},
-            "success_rate_30d": 0,
-            "total_attempts_30d": 0,
-            "total_success_30d": 0,
-            "daily_success_array": [],
-            "last_update": None,
-            "last_events_count": 0,
-        }
-
-    def _load_all_stats(self) -> Dict[str, Any]:
-        """Load stats file and normalize to { services: { ufc|onefc|backend: ... } }"""
-        if self.stats_file.exists():
-            try:
-                with open(self.stats_file, 'r') as f:
-                    data = json.load(f)
-                # Normalize legacy flat shape
-                if "services" not in data:
-                    legacy = {
-                        "daily_results": data.get("daily_results", {}),
-                        "success_rate_30d": data.get("success_rate_30d", 0),
-                        "total_attempts_30d": data.get("total_attempts_30d", 0),
-                        "total_success_30d": data.get("total_success_30d", 0),
-                        "daily_success_array": data.get("daily_success_array", []),
-                        "last_update": data.get("last_update"),
-                        "last_events_count": data.get("last_events_count", 0),
-                    }
-                    data = {"services": {"backend": {**self._default_service_stats(), **legacy}}}
-                # Ensure all known services exist
-                services = data.get("services", {})
-                for key in ("ufc", "onefc", "backend"):
-                    if key not in services:
-                        services[key] = self._default_service_stats()
-                data["services"] = services
-                return data
-            except Exception:
-                pass
-        # Default fresh structure
-        return {
-            "services": {
-                "ufc": self._default_service_stats(),
-                "onefc": self._default_service_stats(),
-                "backend": self._default_service_stats(),
-            }
-        }
-
-    def _save_all_stats(self, data: Dict[str, Any]) -> None:
-        with open(self.stats_file, 'w') as f:
-            json.dump(data, f)
-        
-    def get_cache_info(self):
-        """Get cache information for monitoring"""
+    def _read_cache_info(self) -> Dict[str, Any]:
         if self.cache_file.exists():
             try:
                 with open(self.cache_file, 'r') as f:
@@ -86,7 +75,11 @@ class CacheManager:
             except:
                 pass
         return {"last_update": None, "status": "no_cache"}
-    
+
+    def get_cache_info(self):
+        """Get cache information for monitoring, from memory"""
+        return self._cache_info
+
     def update_cache_info(self, status="success", error=None):
         """Update cache information"""
         cache_info = {
@@ -96,64 +89,36 @@ class CacheManager:
         }
         with open(self.cache_file, 'w') as f:
             json.dump(cache_info, f)
-        
+        self._cache_info = cache_info
+
         # Update backend heartbeat in stats
         try:
             self.update_service_stats("backend", status == "success")
         except Exception:
             pass
-    
+
     def update_scraping_stats(self, success: bool):
         """Legacy method: update backend service stats."""
         self.update_service_stats("backend", success)
 
-    def update_service_stats(self, service: str, success: bool, events_count: int | None = None) -> None:
-        """Update 30-day stats for a given service (ufc, onefc, backend)."""
-        data = self._load_all_stats()
-        stats = data["services"].get(service, self._default_service_stats())
-
-        today = datetime.now().strftime("%Y-%m-%d")
-        if today not in stats["daily_results"]:
-            stats["daily_results"][today] = {"success": 0, "failed": 0}
-        if success:
-            stats["daily_results"][today]["success"] += 1
-        else:
-            stats["daily_results"][today]["failed"] += 1
-
-        # Trim >30 days
-        cutoff = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
-        stats["daily_results"] = {d: v for d, v in stats["daily_results"].items() if d >= cutoff}
-
-        # Recompute aggregates
-        total_attempts = sum(v["success"] + v["failed"] for v in stats["daily_results"].values())
-        total_success = sum(v["success"] for v in stats["daily_results"].values())
-        stats["success_rate_30d"] = (total_success / total_attempts * 100) if total_attempts else 0
-        stats["total_attempts_30d"] = total_attempts
-        stats["total_success_30d"] = total_success
-
-        # Rebuild daily_success_array
-        daily = []
-        for i in range(30):
-            date = (datetime.now() - timedelta(days=29 - i)).strftime("%Y-%m-%d")
-            if date in stats["daily_results"]:
-                dr = stats["daily_results"][date]
-                success_day = dr["success"] > dr["failed"]
-            else:
-                success_day = False
-            daily.append({"date": date, "success": success_day})
-        stats["daily_success_array"] = daily
+    def update_service_stats(
+        self,
+        service: str,
+        success: bool,
+        events_count: int | None = None,
+        extra: Dict[str, Any] | None = None,
+    ) -> None:
+        """Update 30-day stats for a given service (ufc, onefc, backend).
 
-        stats["last_update"] = datetime.now().isoformat()
-        if events_count is not None:
-            stats["last_events_count"] = events_count
+        ``extra`` holds per-refresh counters that are stored on the service as-is.
+        The update is counted in memory; ``stats`` flushes it to disk in batches.
+        """
+        self.stats.record(service, success, events_count=events_count, extra=extra)
 
-        data["services"][service] = stats
-        self._save_all_stats(data)
-    
     def get_scraping_stats(self) -> Dict[str, Any]:
         """Return stats for all services."""
-        return self._load_all_stats()
-    
+        return self.stats.snapshot()
+
     def is_cache_fresh(self, max_age_hours=24):
         """Check if cache is fresh enough"""
         cache_info = self.get_cache_info()
@@ -169,29 +134,107 @@ class CacheManager:
             file.unlink()
         if self.cache_file.exists():
             self.cache_file.unlink()
-        if self.stats_file.exists():
-            self.stats_file.unlink()
+        self._cache_info = self._read_cache_info()
+        self.stats.reset()
+        shutil.rmtree(self.pages_dir, ignore_errors=True)
 
 
-# Shared global instance
+# Shared global instances
 global_cache_manager = CacheManager()
+global_page_cache = PageCache(global_cache_manager.pages_dir)
 
 
 class CalendarControl(metaclass=ABCMeta):
     UTC = pytz.utc
     PST = pytz.timezone("US/Pacific")
+    calendar_file_name: str = ""
+    refresh_interval = timedelta(hours=24)
+    retention = timedelta(days=int(os.getenv("CALENDAR_RETENTION_DAYS", 180)))
+    fetch_engine = global_fetch_engine
+    http_client = global_http_client
+    page_cache = global_page_cache
+    repository = global_repository
+    html_parser = global_html_parser
+    parse_pool = global_parse_pool
+    planner = global_refresh_planner
+    metrics = global_metrics
+    # Subtrees of the event pages read by the scrapers; None parses everything.
+    document_regions: PageRegions | None = None
 
     def __init__(self) -> None:
-        self.event_calendar = Calendar()
+        self._event_calendar: Calendar | None = None
+        self._event_store: EventStore | None = None
         self.log = logging.getLogger(__name__)
         self.last_update: datetime = None
+        self.rendered: RenderedCalendar | None = None
+        self._revision: int | None = None
+        self._rendered_revision: int | None = None
+        self._rendered_mtime: int | None = None
+        self.page_fetches = 0
+        self.cache_counts: Counter = Counter(misses=0, not_modified=0)
+        self.fingerprint_counts: Counter = Counter(hits=0, misses=0)
+        self.plan_counts: Dict[str, int] = {"due": 0, "skipped": 0}
+        self._pages: Dict[str, CachedPage] = {}
+        self._documents: Dict[tuple[str, Callable], Any] = {}
+        self.fingerprints = FingerprintStore()
+        self.fragment_cache = FragmentCache()
+        self.views = CalendarViews()
+        self._scraped: set[str] = set()
+        self._extraction = threading.local()
+        self._cache_lock = threading.Lock()
+        self.warm_start()
 
+    def warm_start(self) -> None:
+        """Pick up the last refresh from the repository without any network access.
+
+        Only the time of the last successful scrape run is read here (or the
+        calendar file's age, if no run was recorded yet). Events are rendered
+        on the first request and loaded by the first background refresh.
+        """
+        self.last_update = self.repository.last_success(self.league)
+        if self.last_update is not None:
+            return
         try:
-            self.update_calendar()
-        except Exception as exc:
-            self.log.exception(
-                f"{self.__class__} failed to initialize. \n\nException: {exc}"
+            mtime = self.file_path.stat().st_mtime
+        except FileNotFoundError:
+            return
+        self.last_update = datetime.fromtimestamp(mtime, tz=self.UTC)
+
+    def _create_calendar(self) -> None:
+        from ics import Calendar, Event
+
+        calendar = Calendar()
+        for row in self.repository.events(self.league):
+            event = Event(
+                name=row["name"],
+                begin=row["begin_at"],
+                description=row["description"],
+                url=row["url"],
+                uid=row["uid"],
             )
+            if row["end_at"] is not None:
+                event.end = row["end_at"]
+            calendar.events.add(event)
+        self.event_calendar = calendar
+
+    @property
+    def event_calendar(self) -> Calendar:
+        """Calendar holding the events, loaded from ``repository`` on first use"""
+        if self._event_calendar is None:
+            self._create_calendar()
+        return self._event_calendar
+
+    @event_calendar.setter
+    def event_calendar(self, calendar: Calendar) -> None:
+        self._event_calendar = calendar
+        self._event_store = EventStore(calendar.events)
+
+    @property
+    def event_store(self) -> EventStore:
+        """Indexes over ``event_calendar`` used to merge scraped events"""
+        if self._event_store is None:
+            self._create_calendar()
+        return self._event_store
 
     def get_last_updated_string(self) -> str:
         """Get a nicely formatted string version of the last updated value
@@ -203,48 +246,564 @@ class CalendarControl(metaclass=ABCMeta):
             return "Updating now..."
         return self.last_update.astimezone(self.PST).strftime("%Y-%m-%d %H:%M")
 
+    @property
+    def file_path(self) -> Path:
+        """Location of the last written calendar file for this league"""
+        return Path(__file__).parent.resolve() / "data" / self.calendar_file_name
+
+    @property
+    def league(self) -> str:
+        """Key of this league's events in ``repository``"""
+        return Path(self.calendar_file_name).stem
+
+    @property
+    def archive_path(self) -> Path:
+        """Location of the events pruned from the calendar by ``compact``"""
+        return self.file_path.with_name(f"{self.file_path.stem}-archive.ics")
+
     def time_to_update(self) -> bool:
         """Determine if the application should check for event updates
 
         Returns:
-            bool: True if the last check was at least 24 hours ago
+            bool: True if the last check was at least ``refresh_interval`` ago
         """
         if not self.last_update:
             return True
         time_difference = datetime.now(tz=self.UTC) - self.last_update
         self.log.info(f"Days since last update: {time_difference.days}")
-        if time_difference.days:
+        if time_difference >= self.refresh_interval:
             return True
         self.log.info(f"Last update was {self.last_update.astimezone(self.PST)}")
         return False
 
+    def fetch_page(self, url: str) -> CachedPage:
+        """Conditionally fetch a page at most once per refresh.
+
+        Pages are revalidated against ``page_cache`` with ETag/If-Modified-Since,
+        so an unchanged page costs a 304 instead of a full download. Only pages
+        answered with a 200 (or revalidated) are recorded in ``repository``, so
+        an error page upstream does not count as a change of the page.
+
+        Args:
+            url (str): URL of the page.
+
+        Returns:
+            CachedPage: Page body, flagged ``not_modified`` when upstream sent a 304.
+        """
+        dependencies = getattr(self._extraction, "dependencies", None)
+        if dependencies is not None:
+            dependencies.append(url)
+        with self._cache_lock:
+            if url in self._pages:
+                return self._pages[url]
+        page = self.http_client.get_page(url, self.page_cache)
+        if page.status == 200:
+            self.repository.record_page(self.league, page)
+        with self._cache_lock:
+            self.cache_counts["not_modified" if page.not_modified else "misses"] += 1
+            return self._pages.setdefault(url, page)
+
+    def parse_page(
+        self,
+        url: str,
+        parse: Callable[[str, bytes, HtmlParser, PageRegions | None], R],
+    ) -> R:
+        """Fetch an event page and extract it with ``parse`` at most once per refresh.
+
+        The page bytes are parsed in ``parse_pool``, so ``parse`` must be a
+        picklable module-level function (see ``backend.extraction``) that
+        returns plain records. Every extraction helper should read pages
+        through here so a page needed by several helpers is downloaded and
+        parsed a single time.
+
+        Args:
+            url (str): URL of the page.
+            parse (Callable): Extraction function, called with the URL, the page
+                bytes, ``html_parser`` and ``document_regions``.
+
+        Returns:
+            What ``parse`` returned for the page.
+        """
+        page = self.fetch_page(url)
+        key = (url, parse)
+        with self._cache_lock:
+            if key in self._documents:
+                return self._documents[key]
+        with self.metrics.parse_seconds.time(league=self.league):
+            result = self.parse_pool.run(
+                parse, url, page.content, self.html_parser, self.document_regions
+            )
+        with self._cache_lock:
+            self.page_fetches += 1
+            return self._documents.setdefault(key, result)
+
+    def parse_html(
+        self, content: bytes, regions: PageRegions | None = None
+    ) -> BeautifulSoup:
+        """Parse page markup with ``html_parser``.
+
+        Args:
+            content (bytes): Page markup.
+            regions (PageRegions | None): Subtrees to build, or None for the full tree.
+
+        Returns:
+            BeautifulSoup: Parsed page markup.
+        """
+        return self.html_parser.parse(content, regions)
+
+    def get_json(self, url: str) -> Any:
+        """Fetch and decode a JSON API response at most once per refresh."""
+        return json.loads(self.fetch_page(url).content)
+
+    def scrape_events(
+        self, url: str, extract: Callable[[str], list[Event]]
+    ) -> list[Event]:
+        """Extract the events for ``url``, reusing the last result when nothing changed.
+
+        The URLs read by ``extract`` are recorded in ``fingerprints`` with a hash
+        of their bodies. On the next refresh those URLs are revalidated first,
+        and if their content hashes the same (including pages that came back
+        304) the previously extracted events are returned without parsing.
+        Those skips are counted in ``fingerprint_counts``, apart from the HTTP
+        outcomes in ``cache_counts``. ``page_fetches`` counts the event page
+        either way, so it stays one per event page whether the page was parsed
+        or served from its fingerprint.
+
+        Args:
+            url (str): URL of the event page.
+            extract (Callable): Extraction helper that turns the URL into events.
+
+        Returns:
+            list[Event]: Events scheduled for the target URL.
+        """
+        if dependencies := self.fingerprints.dependencies(url):
+            fingerprint = self.fingerprints.fingerprint(
+                self.fetch_page(dependency).content for dependency in dependencies
+            )
+            events = self.fingerprints.lookup(url, fingerprint)
+            if events is not None:
+                with self._cache_lock:
+                    self.fingerprint_counts["hits"] += 1
+                    self.page_fetches += 1
+                    self._scraped.add(url)
+                return events
+        self._extraction.dependencies = []
+        try:
+            events = extract(url)
+        finally:
+            dependencies = list(dict.fromkeys(self._extraction.dependencies))
+            self._extraction.dependencies = None
+        fingerprint = self.fingerprints.fingerprint(
+            self.fetch_page(dependency).content for dependency in dependencies
+        )
+        self.fingerprints.store(url, dependencies, fingerprint, events)
+        with self._cache_lock:
+            self.fingerprint_counts["misses"] += 1
+            self._scraped.add(url)
+        return events
+
+    def plan_refresh(self, urls: list[str]) -> list[str]:
+        """Keep only the event URLs ``planner`` says this refresh should fetch.
+
+        Events of the skipped URLs are left in the repository as they are, and
+        their fingerprints are kept for the next refresh.
+
+        Args:
+            urls (list[str]): Event URLs found on the listing pages.
+
+        Returns:
+            list[str]: URLs to scrape, in input order.
+        """
+        due, skipped = self.planner.plan(
+            urls, self.repository.page_history(self.league)
+        )
+        with self._cache_lock:
+            self._scraped.update(skipped)
+            self.plan_counts = {"due": len(due), "skipped": len(skipped)}
+        if skipped:
+            self.log.info(f"Skipping {len(skipped)} event pages that are not due")
+        return due
+
+    def scrape_all(
+        self, urls: list[str], extract: Callable[[str], list[Event]]
+    ) -> list[list[Event]]:
+        """Run ``scrape_events`` for every URL concurrently, in input order."""
+        return self.fetch_engine.map(lambda url: self.scrape_events(url, extract), urls)
+
+    @contextmanager
+    def refresh_cache(self) -> Iterator[None]:
+        """Scope the page and document caches to one refresh.
+
+        The caches and the ``page_fetches``, ``cache_counts`` and
+        ``fingerprint_counts`` counters are reset on entry, and serialized
+        events not used by the previous refresh are dropped from
+        ``fragment_cache``. ``parse_pool`` runs for the duration.
+        On exit the pages are dropped so they are not kept between refreshes,
+        and only the fingerprints of URLs seen in this refresh are kept for the
+        next one.
+        """
+        with self._cache_lock:
+            self._pages.clear()
+            self._documents.clear()
+            self._scraped.clear()
+            self.page_fetches = 0
+            self.cache_counts = Counter(misses=0, not_modified=0)
+            self.fingerprint_counts = Counter(hits=0, misses=0)
+            self.plan_counts = {"due": 0, "skipped": 0}
+        self.fragment_cache.sweep()
+        try:
+            with self.parse_pool.session():
+                yield
+        finally:
+            with self._cache_lock:
+                self._pages.clear()
+                self._documents.clear()
+                self.fingerprints.retain(self._scraped)
+
+    def span(self, phase: str):
+        """Time a phase of ``update_calendar`` into ``metrics``.
+
+        Args:
+            phase (str): Name of the phase, e.g. ``"scrape"`` or ``"write"``.
+
+        Returns:
+            Context manager that records the time spent in its block.
+        """
+        return self.metrics.refresh_phase_seconds.time(
+            league=self.league, phase=phase
+        )
+
     def update_existing_event(self, event: Event):
         """Update existing event if one is present in the calendar, otherwise create the event.
 
+        An existing event is replaced when it has the same name, the same begin and
+        end, or the same URL and name. Matches are found through ``event_store``
+        indexes, so the cost does not grow with the size of the calendar. The
+        change is written through to ``repository`` for the other workers; an
+        event whose content did not change is neither serialized nor written,
+        and changed events are recorded in the repository's change log, which
+        the events API syncs clients from. A replaced event keeps the UID it
+        was stored with, so scraping an unchanged event again, in any worker,
+        changes nothing.
+
         Args:
             event (Event): Event to add or update.
         """
-        for existing_event in self.event_calendar.events:
-            if (
-                (event.name == existing_event.name)
-                or (
-                    event.begin == existing_event.begin
-                    and event.end == existing_event.end
+        if (stored := self.repository.find_match(self.league, event)) is not None:
+            # Keep the UID calendars already have; ics makes up one per parse
+            event.uid = stored["uid"]
+        self.event_store.upsert(event)
+        content_hash, fragment = self.fragment_cache.serialize(event)
+        self.repository.upsert(self.league, event, fragment, content_hash)
+        self.metrics.events_upserted.inc(league=self.league)
+
+    def compact(self) -> Dict[str, int]:
+        """Move events that ended more than ``retention`` ago to the archive file.
+
+        Future events and recent history are kept, so the served calendar stops
+        growing with every past card. Pruned events are appended to
+        ``archive_path`` rather than discarded, unless an event with the same
+        UID is archived already (as after a refresh that was rolled back). The
+        archive is written to a temporary name and renamed into place, so it is
+        never left half written. Entries of the change log older than
+        ``retention`` are dropped too; clients holding a sync token from before
+        then must list the events again.
+
+        Returns:
+            Dict[str, int]: Events kept and pruned, the bytes pruned from the
+            served calendar and the change log entries dropped.
+        """
+        cutoff = datetime.now(tz=self.UTC) - self.retention
+        pruned = [
+            event
+            for event in list(self.event_store)
+            if (event.end or event.begin) < cutoff
+        ]
+        fragments = [event.serialize() for event in pruned]
+        if pruned:
+            if self.archive_path.exists():
+                archive = self.archive_path.read_bytes().decode("UTF-8")
+            else:
+                from ics import Calendar
+
+                archive = Calendar().serialize()
+            archived = set(UID_LINE.findall(re.sub(r"\r?\n[ \t]", "", archive)))
+            body = (
+                archive.rstrip().removesuffix("END:VCALENDAR")
+                + "".join(
+                    f"{fragment}\r\n"
+                    for event, fragment in zip(pruned, fragments)
+                    if event.uid not in archived
                 )
-                or (
-                    event.url == existing_event.url
-                    and event.name == existing_event.name
+                + "END:VCALENDAR"
+            )
+            tmp_path = self.archive_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_bytes(body.encode("UTF-8"))
+            os.replace(tmp_path, self.archive_path)
+            for event in pruned:
+                self.event_store.discard(event)
+            self.repository.delete(self.league, (event.uid for event in pruned))
+            self.log.info(f"Archived {len(pruned)} events to {self.archive_path}")
+        return {
+            "kept": len(self.event_store),
+            "pruned": len(pruned),
+            "bytes_saved": sum(len(fragment.encode()) for fragment in fragments),
+            "changes_pruned": self.repository.prune_changes(self.league, cutoff),
+        }
+
+    def write_calendar(self) -> Path:
+        """Render the calendar from ``repository`` to ``file_path`` and keep the bytes.
+
+        The calendar is assembled from the VEVENT fragments stored with each
+        event, so only events that were added or changed were serialized. When
+        the league's revision has not moved and the file exists, nothing is
+        rendered or written. Otherwise ``rendered`` (and its compressed
+        variants) is rebuilt only if the bytes differ, and the file is written
+        to a temporary name and renamed into place, so nothing ever reads a
+        partially written calendar.
+
+        Returns:
+            Path: Calendar file location.
+        """
+        revision = self.repository.revision(self.league)
+        if (
+            revision == self._rendered_revision
+            and self.rendered is not None
+            and self.file_path.exists()
+        ):
+            self._revision = revision
+            return self.file_path
+        body = render_fragments(self.repository.fragments(self.league))
+        if self.rendered is None or self.rendered.body != body:
+            self.rendered = RenderedCalendar(body)
+        tmp_path = self.file_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, self.file_path)
+        self._revision = self._rendered_revision = revision
+        self._rendered_mtime = self.file_path.stat().st_mtime_ns
+        return self.file_path
+
+    def get_rendered(self) -> RenderedCalendar:
+        """Calendar ready to serve, picking up changes made by other workers.
+
+        The calendar is rendered again from ``repository`` only when the
+        league's revision moved. A league with nothing stored yet (such as the
+        first start after upgrading) is served from the last calendar file.
+
+        Returns:
+            RenderedCalendar: The last rendered calendar.
+        """
+        revision = self.repository.revision(self.league)
+        if revision == 0:
+            return self._get_rendered_file()
+        if self.rendered is None or revision != self._rendered_revision:
+            body = render_fragments(self.repository.fragments(self.league))
+            if self.rendered is None or self.rendered.body != body:
+                self.rendered = RenderedCalendar(body)
+            self._rendered_revision = revision
+        return self.rendered
+
+    def get_view(self, query: CalendarQuery) -> RenderedCalendar:
+        """Calendar with only the events matching ``query``, ready to serve.
+
+        Views are rendered from an index over the stored events and kept in
+        ``views`` until the league's revision moves, so serving a popular view
+        costs the same as serving the full calendar.
+
+        Args:
+            query (CalendarQuery): Filters of the view; without any, the full
+                calendar from ``get_rendered``.
+
+        Returns:
+            RenderedCalendar: The matching events.
+        """
+        if not query:
+            return self.get_rendered()
+        return self.views.get(
+            query,
+            self.repository.revision(self.league),
+            lambda: self.repository.events(self.league),
+        )
+
+    def _get_rendered_file(self) -> RenderedCalendar:
+        try:
+            mtime = self.file_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime is not None and mtime != self._rendered_mtime:
+            body = self.file_path.read_bytes()
+            if self.rendered is None or self.rendered.body != body:
+                self.rendered = RenderedCalendar(body)
+            self._rendered_mtime = mtime
+        if self.rendered is None:
+            self.rendered = RenderedCalendar(render_fragments([]))
+        return self.rendered
+
+    def import_calendar_file(self) -> int:
+        """Store the events of the last calendar file in ``repository``.
+
+        Used once, when a league has nothing stored yet but a calendar file was
+        written before the repository existed.
+
+        Returns:
+            int: The league's revision afterwards.
+        """
+        from ics import Calendar
+
+        calendar = Calendar(self.file_path.read_text(encoding="UTF-8"))
+        with self.repository.transaction():
+            for event in calendar.events:
+                self.repository.upsert(self.league, event)
+        self.log.info(f"Imported {len(calendar.events)} events from {self.file_path}")
+        return self.repository.revision(self.league)
+
+    def reload_calendar(self) -> bool:
+        """Drop the loaded events if another worker changed the repository since.
+
+        The events are loaded again from ``repository`` the next time they are
+        used. ``last_update`` always follows the last successful run, also when
+        it changed no events, so a refresh by any worker counts for all of them.
+
+        Returns:
+            bool: True if the repository changed since this worker last synced.
+        """
+        self.last_update = self.repository.last_success(self.league) or self.last_update
+        revision = self.repository.revision(self.league)
+        if revision == 0 and self.file_path.exists():
+            revision = self.import_calendar_file()
+        if revision == self._revision:
+            return False
+        self._revision = revision
+        self._event_calendar = self._event_store = None
+        return True
+
+    def refresh(self, force: bool = False) -> str:
+        """Refresh the calendar unless another worker is doing it or just did.
+
+        Only one process at a time may refresh a calendar; the others skip the
+        scrape and use the events it stores. Every scrape is recorded as a run
+        in ``repository``.
+
+        Args:
+            force (bool): Scrape even if the calendar was refreshed recently.
+
+        Returns:
+            str: ``"refreshed"`` if this process scraped, ``"reloaded"`` if a
+            fresh calendar written by another worker was used instead, or
+            ``"busy"`` if another worker is refreshing right now.
+        """
+        lock = FileLock(self.file_path.with_name(f"{self.file_path.stem}.lock"))
+        if not lock.acquire(blocking=False):
+            return "busy"
+        try:
+            self.reload_calendar()
+            if not force and not self.time_to_update():
+                return "reloaded"
+            previous_update = self.last_update
+            self.last_update = None
+            run_id = self.repository.start_run(self.league)
+            start = time.perf_counter()
+            try:
+                self.update_calendar()
+            except Exception as error:
+                self.last_update = previous_update
+                # Writes of a failed refresh are rolled back; reload what was kept
+                self._event_calendar = self._event_store = None
+                self.repository.finish_run(run_id, "failed", error=str(error))
+                self.metrics.refresh_seconds.observe(
+                    time.perf_counter() - start, league=self.league, result="failed"
                 )
-            ):
-                self.event_calendar.events.discard(existing_event)
-                self.event_calendar.events.add(event)
-                return
-        self.event_calendar.events.add(event)
+                raise
+            events_count = self.repository.count(self.league)
+            self.repository.finish_run(run_id, "success", events_count=events_count)
+            self.metrics.refresh_seconds.observe(
+                time.perf_counter() - start, league=self.league, result="success"
+            )
+            self.metrics.events_stored.set(events_count, league=self.league)
+            return "refreshed"
+        finally:
+            lock.release()
+
+    @abstractmethod
+    def get_event_links(self) -> list[str]:
+        """Find the event pages listed by the league's website.
+
+        Returns:
+            list[str]: Event URLs to scrape.
+        """
 
     @abstractmethod
+    def get_events_from_url(self, url: str) -> list[Event]:
+        """Scrape the events scheduled on one event page.
+
+        Args:
+            url (str): URL of the event page.
+
+        Returns:
+            list[Event]: Events found on the page.
+        """
+
     def update_calendar(self) -> Path:
         """Update the calendar file with the latest details
 
+        Each phase is timed with ``span``: finding the event links (and
+        planning which to fetch), scraping them, merging the events and
+        compacting inside one repository transaction, and writing the file.
+
         Returns:
             Path: Calendar file location the serve to the client
         """
+        file_path = self.file_path
+        if not self.time_to_update():
+            return file_path
+        self.log.info("Starting calendar update")
+        success = True
+        try:
+            with self.refresh_cache():
+                with self.span("links"):
+                    links = self.plan_refresh(self.get_event_links())
+                with self.span("scrape"):
+                    events = [
+                        event
+                        for event_list in self.scrape_all(
+                            links, self.get_events_from_url
+                        )
+                        for event in event_list
+                    ]
+            with self.repository.transaction():
+                with self.span("merge"):
+                    for event in events:
+                        self.update_existing_event(event)
+                with self.span("compact"):
+                    compaction = self.compact()
+            with self.span("write"):
+                self.write_calendar()
+            events_count = len(self.event_calendar.events)
+            self.log.info(
+                f"Writing out {events_count} events on calendar to {file_path}"
+            )
+            self.last_update = datetime.now(tz=self.UTC)
+            global_cache_manager.update_service_stats(
+                self.league,
+                True,
+                events_count=events_count,
+                extra={
+                    "last_page_fetches": self.page_fetches,
+                    "last_scraped_events": len(events),
+                    "http_cache": dict(self.cache_counts),
+                    "fingerprint_cache": dict(self.fingerprint_counts),
+                    "refresh_plan": self.plan_counts,
+                    "fragment_cache": {
+                        "hits": self.fragment_cache.hits,
+                        "misses": self.fragment_cache.misses,
+                    },
+                    "compaction": compaction,
+                },
+            )
+        except Exception:
+            success = False
+            global_cache_manager.update_service_stats(self.league, False)
+            raise
+        finally:
+            global_cache_manager.update_service_stats("backend", success)
+        return file_path
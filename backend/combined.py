@@ -0,0 +1,107 @@
+"""One calendar merging the events of several leagues"""
+
+from __future__ import annotations
+
+import hashlib
+import heapq
+import threading
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Mapping
+
+from backend.rendering import CALENDAR_HEADER, RenderedCalendar
+
+if TYPE_CHECKING:
+    from backend.calendar_control import CalendarControl
+
+# Bytes of VEVENTs gathered before a chunk of the stream is sent
+CHUNK_SIZE = 64 * 1024
+
+
+def merge_events(streams: Iterable[Iterable[Mapping]]) -> Iterator[Mapping]:
+    """Merge event streams that are each in calendar order into one.
+
+    A k-way merge over a heap holding one event per stream, so only ``k``
+    events are held at a time, however long the streams are.
+    """
+    return heapq.merge(
+        *streams, key=lambda event: (event["begin_at"], event["name"] or "")
+    )
+
+
+class CombinedCalendar:
+    """ICS calendar of the events of any set of calendars, sorted by start time.
+
+    The league streams are read from each calendar's repository and merged
+    as the body is sent, so a combined calendar is never assembled in memory
+    before the first byte goes out. A streamed body is kept (with its
+    compressed variants) and served as it is until the calendar of one of its
+    leagues changes. Its ETag is derived from the digests of those calendars,
+    which are kept per revision by each league, so it is known before the
+    combined body is rendered and never repeats for different content.
+    """
+
+    def __init__(self, calendars: Mapping[str, CalendarControl]) -> None:
+        self.calendars = calendars
+        # Per set of leagues: their calendars' digests when rendered, and the body
+        self._rendered: Dict[tuple, tuple[tuple[str, ...], RenderedCalendar]] = {}
+        self._lock = threading.Lock()
+
+    def leagues(self, names: str | None = None) -> tuple[str, ...]:
+        """Normalize a comma separated list of calendar names, all by default.
+
+        Raises:
+            ValueError: A name is not a registered calendar.
+        """
+        if not names:
+            return tuple(sorted(self.calendars))
+        leagues = sorted({name.strip().lower() for name in names.split(",")} - {""})
+        unknown = [name for name in leagues if name not in self.calendars]
+        if unknown or not leagues:
+            raise ValueError(
+                f"Unknown leagues {', '.join(unknown)}; "
+                f"choose from {', '.join(sorted(self.calendars))}"
+            )
+        return tuple(leagues)
+
+    def digests(self, leagues: tuple[str, ...]) -> tuple[str, ...]:
+        """Content digest of each league's own calendar."""
+        return tuple(self.calendars[name].get_rendered().digest for name in leagues)
+
+    def etag(self, leagues: tuple[str, ...], encoding: str = "identity") -> str:
+        """Strong ETag (unquoted) of the combined calendar of ``leagues``."""
+        state = repr((leagues, self.digests(leagues)))
+        digest = hashlib.sha256(state.encode()).hexdigest()[:32]
+        return digest if encoding == "identity" else f"{digest}-{encoding}"
+
+    def get_rendered(self, leagues: tuple[str, ...]) -> RenderedCalendar | None:
+        """The kept calendar of ``leagues``, or None if a league changed since."""
+        with self._lock:
+            digests, rendered = self._rendered.get(leagues, (None, None))
+        return rendered if digests == self.digests(leagues) else None
+
+    def stream(self, leagues: tuple[str, ...]) -> Iterator[bytes]:
+        """Render the combined calendar of ``leagues`` in chunks while merging.
+
+        Once the whole body was sent, it is kept for ``get_rendered``.
+        """
+        digests = self.digests(leagues)
+        streams = [
+            self.calendars[name].repository.iter_fragments(
+                self.calendars[name].league
+            )
+            for name in leagues
+        ]
+        body = [CALENDAR_HEADER.encode()]
+        yield body[0]
+        chunk: list[str] = []
+        size = 0
+        for event in merge_events(streams):
+            chunk.append(f"{event['fragment']}\r\n")
+            size += len(chunk[-1])
+            if size >= CHUNK_SIZE:
+                body.append("".join(chunk).encode("UTF-8"))
+                yield body[-1]
+                chunk, size = [], 0
+        body.append(("".join(chunk) + "END:VCALENDAR").encode("UTF-8"))
+        yield body[-1]
+        with self._lock:
+            self._rendered[leagues] = (digests, RenderedCalendar(b"".join(body)))
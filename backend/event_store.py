@@ -0,0 +1,95 @@
+"""Indexed storage for calendar events"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Dict, Hashable, Iterator
+
+if TYPE_CHECKING:
+    from ics import Event
+
+
+class EventStore:
+    """Hash-indexed view over a calendar's event set.
+
+    Keeps indexes on name, ``(begin, end)`` and ``(url, name)`` so finding the
+    event an incoming one replaces is a dictionary lookup instead of a scan of
+    the whole calendar. The store mutates the set it is given in place, so it
+    can wrap ``Calendar.events`` directly.
+    """
+
+    def __init__(self, events: set[Event] | None = None) -> None:
+        self.events = events if events is not None else set()
+        self._by_name: Dict[Hashable, set[Event]] = {}
+        self._by_time: Dict[Hashable, set[Event]] = {}
+        self._by_url_name: Dict[Hashable, set[Event]] = {}
+        self._lock = threading.RLock()
+        self.rebuild()
+
+    def _indexes(self, event: Event) -> Iterator[tuple[Dict, Hashable]]:
+        yield self._by_name, event.name
+        yield self._by_time, (event.begin, event.end)
+        yield self._by_url_name, (event.url, event.name)
+
+    def _index(self, event: Event) -> None:
+        for index, key in self._indexes(event):
+            index.setdefault(key, set()).add(event)
+
+    def _unindex(self, event: Event) -> None:
+        for index, key in self._indexes(event):
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.discard(event)
+                if not bucket:
+                    del index[key]
+
+    def rebuild(self) -> None:
+        """Rebuild every index from the event set, e.g. after it was edited directly."""
+        with self._lock:
+            self._by_name.clear()
+            self._by_time.clear()
+            self._by_url_name.clear()
+            for event in self.events:
+                self._index(event)
+
+    def find_match(self, event: Event) -> Event | None:
+        """Find the stored event that ``event`` should replace.
+
+        An event matches when it has the same name, the same begin and end, or
+        the same URL and name.
+        """
+        for index, key in self._indexes(event):
+            if bucket := index.get(key):
+                return next(iter(bucket))
+        return None
+
+    def add(self, event: Event) -> None:
+        """Add ``event`` without looking for a match."""
+        with self._lock:
+            self.events.add(event)
+            self._index(event)
+
+    def discard(self, event: Event) -> None:
+        """Remove ``event`` if it is stored."""
+        with self._lock:
+            self.events.discard(event)
+            self._unindex(event)
+
+    def upsert(self, event: Event) -> Event | None:
+        """Replace the matching event with ``event``, or add it if nothing matches.
+
+        Returns:
+            Event | None: The event that was replaced, if any.
+        """
+        with self._lock:
+            existing = self.find_match(event)
+            if existing is not None:
+                self.discard(existing)
+            self.add(event)
+            return existing
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def __iter__(self) -> Iterator[Event]:
+        return iter(self.events)
@@ -0,0 +1,151 @@
+"""JSON events API: pages of events by start time and changes since a sync token"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import TYPE_CHECKING, Any, Dict, Mapping
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from backend.repository import EventRepository
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 500
+
+
+class SyncTokenExpired(ValueError):
+    """Raised for a sync token older than the change log kept by the repository."""
+
+
+def parse_limit(value: str | None) -> int:
+    """Page size from a request argument, ``DEFAULT_LIMIT`` if not given.
+
+    Raises:
+        ValueError: Not a number from 1 to ``MAX_LIMIT``.
+    """
+    if not value:
+        return DEFAULT_LIMIT
+    if not value.isdigit() or not 0 < int(value) <= MAX_LIMIT:
+        raise ValueError(f"limit must be a number from 1 to {MAX_LIMIT}")
+    return int(value)
+
+
+def parse_sync_token(value: str) -> int:
+    """Change sequence number of a sync token.
+
+    Raises:
+        ValueError: Not a sync token.
+    """
+    if not value.isdigit():
+        raise ValueError("since must be a sync_token returned by this API")
+    return int(value)
+
+
+def encode_cursor(row: Mapping[str, Any], sync_token: int) -> str:
+    """Opaque cursor pointing after ``row``, carrying the listing's sync token."""
+    position = [row["begin_at"], row["name"] or "", row["id"], sync_token]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[tuple[str, str, int], int]:
+    """The position and the sync token encoded by ``encode_cursor``.
+
+    Raises:
+        ValueError: Not a cursor returned by this API.
+    """
+    try:
+        begin_at, name, event_id, sync_token = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+        return (str(begin_at), str(name), int(event_id)), int(sync_token)
+    except (binascii.Error, TypeError, ValueError):
+        raise ValueError("cursor must be a next_cursor returned by this API") from None
+
+
+def event_json(row: sqlite3.Row) -> Dict[str, Any]:
+    """JSON representation of a stored event.
+
+    ``id`` stays the same when the event is updated; ``uid`` is the UID in the
+    ICS calendar.
+    """
+    return {
+        "id": row["id"],
+        "uid": row["uid"],
+        "name": row["name"],
+        "begin": row["begin_at"],
+        "end": row["end_at"],
+        "url": row["url"],
+        "description": row["description"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def list_events(
+    repository: EventRepository,
+    league: str,
+    cursor: str | None = None,
+    limit: int = DEFAULT_LIMIT,
+) -> Dict[str, Any]:
+    """A page of a league's events ordered by start time.
+
+    Pages are read with keyset pagination, so a page costs the same however
+    deep into the listing it is. Every page reports the sync token taken with
+    the first one; passing it as ``since`` afterwards returns what changed
+    while and after the listing was read.
+
+    Returns:
+        Dict[str, Any]: ``events``, ``next_cursor`` (None on the last page) and
+        ``sync_token``.
+
+    Raises:
+        ValueError: ``cursor`` is not a cursor returned by this API.
+    """
+    if cursor:
+        after, sync_token = decode_cursor(cursor)
+    else:
+        after, sync_token = None, repository.sync_token(league)
+    rows = repository.events_after(league, after, limit + 1)
+    return {
+        "events": [event_json(row) for row in rows[:limit]],
+        "next_cursor": (
+            encode_cursor(rows[limit - 1], sync_token) if len(rows) > limit else None
+        ),
+        "sync_token": str(sync_token),
+    }
+
+
+def sync_events(
+    repository: EventRepository, league: str, since: int, limit: int = DEFAULT_LIMIT
+) -> Dict[str, Any]:
+    """Events of a league added, changed or removed after the sync token ``since``.
+
+    Changes are read from the repository's change log, oldest first, at most
+    ``limit`` at a time. Events are returned as they are now, once each, even
+    if they changed several times.
+
+    Returns:
+        Dict[str, Any]: ``events`` (added or changed), ``removed`` (ids),
+        ``sync_token`` to pass next time and ``has_more``, True when more
+        changes follow that token.
+
+    Raises:
+        SyncTokenExpired: ``since`` is older than the kept change log.
+    """
+    if since < repository.changes_floor(league):
+        raise SyncTokenExpired("since is too old, list the events again")
+    changes = repository.changes(league, since, limit + 1)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    changed = list(dict.fromkeys(change["event_id"] for change in changes))
+    rows = repository.events_by_id(league, changed)
+    return {
+        "events": [
+            event_json(rows[event_id]) for event_id in changed if event_id in rows
+        ],
+        "removed": [event_id for event_id in changed if event_id not in rows],
+        "sync_token": str(changes[-1]["seq"] if changes else since),
+        "has_more": has_more,
+    }
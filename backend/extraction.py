@@ -0,0 +1,222 @@
+"""Page extraction functions that run in the parse pool.
+
+Everything here takes raw page bytes and returns plain, picklable records, so
+it can run in a separate process. The module must stay free of imports that
+build shared state (calendars, caches, stats), because every parse process
+imports it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING
+
+from backend.parsing import HtmlParser, PageRegions
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from ics import Event
+
+
+@dataclass
+class EventRecord:
+    """Details of one calendar event, extracted from a page."""
+
+    name: str
+    begin: datetime
+    end: datetime | None = None
+    description: str | None = None
+    url: str | None = None
+
+    def to_event(self) -> Event:
+        """Build the calendar event for this record."""
+        from ics import Event  # pylint: disable=import-outside-toplevel
+
+        return Event(
+            name=self.name,
+            begin=self.begin,
+            end=self.end,
+            description=self.description,
+            url=self.url,
+        )
+
+
+@dataclass
+class OneFcEventPage:
+    """What a ONE event page says about its event."""
+
+    title: str
+    event_id: str
+    description: str
+
+
+# Element ids of the sections listing the fights of each part of a UFC card
+UFC_PART_SECTIONS = {
+    "Main Card": "main-card",
+    "Prelims": "prelims-card",
+    "Early Prelims": "early-prelims",
+}
+UFC_RED_CORNER = "c-listing-fight__corner-name--red"
+UFC_BLUE_CORNER = "c-listing-fight__corner-name--blue"
+
+
+def ufc_fighters_by_section(soup: BeautifulSoup) -> dict[str, list[str]]:
+    """Get the fights of every part of a UFC card in one pass over the page.
+
+    Args:
+        soup (BeautifulSoup): Page markup.
+
+    Returns:
+        dict[str, list[str]]: "Red Corner vs Blue Corner" per section id.
+    """
+    sections = {}
+    for section in soup.find_all(id=list(UFC_PART_SECTIONS.values())):
+        if section["id"] in sections:
+            continue
+        red, blue = [], []
+        for name in section.find_all(class_=[UFC_RED_CORNER, UFC_BLUE_CORNER]):
+            corner = red if UFC_RED_CORNER in name["class"] else blue
+            corner.append(name.get_text().replace("\n", " ").strip())
+        sections[section["id"]] = [f"{r} vs {b}" for r, b in zip(red, blue)]
+    return sections
+
+
+def ufc_fighters_for_part(part: str, soup: BeautifulSoup) -> list[str]:
+    """Get the fighters for a given part of a UFC card.
+
+    Args:
+        part (str): Description of the part to retrieve fighters names.
+        soup (BeautifulSoup): Page markup.
+
+    Returns:
+        list[str]: List of "Red Corner vs Blue Corner" for the given part.
+    """
+    section_id = UFC_PART_SECTIONS.get(part, "main-card")
+    return ufc_fighters_by_section(soup).get(section_id, [])
+
+
+def parse_ufc_event(
+    url: str, content: bytes, parser: HtmlParser, regions: PageRegions | None
+) -> list[EventRecord] | None:
+    """Extract the parts of a UFC card from its event page.
+
+    The page is walked once: the title, the editorial description and the
+    fights of every part are collected first, then one record is built per
+    part, so the cost does not grow with the number of parts.
+
+    Args:
+        url (str): URL of the event page.
+        content (bytes): Page markup.
+        parser (HtmlParser): Parser backend to use.
+        regions (PageRegions | None): Subtrees of the page to parse.
+
+    Returns:
+        list[EventRecord] | None: One record per part of the card, or None if
+        the page has no event title.
+    """
+    event_soup = parser.parse(content, regions)
+    title = event_soup.select_one("div.c-hero__header")
+    if title is None:
+        return None
+    main_title = " ".join([i.strip() for i in title.text.split("\n") if i]).strip()
+
+    if editor_description := event_soup.select_one("div.editor-content p"):
+        editor_description = editor_description.get_text(strip=True)
+    else:
+        editor_description = "Featured fighters:"
+    fighters = ufc_fighters_by_section(event_soup)
+
+    records: list[EventRecord] = []
+    event_parts = event_soup.select("ul ul li.c-listing-viewing-option-group__item")
+    for part in event_parts:
+        part_title = part.find(
+            "div", {"class": "c-listing-viewing-option__fight-card"}
+        ).get_text(strip=True)
+        part_start_time = datetime.fromtimestamp(
+            int(
+                part.find("div", {"class": "c-listing-viewing-option__time"})[
+                    "data-timestamp"
+                ]
+            ),
+            timezone.utc,
+        )
+        section_id = UFC_PART_SECTIONS.get(part_title.strip(), "main-card")
+        part_fighters = "\n".join(fighters.get(section_id, []))
+        event_description = f"{editor_description}\n{part_fighters}"
+
+        if records:
+            # UFC site has incorrectly shown the prelims starting hours after the main card.
+            # This check works around that problem by not updating the end time of the previous event if this site error occurs.
+            if not records[-1].begin > part_start_time:
+                records[-1].end = part_start_time
+
+        records.append(
+            EventRecord(
+                name=f"{part_title} - {main_title}",
+                begin=part_start_time,
+                description=event_description,
+                end=(part_start_time + timedelta(hours=2)),
+                url=url,
+            )
+        )
+    return records
+
+
+def onefc_fighters(soup: BeautifulSoup) -> list[str]:
+    """Get the fighters from a ONE event page.
+
+    Args:
+        soup (BeautifulSoup): Event HTML to search through.
+
+    Returns:
+        list[str]: List of the fighters found on the page.
+    """
+    # TODO: Figure out how to get the type of fight/event. I.E. Muay Tai, MMA, Kickboxing
+    return [
+        fighter.string.strip() for fighter in soup.find_all("div", {"class": "versus"})
+    ]
+
+
+def onefc_event_description(soup: BeautifulSoup) -> str:
+    """Create the event description based on available data from the page.
+
+    Args:
+        soup (BeautifulSoup): Event HTML to search through.
+
+    Returns:
+        str: Description of the even with the fighters if available.
+    """
+    if event_description := soup.select_one("div.editor-content p"):
+        event_description = event_description.get_text(strip=True)
+    fighters = "\n".join(onefc_fighters(soup))
+
+    if event_description:
+        return f"{event_description}\n\n{fighters}"
+
+    return "Coming Soon..."
+
+
+def parse_onefc_event(
+    url: str,  # pylint: disable=unused-argument
+    content: bytes,
+    parser: HtmlParser,
+    regions: PageRegions | None,
+) -> OneFcEventPage:
+    """Extract the title, API id and description from a ONE event page.
+
+    Args:
+        url (str): URL of the event page.
+        content (bytes): Page markup.
+        parser (HtmlParser): Parser backend to use.
+        regions (PageRegions | None): Subtrees of the page to parse.
+
+    Returns:
+        OneFcEventPage: Details found on the page.
+    """
+    event_soup = parser.parse(content, regions)
+    return OneFcEventPage(
+        title=event_soup.select_one("div.info-content h3").get_text(strip=True),
+        event_id=event_soup.find(attrs={"class", "status-countdown"})["data-id"],
+        description=onefc_event_description(event_soup),
+    )
@@ -0,0 +1,62 @@
+"""Concurrent fetching of event pages shared by all scrapers"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, TypeVar
+from urllib.parse import urlsplit
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class FetchEngine:
+    """Run scraping work for many URLs in parallel with bounded per-host concurrency.
+
+    ``map`` fans work out over a thread pool and returns results in input order,
+    so callers can merge them into a calendar deterministically. Every upstream
+    request holds a per-host slot (see ``host_slot``), which caps how many
+    requests are in flight against one site no matter how many tasks are running.
+    """
+
+    def __init__(self, max_workers: int = 16, per_host: int = 4) -> None:
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self._hosts: Dict[str, threading.BoundedSemaphore] = {}
+        self._hosts_lock = threading.Lock()
+
+    @contextmanager
+    def host_slot(self, url: str) -> Iterator[None]:
+        """Hold one of the ``per_host`` request slots for the host of ``url``."""
+        host = urlsplit(url).netloc
+        with self._hosts_lock:
+            semaphore = self._hosts.setdefault(
+                host, threading.BoundedSemaphore(self.per_host)
+            )
+        with semaphore:
+            yield
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> list[R]:
+        """Apply ``func`` to every item concurrently.
+
+        Args:
+            func (Callable): Work to run for each item, usually fetch and parse a URL.
+            items (Iterable): Items to process, usually event URLs.
+
+        Returns:
+            list: Results in the same order as ``items``. The first exception
+            raised, in input order, is re-raised once all work has finished.
+        """
+        items = list(items)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(items)),
+            thread_name_prefix="fetch",
+        ) as executor:
+            futures = [executor.submit(func, item) for item in items]
+        return [future.result() for future in futures]
+
+
+# Shared global instance
+global_fetch_engine = FetchEngine()
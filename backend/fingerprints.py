@@ -0,0 +1,65 @@
+"""Content fingerprints used to skip parsing pages that have not changed"""
+
+import hashlib
+import re
+import threading
+from typing import Any, Dict, Iterable
+
+# Markup that changes between requests without changing any event details
+# (inline scripts with build ids and tokens, styles and comments).
+VOLATILE_MARKUP = re.compile(
+    rb"<script\b.*?</script>|<style\b.*?</style>|<!--.*?-->", re.DOTALL | re.IGNORECASE
+)
+WHITESPACE = re.compile(rb"\s+")
+
+
+class FingerprintStore:
+    """Remember, per event URL, a hash of the pages read and the events they produced.
+
+    When a page is served in full but its relevant content hashes the same as on
+    the previous refresh, the stored events are returned and the page is not
+    parsed again.
+    """
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, tuple[list[str], str, list[Any]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(bodies: Iterable[bytes]) -> str:
+        """Hash page bodies, ignoring scripts, styles, comments and whitespace."""
+        digest = hashlib.sha256()
+        for body in bodies:
+            body = WHITESPACE.sub(b" ", VOLATILE_MARKUP.sub(b"", body))
+            digest.update(hashlib.sha256(body).digest())
+        return digest.hexdigest()
+
+    def dependencies(self, url: str) -> list[str]:
+        """URLs that were read to extract the events of ``url`` last time."""
+        entry = self._entries.get(url)
+        return entry[0] if entry else []
+
+    def lookup(self, url: str, fingerprint: str) -> list[Any] | None:
+        """Return the stored events for ``url`` if its fingerprint is unchanged."""
+        entry = self._entries.get(url)
+        if entry and entry[1] == fingerprint:
+            return entry[2]
+        return None
+
+    def store(
+        self, url: str, dependencies: list[str], fingerprint: str, events: list[Any]
+    ) -> None:
+        """Record the pages read for ``url``, their fingerprint and the events found."""
+        with self._lock:
+            self._entries[url] = (dependencies, fingerprint, events)
+
+    def retain(self, urls: Iterable[str]) -> None:
+        """Forget every URL that is not in ``urls``."""
+        urls = set(urls)
+        with self._lock:
+            self._entries = {
+                url: entry for url, entry in self._entries.items() if url in urls
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
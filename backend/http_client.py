@@ -0,0 +1,196 @@
+"""Pooled HTTP session shared by all scrapers"""
+
+import logging
+import os
+import random
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from backend.fetcher import FetchEngine, global_fetch_engine
+from backend.metrics import Metrics, global_metrics
+from backend.page_cache import CachedPage, PageCache
+from backend.replay import Recording, RecordingAdapter, ReplayAdapter
+from backend.throttle import HostThrottle
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/26.0 Safari/605.1.15"
+)
+
+
+class HttpClient:
+    """Keep-alive HTTP client with timeouts and bounded, jittered retries.
+
+    A single ``requests.Session`` is shared by every scraper so connections to
+    ufc.com and onefc.com are pooled and reused across event pages instead of
+    paying a new TCP and TLS handshake per request. Each request holds a
+    per-host slot from the fetch engine, and the session pool is sized to match.
+
+    Every attempt also goes through ``throttle``, which spaces requests to
+    each host and stops sending any once a host keeps failing, so a slow or
+    blocking site fails the refresh quickly and the last good calendar keeps
+    being served.
+
+    Settings can be overridden with the ``SCRAPER_USER_AGENT``,
+    ``SCRAPER_CONNECT_TIMEOUT``, ``SCRAPER_READ_TIMEOUT`` and
+    ``SCRAPER_MAX_RETRIES`` environment variables.
+
+    For offline runs, ``SCRAPER_HTTP_REPLAY`` names a recording directory to
+    answer every request from instead of the network, optionally delayed by
+    ``SCRAPER_HTTP_LATENCY`` seconds; ``SCRAPER_HTTP_RECORD`` names a
+    directory to record live responses into (see ``backend.replay``).
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        user_agent: str | None = None,
+        connect_timeout: float | None = None,
+        read_timeout: float | None = None,
+        max_retries: int | None = None,
+        backoff: float = 0.5,
+        fetch_engine: FetchEngine = global_fetch_engine,
+        throttle: HostThrottle | None = None,
+        metrics: Metrics = global_metrics,
+    ) -> None:
+        self.log = logging.getLogger(__name__)
+        self.user_agent = user_agent or os.getenv(
+            "SCRAPER_USER_AGENT", DEFAULT_USER_AGENT
+        )
+        self.timeout = (
+            connect_timeout or float(os.getenv("SCRAPER_CONNECT_TIMEOUT", 5)),
+            read_timeout or float(os.getenv("SCRAPER_READ_TIMEOUT", 20)),
+        )
+        self.max_retries = (
+            max_retries
+            if max_retries is not None
+            else int(os.getenv("SCRAPER_MAX_RETRIES", 2))
+        )
+        self.backoff = backoff
+        self.fetch_engine = fetch_engine
+        self.throttle = throttle or HostThrottle()
+        self.metrics = metrics
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = self.user_agent
+        pool = {
+            "pool_connections": fetch_engine.max_workers,
+            "pool_maxsize": fetch_engine.per_host,
+            "max_retries": 0,
+        }
+        if replay := os.getenv("SCRAPER_HTTP_REPLAY"):
+            adapter = ReplayAdapter(
+                Recording(Path(replay)),
+                latency=float(os.getenv("SCRAPER_HTTP_LATENCY", 0)),
+            )
+        elif record := os.getenv("SCRAPER_HTTP_RECORD"):
+            adapter = RecordingAdapter(Recording(Path(record)), **pool)
+        else:
+            adapter = HTTPAdapter(**pool)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number ``attempt`` (from 1)."""
+        return random.uniform(0, self.backoff * 2 ** (attempt - 1))
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET ``url`` through the pooled session.
+
+        Connection errors, timeouts and retryable status codes are retried up to
+        ``max_retries`` times. The last response is returned if it still has a
+        retryable status, and the last exception is raised if every attempt
+        failed to connect. Any exception raised by the request, and retryable
+        statuses, count as failures for the host's circuit breaker.
+
+        Args:
+            url (str): URL to fetch.
+            **kwargs: Extra arguments for ``requests.Session.get``.
+
+        Returns:
+            requests.Response: Upstream response.
+
+        Raises:
+            CircuitOpenError: The host's circuit is open, nothing was sent.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            self.throttle.acquire(url)
+            start = time.perf_counter()
+            try:
+                with self.fetch_engine.host_slot(url):
+                    start = time.perf_counter()
+                    response = self.session.get(url, **kwargs)
+            except BaseException as exc:
+                # Every request let through by ``acquire`` reports an outcome, or
+                # a half-open circuit would wait on its trial request forever
+                self.metrics.fetch_seconds.observe(
+                    time.perf_counter() - start, host=host, status="error"
+                )
+                self.throttle.record(url, success=False)
+                if (
+                    not isinstance(exc, (requests.ConnectionError, requests.Timeout))
+                    or attempt >= self.max_retries
+                ):
+                    raise
+                self.log.warning(f"Retrying {url} after {exc.__class__.__name__}")
+            else:
+                self.metrics.fetch_seconds.observe(
+                    time.perf_counter() - start,
+                    host=host,
+                    status=str(response.status_code),
+                )
+                self.metrics.downloaded_bytes.inc(len(response.content), host=host)
+                self.throttle.record(
+                    url, success=response.status_code not in self.RETRY_STATUSES
+                )
+                if (
+                    response.status_code not in self.RETRY_STATUSES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                self.log.warning(
+                    f"Retrying {url} after HTTP {response.status_code}"
+                )
+            attempt += 1
+            time.sleep(self.backoff_delay(attempt))
+
+    def get_page(self, url: str, page_cache: PageCache) -> CachedPage:
+        """Conditionally GET ``url`` using the validators stored in ``page_cache``.
+
+        A 304 answer is served from the cached body and flagged as
+        ``not_modified``; a 200 answer is stored in the cache when it carries an
+        ETag or Last-Modified header. Other answers are returned with their
+        ``status`` and never cached.
+
+        Args:
+            url (str): URL to fetch.
+            page_cache (PageCache): Cache holding previous bodies and validators.
+
+        Returns:
+            CachedPage: Body of the page and whether it changed upstream.
+        """
+        cached = page_cache.get(url)
+        response = self.get(url, headers=cached.validators() if cached else None)
+        if response.status_code == 304 and cached:
+            cached.not_modified = True
+            return cached
+        if response.status_code != 200:
+            return CachedPage(url, response.content, status=response.status_code)
+        return page_cache.put(
+            url,
+            response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+
+# Shared global instance
+global_http_client = HttpClient()
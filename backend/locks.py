@@ -0,0 +1,59 @@
+"""Inter-process locks for coordinating gunicorn workers"""
+
+import os
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where we only run one process
+    fcntl = None
+
+
+class FileLock:
+    """Exclusive advisory lock on a lock file, shared by every worker process.
+
+    Each ``FileLock`` opens its own file descriptor, so two locks on the same
+    path exclude each other whether they live in different processes or in
+    different threads of one process.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._fd: int | None = None
+
+    def acquire(self, blocking: bool = True) -> bool:
+        """Take the lock.
+
+        Args:
+            blocking (bool): Wait for the lock instead of giving up when it is held.
+
+        Returns:
+            bool: True if the lock is now held by this object.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            try:
+                flags = fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB
+                fcntl.flock(fd, flags)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+        self._fd = fd
+        return True
+
+    def release(self) -> None:
+        """Release the lock if it is held."""
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.release()
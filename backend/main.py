@@ -1,35 +1,173 @@
 """A simple Flask backend to route traffic"""
 
 import os
+import threading
+import time
 from backend.onefc_calendar import OneFcCalendar
 from backend.ufc_calendar import UfcCalendar
 from backend.calendar_control import global_cache_manager
-from flask import Flask, redirect, send_file, request, jsonify
+from backend.combined import CombinedCalendar
+from backend.events_api import (
+    SyncTokenExpired,
+    list_events,
+    parse_limit,
+    parse_sync_token,
+    sync_events,
+)
+from backend.http_client import global_http_client
+from backend.metrics import global_metrics
+from backend.scheduler import RefreshScheduler
+from backend.views import CalendarQuery
+from flask import Flask, Response, g, redirect, send_file, request, jsonify
 from datetime import datetime
 
 one_fc_calendar = OneFcCalendar()
 ufc_calendar = UfcCalendar()
 cache_manager = global_cache_manager
+scheduler = RefreshScheduler({"ufc": ufc_calendar, "onefc": one_fc_calendar})
+combined_calendar = CombinedCalendar(scheduler.calendars)
 app: Flask = Flask(__name__)
 url = os.getenv("URL") if os.getenv("URL") else "mmacalendars.com"
+_background_started = False
+_background_lock = threading.Lock()
+
+
+@app.before_request
+def start_background_work():
+    """Start the refresh scheduler and stats ticker on the first request.
+
+    Importing this module only reads the calendars already on disk, so a worker
+    boots without touching the network and serves the last good calendar while
+    the first refresh runs in the background.
+    """
+    global _background_started  # pylint: disable=global-statement
+    if _background_started:
+        return
+    with _background_lock:
+        if not _background_started:
+            scheduler.start()
+            cache_manager.stats.start(heartbeat_service="backend")
+            _background_started = True
+
+
+@app.before_request
+def start_request_timer():
+    """Note when the request started, for its latency metric"""
+    g.request_start = time.perf_counter()
+
+
+@app.after_request
+def record_request_metrics(response: Response) -> Response:
+    """Record the latency and body size of the request, by route.
+
+    Requests are labelled by their URL rule rather than their path, so that
+    unknown paths do not add a series each.
+    """
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    start = g.get("request_start", time.perf_counter())
+    global_metrics.request_seconds.observe(
+        time.perf_counter() - start,
+        route=route,
+        method=request.method,
+        status=str(response.status_code),
+    )
+    global_metrics.response_bytes.observe(
+        response.calculate_content_length() or 0, route=route
+    )
+    return response
+
+
+def serve_calendar(name: str):
+    """Serve the last good calendar without waiting on a refresh.
+
+    A stale calendar only wakes its background refresh; until that finishes the
+    previous calendar is served. The body comes pre-rendered and pre-compressed
+    from memory, and a matching If-None-Match is answered with 304.
+
+    The ``part``, ``fighter``, ``from``, ``to`` and ``days`` arguments select a
+    filtered view of the calendar (see ``CalendarQuery``), e.g.
+    ``/ufc?part=main-card`` or ``/onefccalendar?fighter=rodtang&days=30``.
+    """
+    calendar = scheduler.calendars[name]
+    scheduler.refresh_if_stale(name)
+    if "onefccalendar" in request.host:
+        return send_file(one_fc_calendar.add_ofc_domain_expiration(calendar.file_path))
+
+    try:
+        query = CalendarQuery.from_args(request.args)
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    rendered = calendar.get_view(query)
+    encoding = request.accept_encodings.best_match(rendered.encodings, "identity")
+    etag = rendered.etag(encoding)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(rendered.variants[encoding], mimetype="text/calendar")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+@app.route("/mma")
+def direct_combined_url():
+    """Send one ICS file with the events of several leagues.
+
+    ``leagues`` picks the calendars to merge, e.g. ``/mma?leagues=ufc,onefc``;
+    all of them by default. A calendar that changed since it was last served
+    is streamed while the leagues are merged, later requests get the kept
+    body, compressed like the league calendars.
+    """
+    try:
+        leagues = combined_calendar.leagues(request.args.get("leagues"))
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    for name in leagues:
+        scheduler.refresh_if_stale(name)
+
+    rendered = combined_calendar.get_rendered(leagues)
+    encodings = rendered.encodings if rendered is not None else ["identity"]
+    encoding = request.accept_encodings.best_match(encodings, "identity")
+    etag = combined_calendar.etag(leagues, encoding)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif rendered is None:
+        response = Response(
+            combined_calendar.stream(leagues), mimetype="text/calendar"
+        )
+    else:
+        response = Response(rendered.variants[encoding], mimetype="text/calendar")
+        if encoding != "identity":
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+@app.route("/mma/apple")
+def subscribe_to_combined_calendar_apple():
+    """Open subscription link for native calendar apps"""
+    return redirect(f"webcal://{url}/mma")
+
+
+@app.route("/mma/google")
+def subscribe_to_combined_calendar_google():
+    """Open subscription link in Google Calendar"""
+    return redirect(f"https://calendar.google.com/calendar/r?cid=http://{url}/mma")
 
 
 @app.route("/onefccalendar")
 def direct_ofc_url():
     """Send ICS file to client"""
-    file_path = one_fc_calendar.update_calendar()
-    if "onefccalendar" in request.host:
-        file_path = one_fc_calendar.add_ofc_domain_expiration(file_path)
-    return send_file(file_path)
+    return serve_calendar("onefc")
 
 
 @app.route("/ufc")
 def direct_ufc_url():
     """Send UFC ICS file to client"""
-    file_path = ufc_calendar.update_calendar()
-    if "onefccalendar" in request.host:
-        file_path = one_fc_calendar.add_ofc_domain_expiration(file_path)
-    return send_file(file_path)
+    return serve_calendar("ufc")
 
 
 @app.route("/ufc/apple")
@@ -58,13 +196,51 @@ def subscribe_to_calendar_google():
     )
 
 
+@app.route("/api/<name>/events")
+def events_api(name: str):
+    """Return a league's events as JSON, a page at a time or as changes.
+
+    Without ``since``, events are listed by start time, ``limit`` per page;
+    the ``next_cursor`` of a page is passed as ``cursor`` to get the next one.
+    Each listing also returns a ``sync_token``: passing it as ``since`` later
+    returns only the events added, changed or removed after it, and a new
+    token. A token too old for the kept change log gets a 410, after which the
+    events must be listed again.
+    """
+    if name not in scheduler.calendars:
+        return jsonify({"error": f"Unknown league {name}"}), 404
+    calendar = scheduler.calendars[name]
+    scheduler.refresh_if_stale(name)
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        if (since := request.args.get("since")) is not None:
+            return jsonify(
+                sync_events(
+                    calendar.repository,
+                    calendar.league,
+                    parse_sync_token(since),
+                    limit,
+                )
+            )
+        return jsonify(
+            list_events(
+                calendar.repository, calendar.league, request.args.get("cursor"), limit
+            )
+        )
+    except SyncTokenExpired as error:
+        return jsonify({"error": str(error)}), 410
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+
+
 @app.route("/cache")
 def cache_status():
-    """Return cache status information"""
+    """Return cache status information, served from memory"""
     cache_info = cache_manager.get_cache_info()
     return jsonify({
         "cache_info": cache_info,
         "is_fresh": cache_manager.is_cache_fresh(),
+        "refresh": scheduler.status(),
         "timestamp": datetime.now().isoformat()
     })
 
@@ -78,16 +254,30 @@ def clear_cache():
 
 @app.route("/stats")
 def scraping_stats():
-    """Return 30-day scraping statistics"""
+    """Return 30-day scraping statistics, served from memory.
+
+    The backend heartbeat is recorded by the stats background ticker, so polling
+    this endpoint never writes to disk. ``upstream`` has the circuit breaker
+    state and rate limit delays of each scraped host.
+    """
     stats = cache_manager.get_scraping_stats()
-    # Heartbeat for backend
-    cache_manager.update_service_stats("backend", True)
     return jsonify({
         "stats": stats,
+        "upstream": global_http_client.throttle.status(),
         "timestamp": datetime.now().isoformat()
     })
 
 
+@app.route("/metrics")
+def metrics():
+    """Return refresh, scraper and request metrics in the Prometheus text format.
+
+    Every value is kept in memory by this worker, so a scrape never touches
+    the disk or the network.
+    """
+    return Response(global_metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/")
 def home():
     """Return simple JSON response for API health check"""
@@ -97,9 +287,12 @@ def home():
         "endpoints": {
             "ufc": "/ufc",
             "onefc": "/onefccalendar",
+            "combined": "/mma",
+            "events": "/api/<league>/events",
             "cache": "/cache",
             "cache_clear": "/cache/clear",
-            "stats": "/stats"
+            "stats": "/stats",
+            "metrics": "/metrics"
         }
     }
 
@@ -0,0 +1,233 @@
+"""In-memory counters and histograms, exposed in the Prometheus text format"""
+
+import os
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+# Seconds, from a fast page fetch up to a slow full refresh
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+# Bytes, from a 304 up to a full calendar
+SIZE_BUCKETS = tuple(float(256 * 4**power) for power in range(9))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric(metaclass=ABCMeta):
+    """A named metric with one series per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labels: tuple[str, ...]) -> None:
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labels)
+
+    @abstractmethod
+    def samples(self, **constant: str) -> Iterator[str]:
+        """Exposition lines of every series, with ``constant`` labels added."""
+
+    def render(self, **constant: str) -> str:
+        """The metric in the Prometheus text exposition format.
+
+        Args:
+            **constant: Labels added to every series, such as ``pid``.
+        """
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+            *self.samples(**constant),
+        ]
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    """Value that only goes up, such as bytes downloaded."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels=()) -> None:
+        super().__init__(name, description, tuple(labels))
+        self._values: Dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Add ``amount`` to the series with these labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        """Current value of the series with these labels."""
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self, **constant: str) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            labels = _labels(self.labels, key, **constant)
+            yield f"{self.name}{labels} {_number(value)}"
+
+
+class Gauge(Counter):
+    """Value that is set, such as the number of stored events."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the series with these labels to ``value``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, description: str, labels=(), buckets=TIME_BUCKETS
+    ) -> None:
+        super().__init__(name, description, tuple(labels))
+        self.buckets = tuple(buckets)
+        # Per series: count per bucket (plus +Inf), sum of values
+        self._series: Dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Count ``value`` in the series with these labels."""
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._series.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the seconds spent in the block, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: str) -> int:
+        """Number of values observed in the series with these labels."""
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self, **constant: str) -> Iterator[str]:
+        with self._lock:
+            series = sorted(
+                (key, list(counts), total[0])
+                for key, (counts, total) in self._series.items()
+            )
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = bound if isinstance(bound, str) else _number(bound)
+                labels = _labels(self.labels, key, **constant, le=le)
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _labels(self.labels, key, **constant)
+            yield f"{self.name}_sum{labels} {_number(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Metrics:
+    """Every metric the backend records, kept in memory by each worker.
+
+    Recording is a dictionary update under a lock, so it is cheap enough for
+    every fetch and request, and nothing is written to disk. ``render``
+    produces the body of the ``/metrics`` endpoint.
+
+    Each gunicorn worker counts on its own, and a scrape of ``/metrics`` is
+    answered by whichever worker gets it. Every series is therefore labelled
+    with the ``pid`` of its worker: each worker's counters only go up, and
+    queries aggregate across workers with ``sum without (pid)``.
+    """
+
+    def __init__(self) -> None:
+        self.refresh_seconds = Histogram(
+            "calendar_refresh_seconds",
+            "Duration of calendar refreshes that scraped.",
+            ("league", "result"),
+        )
+        self.refresh_phase_seconds = Histogram(
+            "calendar_refresh_phase_seconds",
+            "Duration of each phase of update_calendar.",
+            ("league", "phase"),
+        )
+        self.parse_seconds = Histogram(
+            "scraper_parse_seconds",
+            "Time to parse and extract one event page.",
+            ("league",),
+        )
+        self.fetch_seconds = Histogram(
+            "scraper_fetch_seconds",
+            "Latency of each upstream request.",
+            ("host", "status"),
+        )
+        self.downloaded_bytes = Counter(
+            "scraper_downloaded_bytes_total",
+            "Body bytes received from upstream.",
+            ("host",),
+        )
+        self.events_upserted = Counter(
+            "calendar_events_upserted_total",
+            "Scraped events merged into the calendar.",
+            ("league",),
+        )
+        self.events_stored = Gauge(
+            "calendar_events",
+            "Events in the calendar after the last refresh.",
+            ("league",),
+        )
+        self.request_seconds = Histogram(
+            "http_request_seconds",
+            "Latency of requests to the backend, by route.",
+            ("route", "method", "status"),
+        )
+        self.response_bytes = Histogram(
+            "http_response_bytes",
+            "Size of response bodies, by route.",
+            ("route",),
+            buckets=SIZE_BUCKETS,
+        )
+
+    def __iter__(self) -> Iterator[Metric]:
+        return (value for value in vars(self).values() if isinstance(value, Metric))
+
+    def render(self) -> str:
+        """All metrics of this worker in the Prometheus text exposition format."""
+        pid = str(os.getpid())
+        return "".join(metric.render(pid=pid) for metric in self)
+
+
+# Shared global instance
+global_metrics = Metrics()
@@ -1,24 +1,37 @@
-from pathlib import Path
-import requests
-from bs4 import BeautifulSoup
+# pylint: disable=import-outside-toplevel
+from __future__ import annotations
+
 from datetime import datetime, timedelta
-from backend.calendar_control import CalendarControl, Event, global_cache_manager
+from typing import TYPE_CHECKING
+from backend.calendar_control import CalendarControl
+from backend.extraction import onefc_fighters, parse_onefc_event
+from backend.parsing import PageRegions
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from ics import Event
 
 
 class OneFcCalendar(CalendarControl):
     """Fetch event data and build calendar for One FC Schedule"""
 
+    calendar_file_name = "onefc.ics"
+    listing_regions = PageRegions(ids=frozenset({"upcoming-events-section"}))
+    document_regions = PageRegions(
+        classes=frozenset(
+            {"info-content", "status-countdown", "editor-content", "versus"}
+        )
+    )
+
     def get_event_links(self) -> list[str]:
         """Find all the upcoming event links
 
         Returns:
             List[str]: List of all upcoming event URL's
         """
-        soup = BeautifulSoup(
-            requests.get(
-                "https://www.onefc.com/events/",
-            ).content,
-            features="html.parser",
+        soup = self.parse_html(
+            self.fetch_page("https://www.onefc.com/events/").content,
+            self.listing_regions,
         )
         return [
             event["href"]
@@ -36,88 +49,54 @@ class OneFcCalendar(CalendarControl):
         Returns:
             list[str]: List of the fighters found on the page.
         """
-        # TODO: Figure out how to get the type of fight/event. I.E. Muay Tai, MMA, Kickboxing
-        return [
-            fighter.string.strip()
-            for fighter in soup.find_all("div", {"class": "versus"})
-        ]
+        return onefc_fighters(soup)
 
-    def get_event_description(self, soup: BeautifulSoup, url: str) -> str:
+    def get_event_description(self, url: str) -> str:
         """Create the event description based on available data from the page.
 
         Args:
-            soup (BeautifulSoup): Event HTML.
             url (str): URL of the event
 
         Returns:
             str: Description of the even with the fighters if available.
         """
-        if event_description := soup.select_one("div.editor-content p"):
-            event_description = event_description.get_text(strip=True)
-        fighters = "\n".join(
-            self.get_fighters_for_part(
-                BeautifulSoup(requests.get(url).content, features="html.parser")
-            )
-        )
-
-        if event_description:
-            return f"{event_description}\n\n{fighters}"
-
-        return "Coming Soon..."
+        return self.parse_page(url, parse_onefc_event).description
 
     def get_event_from_url(self, url: str) -> Event:
         """Get the event data from the individual event URL
 
+        The page is parsed in the parse pool; only its details come back.
+
         Args:
             url (str): URL to individual event page
 
         Returns:
             Event: Event for the calendar with all available details
         """
-        event_soup = BeautifulSoup(requests.get(url).content, features="html.parser")
-        event_title = event_soup.select_one("div.info-content h3").get_text(strip=True)
-        event_id = event_soup.find(attrs={"class", "status-countdown"})["data-id"]
-        event_data = requests.get(
-            f"https://www.onefc.com/wp-json/public/v2/events/{event_id}",
-        ).json()
+        from ics import Event
+
+        page = self.parse_page(url, parse_onefc_event)
+        event_data = self.get_json(
+            f"https://www.onefc.com/wp-json/public/v2/events/{page.event_id}"
+        )
         start_offset_sec = event_data["utc_start"]
         start_time = datetime.fromtimestamp(start_offset_sec)
 
         return Event(
-            name=event_title,
-            description=self.get_event_description(event_soup, url),
+            name=page.title,
+            description=page.description,
             begin=start_time,
             end=(start_time + timedelta(hours=3)),
             url=url,
         )
 
-    def update_calendar(self) -> Path:
-        """Update the calendar file with the latest details
+    def get_events_from_url(self, url: str) -> list[Event]:
+        """Get the event for a URL as a list, the shape ``scrape_all`` expects.
+
+        Args:
+            url (str): URL to individual event page
 
         Returns:
-            Path: Calendar file location the serve to the client
+            list[Event]: The single event scheduled at the URL.
         """
-        file_path = Path(__file__).parent.resolve() / "data/onefc.ics"
-        if not self.time_to_update():
-            return file_path
-        self.log.info("Starting calendar update")
-        success = True
-        try:
-            for url in self.get_event_links():
-                event = self.get_event_from_url(url)
-                self.update_existing_event(event)
-            with open(file_path, "w", encoding="UTF-8") as calendar_file:
-                calendar_file.writelines(self.event_calendar)
-            events_count = len(self.event_calendar.events)
-            self.log.info(
-                f"Writing out {events_count} events on calendar to {file_path}"
-            )
-            self.last_update = datetime.now(tz=self.UTC)
-            global_cache_manager.update_service_stats("onefc", True, events_count=events_count)
-        except Exception:
-            success = False
-            global_cache_manager.update_service_stats("onefc", False)
-            raise
-        finally:
-            global_cache_manager.update_service_stats("backend", success)
-        return file_path
+        return [self.get_event_from_url(url)]
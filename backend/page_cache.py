@@ -0,0 +1,96 @@
+"""On-disk cache of upstream responses used for conditional requests"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict
+
+
+@dataclass
+class CachedPage:
+    """Body of an upstream page and the validators it was served with.
+
+    ``status`` is the HTTP status of the answer; pages read from the cache and
+    revalidated with a 304 keep the 200 they were stored with.
+    """
+
+    url: str
+    content: bytes
+    etag: str | None = None
+    last_modified: str | None = None
+    not_modified: bool = False
+    status: int = 200
+
+    def validators(self) -> Dict[str, str]:
+        """Request headers that turn a GET for this page into a conditional GET."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PageCache:
+    """Store response bodies and their ETag/Last-Modified validators by URL.
+
+    Each URL is kept as a ``<sha256>.body`` file next to a ``<sha256>.json`` file
+    with its validators. Both are written to a temporary file first and renamed
+    into place, so a reader never sees a partially written entry.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    def get(self, url: str) -> CachedPage | None:
+        """Return the cached page for ``url``, or None if it was never stored."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            content = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        return CachedPage(
+            url=url,
+            content=content,
+            etag=meta.get("etag"),
+            last_modified=meta.get("last_modified"),
+        )
+
+    def put(
+        self,
+        url: str,
+        content: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> CachedPage:
+        """Store ``content`` for ``url``. Pages without validators are not written."""
+        page = CachedPage(url, content, etag=etag, last_modified=last_modified)
+        if not (etag or last_modified):
+            return page
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta_path, body_path = self._paths(url)
+        self._write_atomic(body_path, content)
+        meta = {"url": url, "etag": etag, "last_modified": last_modified}
+        self._write_atomic(meta_path, json.dumps(meta).encode())
+        return page
+
+    def clear(self) -> None:
+        """Remove every cached page."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path = path.with_name(f"{path.name}.{suffix}")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,91 @@
+"""Process pool that parses pages off the worker serving subscribers"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Callable, Iterator, TypeVar
+
+R = TypeVar("R")
+
+
+class ParsePool:
+    """Run CPU-bound page parsing in separate processes during a refresh.
+
+    Fetch threads hand raw page bytes to ``run``, which parses them in a pool
+    process and returns plain records. While one page is parsed the thread's
+    siblings keep downloading, so fetching, parsing and merging overlap and
+    parsing uses every core instead of the GIL of the serving worker.
+
+    The pool is started when the first ``session`` opens and stopped when the
+    last one closes, so no idle processes are kept between refreshes. Pool
+    processes are spawned rather than forked, which is safe in a threaded
+    worker. With ``max_workers`` set to 0, or if the pool breaks, pages are
+    parsed in the calling thread instead.
+
+    The pool size can be overridden with the ``SCRAPER_PARSE_WORKERS``
+    environment variable.
+    """
+
+    def __init__(self, max_workers: int | None = None) -> None:
+        if max_workers is None:
+            max_workers = int(
+                os.getenv("SCRAPER_PARSE_WORKERS", min(4, os.cpu_count() or 1))
+            )
+        self.max_workers = max_workers
+        self.log = logging.getLogger(__name__)
+        self._executor: ProcessPoolExecutor | None = None
+        self._sessions = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def session(self) -> Iterator[None]:
+        """Keep the pool running while the block runs, e.g. for one refresh."""
+        with self._lock:
+            self._sessions += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._sessions -= 1
+                executor = self._executor if not self._sessions else None
+                if executor is not None:
+                    self._executor = None
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def _get_executor(self) -> ProcessPoolExecutor | None:
+        with self._lock:
+            if self.max_workers <= 0 or not self._sessions:
+                return None
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def run(self, func: Callable[..., R], *args) -> R:
+        """Call ``func(*args)`` in a pool process and return its result.
+
+        ``func`` and its arguments must be picklable. Outside a ``session`` the
+        call runs in the calling thread.
+        """
+        executor = self._get_executor()
+        if executor is None:
+            return func(*args)
+        try:
+            return executor.submit(func, *args).result()
+        except BrokenProcessPool:
+            self.log.warning("Parse pool broke, parsing in the worker instead")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            return func(*args)
+
+
+# Shared global instance
+global_parse_pool = ParsePool()
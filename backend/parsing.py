@@ -0,0 +1,119 @@
+# pylint: disable=import-outside-toplevel
+"""Pluggable HTML parser backend for the scrapers"""
+
+from __future__ import annotations
+
+import importlib.util
+import os
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Mapping
+
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+@dataclass(frozen=True)
+class PageRegions:
+    """Subtrees of a page the scrapers read; the rest is skipped while parsing.
+
+    A top-level element is kept, with everything inside it, when its tag name,
+    id or one of its classes is listed. Selectors that run on the parsed page
+    must only depend on elements inside these subtrees.
+    """
+
+    tags: frozenset[str] = frozenset()
+    ids: frozenset[str] = frozenset()
+    classes: frozenset[str] = frozenset()
+
+    def matches(self, name: str, attrs: Mapping[str, Any] | None) -> bool:
+        """Whether a tag with this name and these attributes starts a kept subtree."""
+        if name in self.tags:
+            return True
+        if not attrs:
+            return False
+        if attrs.get("id") in self.ids:
+            return True
+        classes = attrs.get("class") or ()
+        if isinstance(classes, str):
+            classes = classes.split()
+        return not self.classes.isdisjoint(classes)
+
+    def strainer(self) -> Any:
+        """Filter for ``BeautifulSoup(parse_only=...)`` that keeps these subtrees."""
+        try:
+            from bs4.filter import ElementFilter
+        except ImportError:  # beautifulsoup4 < 4.13
+            from bs4 import SoupStrainer
+
+            return SoupStrainer(self.matches)
+
+        regions = self
+
+        class RegionFilter(ElementFilter):
+            """Only create the kept subtrees."""
+
+            def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+                return regions.matches(name, attrs)
+
+            def allow_string_creation(self, string) -> bool:
+                # Only reached for text outside every kept subtree
+                return False
+
+        return RegionFilter()
+
+
+def default_features() -> str:
+    """The fastest tree builder installed: lxml if available, else html.parser."""
+    return "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+
+class HtmlParser:
+    """Parse page markup with a configurable tree builder.
+
+    ``lxml`` is a C parser several times faster than the pure Python
+    ``html.parser``, which is used when lxml is not installed. With regions,
+    only the subtrees the scrapers read are built, which saves most of the
+    time and memory of building the full tree.
+
+    Settings can be overridden with the ``SCRAPER_HTML_PARSER`` (a
+    BeautifulSoup feature such as ``lxml`` or ``html.parser``) and
+    ``SCRAPER_PARTIAL_PARSING`` (``0`` to always build the full tree)
+    environment variables.
+    """
+
+    def __init__(self, features: str | None = None, partial: bool | None = None):
+        self.features = features or os.getenv("SCRAPER_HTML_PARSER") or (
+            default_features()
+        )
+        if partial is None:
+            partial = os.getenv("SCRAPER_PARTIAL_PARSING", "1") != "0"
+        self.partial = partial
+        self._strainers: dict[PageRegions, Any] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        # Strainers are rebuilt on demand, so parsers can be sent to parse processes
+        return {**self.__dict__, "_strainers": {}}
+
+    def parse(
+        self, content: bytes, regions: PageRegions | None = None
+    ) -> BeautifulSoup:
+        """Parse markup, building only ``regions`` when partial parsing is on.
+
+        Args:
+            content (bytes): Page markup.
+            regions (PageRegions | None): Subtrees to keep, or None for the full tree.
+
+        Returns:
+            BeautifulSoup: Parsed markup.
+        """
+        from bs4 import BeautifulSoup
+
+        parse_only = None
+        if regions is not None and self.partial:
+            parse_only = self._strainers.get(regions)
+            if parse_only is None:
+                parse_only = self._strainers.setdefault(regions, regions.strainer())
+        return BeautifulSoup(content, features=self.features, parse_only=parse_only)
+
+
+global_html_parser = HtmlParser()
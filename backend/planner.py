@@ -0,0 +1,86 @@
+"""Choose the event pages a refresh fetches from their history"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable
+
+
+class RefreshPlanner:
+    """Decide which event pages to fetch, from when they were last fetched and changed.
+
+    Listing pages are fetched on every refresh; this only plans the event
+    pages they link to. A page is fetched when:
+
+    * it was never fetched, or no event was stored from it;
+    * its event starts within ``tiers[0]`` (fight week) or is underway,
+      which is every refresh;
+    * otherwise, when its last fetch is older than the interval of its tier:
+      the further away the event, the longer the interval. The interval is
+      halved for pages that changed within it.
+
+    Events of pages that are not fetched stay in the repository as they are.
+    Planning can be turned off with ``SCRAPER_REFRESH_PLANNING=0``, so that
+    every listed page is fetched on each refresh.
+    """
+
+    # (events starting within, fetch at most every), nearest first
+    tiers = (
+        (timedelta(days=7), timedelta(0)),
+        (timedelta(days=30), timedelta(days=3)),
+    )
+    distant_interval = timedelta(days=7)
+    # Refreshes run on a timer, so a page due a little after one is fetched in it
+    slack = timedelta(hours=1)
+
+    def __init__(self, enabled: bool | None = None) -> None:
+        if enabled is None:
+            enabled = os.getenv("SCRAPER_REFRESH_PLANNING", "1") != "0"
+        self.enabled = enabled
+
+    def interval(self, history: Dict[str, Any], now: datetime) -> timedelta:
+        """How long a page's events may go unchecked, given its history."""
+        begin = datetime.fromisoformat(history["begin_at"])
+        end = datetime.fromisoformat(history["end_at"])
+        interval = self.distant_interval
+        if end >= now - timedelta(days=1):
+            for horizon, tier_interval in self.tiers:
+                if begin - now <= horizon:
+                    interval = tier_interval
+                    break
+        changed_at = datetime.fromisoformat(history["changed_at"])
+        if history["change_count"] and now - changed_at < interval:
+            interval /= 2
+        return interval
+
+    def is_due(self, history: Dict[str, Any] | None, now: datetime) -> bool:
+        """Whether a page with this history (None if never fetched) is due."""
+        if not self.enabled or history is None or history["begin_at"] is None:
+            return True
+        fetched_at = datetime.fromisoformat(history["fetched_at"])
+        return now - fetched_at + self.slack >= self.interval(history, now)
+
+    def plan(
+        self,
+        urls: Iterable[str],
+        history: Dict[str, Dict[str, Any]],
+        now: datetime | None = None,
+    ) -> tuple[list[str], list[str]]:
+        """Split listed event URLs into the ones to fetch and the ones to skip.
+
+        Args:
+            urls (Iterable[str]): Event URLs found on the listing pages.
+            history (Dict[str, Dict[str, Any]]): ``EventRepository.page_history``.
+            now (datetime | None): Time of the refresh, defaults to now.
+
+        Returns:
+            tuple[list[str], list[str]]: URLs due, and URLs skipped, in input order.
+        """
+        now = now or datetime.now(tz=timezone.utc)
+        due, skipped = [], []
+        for url in urls:
+            (due if self.is_due(history.get(url), now) else skipped).append(url)
+        return due, skipped
+
+
+# Shared global instance
+global_refresh_planner = RefreshPlanner()
@@ -0,0 +1,162 @@
+"""Rendered ICS bodies kept in memory with compressed variants"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from ics import Event
+
+try:
+    import brotli
+except ImportError:  # brotli is an optional dependency
+    brotli = None
+
+
+# The calendar header written by ``ics.Calendar().serialize()``, kept here so
+# rendering stored fragments does not need to import ics.
+CALENDAR_HEADER = (
+    "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:ics.py - http://git.io/lLljaA\r\n"
+)
+
+
+def render_fragments(fragments: Iterable[str]) -> bytes:
+    """Join serialized VEVENTs, already in calendar order, into an ICS calendar."""
+    body = [CALENDAR_HEADER]
+    for fragment in fragments:
+        body.append(fragment)
+        body.append("\r\n")
+    body.append("END:VCALENDAR")
+    return "".join(body).encode("UTF-8")
+
+
+def content_hash(event: Event) -> str | None:
+    """Hash of everything that ends up in the event's VEVENT block, but its UID.
+
+    ics makes up a new UID every time an event is parsed, so the UID is left
+    out: the same event scraped again, by another worker or after a restart,
+    hashes the same.
+
+    Returns:
+        str | None: Hex digest, or None for events with alarms, attendees or
+        extra properties, which are always serialized from scratch.
+    """
+    if event.alarms or event.attendees or event.extra:
+        return None
+    fields = (
+        event.name,
+        event.begin,
+        event._begin_precision,  # pylint: disable=protected-access
+        event._end_time,  # pylint: disable=protected-access
+        event._duration,  # pylint: disable=protected-access
+        event.description,
+        event.location,
+        event.url,
+        event.created,
+        event.last_modified,
+        event.transparent,
+        event.status,
+        event.classification,
+        event.geo,
+        event.organizer,
+        sorted(event.categories),
+    )
+    return hashlib.sha256(repr(fields).encode()).hexdigest()
+
+
+class FragmentCache:
+    """Serialized VEVENT blocks keyed by the UID and content hash of their event.
+
+    Hashing an event's fields is far cheaper than serializing it, so an event
+    is only serialized again when it was added or changed. Fragments not used
+    since the previous ``sweep`` are dropped by the next one.
+    """
+
+    def __init__(self) -> None:
+        self._fragments: dict[str, str] = {}
+        self._used: set[str] = set()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def serialize(self, event: Event) -> tuple[str | None, str]:
+        """Content hash and VEVENT block for ``event``, serializing only on a miss."""
+        digest = content_hash(event)
+        # The fragment holds the UID, which the content hash leaves out
+        key = f"{event.uid}:{digest}" if digest is not None else None
+        with self._lock:
+            fragment = self._fragments.get(key) if key is not None else None
+            if fragment is not None:
+                self.hits += 1
+                self._used.add(key)
+                return digest, fragment
+            self.misses += 1
+        fragment = event.serialize()
+        if key is not None:
+            with self._lock:
+                self._fragments[key] = fragment
+                self._used.add(key)
+        return digest, fragment
+
+    def sweep(self) -> None:
+        """Drop fragments not used since the last sweep and reset the counters."""
+        with self._lock:
+            self._fragments = {
+                key: fragment
+                for key, fragment in self._fragments.items()
+                if key in self._used
+            }
+            self._used = set()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._fragments)
+
+
+def render_calendar(
+    events: Iterable[Event], cache: FragmentCache | None = None
+) -> bytes:
+    """Serialize events into an ICS calendar with a stable event order.
+
+    Events are sorted by start time and name so an unchanged calendar always
+    renders to the same bytes, which keeps its ETag stable between refreshes.
+    With a ``cache``, unchanged events reuse their serialized fragment.
+    """
+    events = sorted(events, key=lambda event: (event.begin, event.name or ""))
+    if cache is None:
+        return render_fragments(event.serialize() for event in events)
+    return render_fragments(cache.serialize(event)[1] for event in events)
+
+
+class RenderedCalendar:
+    """ICS bytes ready to send, with gzip/brotli variants and strong ETags.
+
+    Compression happens once when the calendar changes, so serving a poll is a
+    header comparison or a write of bytes already in memory.
+    """
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self.variants: dict[str, bytes] = {"identity": body}
+        self.variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body, mode=brotli.MODE_TEXT)
+
+    @property
+    def encodings(self) -> list[str]:
+        """Content codings available, preferred first."""
+        return [
+            encoding
+            for encoding in ("br", "gzip", "identity")
+            if encoding in self.variants
+        ]
+
+    def etag(self, encoding: str = "identity") -> str:
+        """Strong ETag (unquoted) for the given content coding."""
+        if encoding == "identity":
+            return self.digest
+        return f"{self.digest}-{encoding}"
@@ -0,0 +1,178 @@
+"""Record and replay upstream HTTP traffic, for offline tests and benchmarks"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Response headers worth keeping in a recording
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+@dataclass
+class RecordedResponse:
+    """One upstream response: status, the headers that matter and the body."""
+
+    status: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def etag(self) -> str:
+        """The recorded ETag, or one derived from the body."""
+        return self.headers.get(
+            "ETag", f'"{hashlib.sha256(self.content).hexdigest()[:16]}"'
+        )
+
+
+class Recording:
+    """Responses by URL, stored as plain files in a directory.
+
+    ``index.json`` maps each URL to the file holding its body, its status and
+    headers, so recorded pages can be read and edited by hand and several
+    URLs can share a body file.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self._responses: Dict[str, RecordedResponse] = {}
+        self._files: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        index = self.directory / "index.json"
+        if index.exists():
+            for url, entry in json.loads(index.read_text()).items():
+                self._files[url] = entry["file"]
+                self._responses[url] = RecordedResponse(
+                    status=entry.get("status", 200),
+                    content=(self.directory / entry["file"]).read_bytes(),
+                    headers=entry.get("headers", {}),
+                )
+
+    def get(self, url: str) -> RecordedResponse | None:
+        """The recorded response for ``url``, or None if it was not recorded."""
+        return self._responses.get(url)
+
+    def add(self, url: str, response: RecordedResponse) -> None:
+        """Record a response and write it, with the updated index, to disk."""
+        with self._lock:
+            file = self._files.get(url) or self._file_name(url)
+            self._files[url] = file
+            self._responses[url] = response
+            self.directory.mkdir(parents=True, exist_ok=True)
+            (self.directory / file).write_bytes(response.content)
+            index = {
+                url: {
+                    "file": self._files[url],
+                    "status": recorded.status,
+                    "headers": recorded.headers,
+                }
+                for url, recorded in sorted(self._responses.items())
+            }
+            (self.directory / "index.json").write_text(
+                json.dumps(index, indent=2) + "\n"
+            )
+
+    def _file_name(self, url: str) -> str:
+        slug = re.sub(r"[^a-z0-9]+", "_", url.lower().split("://", 1)[-1])
+        digest = hashlib.sha256(url.encode()).hexdigest()[:8]
+        return f"{slug.strip('_')[:60]}_{digest}.body"
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter that answers requests from a recording, without network.
+
+    Unrecorded URLs get a 404. Conditional requests whose ``If-None-Match``
+    matches the recorded ETag get a 304, like a real server. Every request
+    can be delayed by ``latency`` seconds plus up to ``jitter`` seconds, to
+    model a remote site.
+
+    ``recording`` is anything with a ``get(url)`` returning a
+    ``RecordedResponse`` or None, so responses can also be generated.
+    """
+
+    def __init__(
+        self, recording, latency: float = 0.0, jitter: float = 0.0
+    ) -> None:
+        super().__init__()
+        self.recording = recording
+        self.latency = latency
+        self.jitter = jitter
+
+    def send(  # pylint: disable=unused-argument,too-many-arguments
+        self,
+        request: PreparedRequest,
+        stream=False,
+        timeout=None,
+        verify=True,
+        cert=None,
+        proxies=None,
+    ) -> Response:
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+        recorded = self.recording.get(request.url)
+        response = Response()
+        response.request = request
+        response.url = request.url
+        response.reason = ""
+        if recorded is None:
+            response.status_code = 404
+            response._content = b""
+        elif request.headers.get("If-None-Match") == recorded.etag:
+            response.status_code = 304
+            response._content = b""
+            response.headers = CaseInsensitiveDict({"ETag": recorded.etag})
+        else:
+            response.status_code = recorded.status
+            response._content = recorded.content
+            response.headers = CaseInsensitiveDict(
+                {**recorded.headers, "ETag": recorded.etag}
+            )
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Transport adapter that sends requests upstream and records the answers.
+
+    Validators are dropped from the requests, so every page comes back, and
+    is recorded, in full rather than as a 304.
+    """
+
+    def __init__(self, recording: Recording, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.recording = recording
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        for header in ("If-None-Match", "If-Modified-Since"):
+            request.headers.pop(header, None)
+        response = super().send(request, **kwargs)
+        self.recording.add(
+            request.url,
+            RecordedResponse(
+                status=response.status_code,
+                content=response.content,
+                headers={
+                    name: response.headers[name]
+                    for name in RECORDED_HEADERS
+                    if name in response.headers
+                },
+            ),
+        )
+        return response
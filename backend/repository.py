@@ -0,0 +1,556 @@
+"""SQLite repository for events, scrape runs and per-URL metadata"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator
+
+from backend.fingerprints import FingerprintStore
+from backend.locks import FileLock
+
+if TYPE_CHECKING:
+    from ics import Event
+
+    from backend.page_cache import CachedPage
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    league TEXT NOT NULL,
+    uid TEXT NOT NULL,
+    name TEXT,
+    begin_at TEXT NOT NULL,
+    end_at TEXT,
+    url TEXT,
+    description TEXT,
+    fragment TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_begin ON events (league, begin_at);
+CREATE INDEX IF NOT EXISTS events_by_name ON events (league, name);
+CREATE INDEX IF NOT EXISTS events_by_time ON events (league, begin_at, end_at);
+CREATE TABLE IF NOT EXISTS leagues (
+    league TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scrape_runs (
+    id INTEGER PRIMARY KEY,
+    league TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    status TEXT NOT NULL,
+    events_count INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS scrape_runs_by_league ON scrape_runs (league, status, id);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    league TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fingerprint TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    changed_at TEXT NOT NULL,
+    change_count INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# Applied in order; ``PRAGMA user_version`` records how many have run.
+MIGRATIONS = (
+    SCHEMA,
+    "ALTER TABLE events ADD COLUMN content_hash TEXT;",
+    "CREATE INDEX IF NOT EXISTS events_by_url ON events (league, url);",
+    """
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    league TEXT NOT NULL,
+    event_id INTEGER NOT NULL,
+    action TEXT NOT NULL,
+    changed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_by_league ON changes (league, seq);
+ALTER TABLE leagues ADD COLUMN changes_floor INTEGER NOT NULL DEFAULT 0;
+""",
+)
+
+
+def _now() -> str:
+    return datetime.now(tz=timezone.utc).isoformat()
+
+
+def _utc(value) -> str | None:
+    return value.to("utc").isoformat() if value is not None else None
+
+
+class EventRepository:
+    """Events of every league in one SQLite database shared by all workers.
+
+    The database runs in WAL mode, so any number of gunicorn workers can read
+    while the refreshing worker writes, and a restarted worker picks up the
+    events, the last scrape run and the page metadata without scraping.
+
+    Every change to a league's events bumps its ``revision``. Workers compare
+    it with the revision they last rendered, which is a primary key lookup, to
+    know when to render again.
+
+    Each thread gets its own connection, opened on first use so importing the
+    module does no I/O.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection for the calling thread, in autocommit mode."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with self._schema_lock:
+                if not self._schema_ready:
+                    self._migrate(connection)
+                    self._schema_ready = True
+            self._local.connection = connection
+            self._local.depth = 0
+        return connection
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        with FileLock(self.path.with_suffix(".lock")):
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            for number, migration in enumerate(
+                MIGRATIONS[version:], start=version + 1
+            ):
+                connection.executescript(migration)
+                connection.execute(f"PRAGMA user_version = {number}")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Group writes into one transaction; nested blocks join the outer one.
+
+        Readers in other workers see either none or all of the writes.
+        """
+        connection = self.connection
+        if self._local.depth:
+            self._local.depth += 1
+            try:
+                yield connection
+            finally:
+                self._local.depth -= 1
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    def _bump(self, connection: sqlite3.Connection, league: str) -> None:
+        connection.execute(
+            "INSERT INTO leagues (league, revision, updated_at) VALUES (?, 1, ?) "
+            "ON CONFLICT (league) DO UPDATE SET "
+            "revision = revision + 1, updated_at = excluded.updated_at",
+            (league, _now()),
+        )
+
+    def _log(
+        self, connection: sqlite3.Connection, league: str, event_id: int, action: str
+    ) -> None:
+        connection.execute(
+            "INSERT INTO changes (league, event_id, action, changed_at) "
+            "VALUES (?, ?, ?, ?)",
+            (league, event_id, action, _now()),
+        )
+
+    def revision(self, league: str) -> int:
+        """Number of changes made to the league's events, 0 if it has none yet."""
+        row = self.connection.execute(
+            "SELECT revision FROM leagues WHERE league = ?", (league,)
+        ).fetchone()
+        return row["revision"] if row else 0
+
+    def find_match(self, league: str, event: Event) -> sqlite3.Row | None:
+        """Find the stored event that ``event`` should replace.
+
+        Matches the same way as ``EventStore.find_match``: same name, or same
+        begin and end. (A matching URL and name is covered by the name.)
+        """
+        connection = self.connection
+        row = connection.execute(
+            "SELECT id, uid, content_hash FROM events "
+            "WHERE league = ? AND name IS ? LIMIT 1",
+            (league, event.name),
+        ).fetchone()
+        if row is None:
+            row = connection.execute(
+                "SELECT id, uid, content_hash FROM events "
+                "WHERE league = ? AND begin_at = ? AND end_at IS ? LIMIT 1",
+                (league, _utc(event.begin), _utc(event.end)),
+            ).fetchone()
+        return row
+
+    def upsert(
+        self,
+        league: str,
+        event: Event,
+        fragment: str | None = None,
+        content_hash: str | None = None,
+    ) -> str | None:
+        """Replace the matching event with ``event``, or add it if nothing matches.
+
+        A matching event stored with the same ``content_hash`` is left as it
+        is, so an unchanged event costs no write and does not move the revision.
+        Every write is recorded in the change log read by ``changes``. A
+        replaced event keeps its ``id``, which is how the log refers to it.
+
+        Args:
+            league (str): League the event belongs to.
+            event (Event): Event to store.
+            fragment (str | None): The event's serialized VEVENT, if already known.
+            content_hash (str | None): Hash of the event's content, from
+                ``rendering.content_hash``.
+
+        Returns:
+            str | None: UID of the event that was replaced, if any.
+        """
+        existing = self.find_match(league, event)
+        if (
+            existing is not None
+            and content_hash is not None
+            and existing["content_hash"] == content_hash
+        ):
+            return existing["uid"]
+        values = {
+            "league": league,
+            "uid": event.uid,
+            "name": event.name,
+            "begin_at": _utc(event.begin),
+            "end_at": _utc(event.end),
+            "url": event.url,
+            "description": event.description,
+            "fragment": fragment if fragment is not None else event.serialize(),
+            "content_hash": content_hash,
+            "updated_at": _now(),
+        }
+        with self.transaction() as connection:
+            existing = self.find_match(league, event)
+            if existing is None:
+                event_id = connection.execute(
+                    f"INSERT INTO events ({', '.join(values)}) "
+                    f"VALUES ({', '.join(f':{column}' for column in values)})",
+                    values,
+                ).lastrowid
+                self._log(connection, league, event_id, "added")
+            else:
+                connection.execute(
+                    "UPDATE events SET "
+                    f"{', '.join(f'{column} = :{column}' for column in values)} "
+                    "WHERE id = :id",
+                    {**values, "id": existing["id"]},
+                )
+                self._log(connection, league, existing["id"], "changed")
+            self._bump(connection, league)
+        return existing["uid"] if existing is not None else None
+
+    def delete(self, league: str, uids: Iterable[str]) -> int:
+        """Remove events by UID.
+
+        Returns:
+            int: Number of events removed.
+        """
+        uids = list(uids)
+        if not uids:
+            return 0
+        with self.transaction() as connection:
+            ids = [
+                row["id"]
+                for uid in uids
+                for row in connection.execute(
+                    "SELECT id FROM events WHERE league = ? AND uid = ?", (league, uid)
+                )
+            ]
+            connection.executemany(
+                "DELETE FROM events WHERE id = ?", [(event_id,) for event_id in ids]
+            )
+            for event_id in ids:
+                self._log(connection, league, event_id, "removed")
+            if ids:
+                self._bump(connection, league)
+        return len(ids)
+
+    def events(
+        self,
+        league: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[sqlite3.Row]:
+        """Events of a league ordered by begin and name, optionally in a date range.
+
+        Args:
+            league (str): League the events belong to.
+            start (datetime | None): Only events beginning at or after this time.
+            end (datetime | None): Only events beginning before this time.
+
+        Returns:
+            list[sqlite3.Row]: Stored events, including their rendered ``fragment``.
+        """
+        query = "SELECT * FROM events WHERE league = ?"
+        params: list[Any] = [league]
+        if start is not None:
+            query += " AND begin_at >= ?"
+            params.append(start.astimezone(timezone.utc).isoformat())
+        if end is not None:
+            query += " AND begin_at < ?"
+            params.append(end.astimezone(timezone.utc).isoformat())
+        query += " ORDER BY begin_at, COALESCE(name, '')"
+        return self.connection.execute(query, params).fetchall()
+
+    def fragments(self, league: str) -> list[str]:
+        """Serialized VEVENTs of a league in calendar order."""
+        return [
+            row["fragment"]
+            for row in self.connection.execute(
+                "SELECT fragment FROM events WHERE league = ? "
+                "ORDER BY begin_at, COALESCE(name, '')",
+                (league,),
+            )
+        ]
+
+    def iter_fragments(self, league: str) -> Iterator[sqlite3.Row]:
+        """Serialized VEVENTs of a league in calendar order, read as they are used.
+
+        Rows have ``begin_at``, ``name`` and ``fragment``, so streams of several
+        leagues can be merged without loading any of them whole.
+        """
+        yield from self.connection.execute(
+            "SELECT begin_at, name, fragment FROM events WHERE league = ? "
+            "ORDER BY begin_at, COALESCE(name, '')",
+            (league,),
+        )
+
+    def events_after(
+        self, league: str, after: tuple[str, str, int] | None, limit: int
+    ) -> list[sqlite3.Row]:
+        """A page of a league's events in calendar order, for cursor pagination.
+
+        Args:
+            league (str): League the events belong to.
+            after (tuple[str, str, int] | None): ``begin_at``, name (empty if
+                None) and ``id`` of the last event of the previous page.
+            limit (int): Most events to return.
+
+        Returns:
+            list[sqlite3.Row]: The next events, ordered by begin, name and id.
+        """
+        query = "SELECT * FROM events WHERE league = ?"
+        params: list[Any] = [league]
+        if after is not None:
+            query += " AND (begin_at, COALESCE(name, ''), id) > (?, ?, ?)"
+            params.extend(after)
+        query += " ORDER BY begin_at, COALESCE(name, ''), id LIMIT ?"
+        params.append(limit)
+        return self.connection.execute(query, params).fetchall()
+
+    def events_by_id(self, league: str, ids: Iterable[int]) -> Dict[int, sqlite3.Row]:
+        """Stored events of a league by ``id``; ids of removed events are left out."""
+        ids = list(ids)
+        if not ids:
+            return {}
+        rows = self.connection.execute(
+            f"SELECT * FROM events WHERE league = ? AND id IN "
+            f"({', '.join('?' * len(ids))})",
+            (league, *ids),
+        )
+        return {row["id"]: row for row in rows}
+
+    def sync_token(self, league: str) -> int:
+        """Sequence number of the league's latest change, 0 if it has none."""
+        row = self.connection.execute(
+            "SELECT MAX("
+            "COALESCE((SELECT MAX(seq) FROM changes WHERE league = :league), 0), "
+            "COALESCE((SELECT changes_floor FROM leagues WHERE league = :league), 0)"
+            ") AS token",
+            {"league": league},
+        ).fetchone()
+        return row["token"]
+
+    def changes_floor(self, league: str) -> int:
+        """Sync tokens below this one refer to changes that were pruned."""
+        row = self.connection.execute(
+            "SELECT changes_floor FROM leagues WHERE league = ?", (league,)
+        ).fetchone()
+        return row["changes_floor"] if row else 0
+
+    def changes(self, league: str, since: int, limit: int) -> list[sqlite3.Row]:
+        """Changes to a league's events after the sync token ``since``, oldest first.
+
+        Rows have the ``seq`` (the sync token after the change), the
+        ``event_id`` and the ``action``: ``added``, ``changed`` or ``removed``.
+        """
+        return self.connection.execute(
+            "SELECT seq, event_id, action FROM changes "
+            "WHERE league = ? AND seq > ? ORDER BY seq LIMIT ?",
+            (league, since, limit),
+        ).fetchall()
+
+    def prune_changes(self, league: str, before: datetime) -> int:
+        """Drop changes made before ``before`` and raise the league's floor.
+
+        Returns:
+            int: Number of changes dropped.
+        """
+        cutoff = before.astimezone(timezone.utc).isoformat()
+        with self.transaction() as connection:
+            row = connection.execute(
+                "SELECT MAX(seq) AS seq, COUNT(*) AS pruned FROM changes "
+                "WHERE league = ? AND changed_at < ?",
+                (league, cutoff),
+            ).fetchone()
+            if not row["pruned"]:
+                return 0
+            connection.execute(
+                "DELETE FROM changes WHERE league = ? AND seq <= ?",
+                (league, row["seq"]),
+            )
+            connection.execute(
+                "UPDATE leagues SET changes_floor = ? WHERE league = ?",
+                (row["seq"], league),
+            )
+        return row["pruned"]
+
+    def count(self, league: str) -> int:
+        """Number of events stored for a league."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM events WHERE league = ?", (league,)
+        ).fetchone()[0]
+
+    def start_run(self, league: str) -> int:
+        """Record the start of a scrape run and return its id."""
+        with self.transaction() as connection:
+            return connection.execute(
+                "INSERT INTO scrape_runs (league, pid, started_at, status) "
+                "VALUES (?, ?, ?, 'running')",
+                (league, os.getpid(), _now()),
+            ).lastrowid
+
+    def finish_run(
+        self,
+        run_id: int,
+        status: str,
+        events_count: int | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Record how a scrape run ended."""
+        with self.transaction() as connection:
+            connection.execute(
+                "UPDATE scrape_runs SET finished_at = ?, status = ?, "
+                "events_count = ?, error = ? WHERE id = ?",
+                (_now(), status, events_count, error, run_id),
+            )
+
+    def runs(self, league: str, limit: int = 10) -> list[sqlite3.Row]:
+        """Most recent scrape runs of a league, newest first."""
+        return self.connection.execute(
+            "SELECT * FROM scrape_runs WHERE league = ? ORDER BY id DESC LIMIT ?",
+            (league, limit),
+        ).fetchall()
+
+    def last_success(self, league: str) -> datetime | None:
+        """When the last successful scrape run of a league finished."""
+        row = self.connection.execute(
+            "SELECT finished_at FROM scrape_runs "
+            "WHERE league = ? AND status = 'success' ORDER BY id DESC LIMIT 1",
+            (league,),
+        ).fetchone()
+        return datetime.fromisoformat(row["finished_at"]) if row else None
+
+    def record_page(self, league: str, page: CachedPage) -> None:
+        """Store the validators of a fetched page and note when its content changed.
+
+        Changes are detected with ``FingerprintStore.fingerprint``, so markup
+        that differs on every request (scripts, tokens) does not count.
+        """
+        now = _now()
+        fingerprint = FingerprintStore.fingerprint([page.content])
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT INTO pages (url, league, etag, last_modified, fingerprint, "
+                "fetched_at, changed_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET league = excluded.league, "
+                "etag = excluded.etag, last_modified = excluded.last_modified, "
+                "fetched_at = excluded.fetched_at, "
+                "change_count = change_count "
+                "+ (pages.fingerprint != excluded.fingerprint), "
+                "changed_at = CASE WHEN pages.fingerprint != excluded.fingerprint "
+                "THEN excluded.changed_at ELSE pages.changed_at END, "
+                "fingerprint = excluded.fingerprint",
+                (
+                    page.url,
+                    league,
+                    page.etag,
+                    page.last_modified,
+                    fingerprint,
+                    now,
+                    now,
+                ),
+            )
+
+    def page(self, url: str) -> Dict[str, Any] | None:
+        """Stored metadata for a page, or None if it was never fetched."""
+        row = self.connection.execute(
+            "SELECT * FROM pages WHERE url = ?", (url,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def page_history(self, league: str) -> Dict[str, Dict[str, Any]]:
+        """Fetch and change history of a league's pages, with their events' times.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Per URL, ``fetched_at``, ``changed_at`` and
+            ``change_count``, plus ``begin_at`` (earliest begin) and ``end_at``
+            (latest end) of the events scraped from it, None if it has none.
+        """
+        rows = self.connection.execute(
+            "SELECT pages.url, pages.fetched_at, pages.changed_at, "
+            "pages.change_count, MIN(events.begin_at) AS begin_at, "
+            "MAX(COALESCE(events.end_at, events.begin_at)) AS end_at "
+            "FROM pages LEFT JOIN events "
+            "ON events.league = pages.league AND events.url = pages.url "
+            "WHERE pages.league = ? GROUP BY pages.url",
+            (league,),
+        )
+        return {row["url"]: dict(row) for row in rows}
+
+    def close(self) -> None:
+        """Close the calling thread's connection."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+global_repository = EventRepository(
+    Path(
+        os.getenv(
+            "EVENTS_DB", Path(__file__).parent.resolve() / "data" / "events.db"
+        )
+    )
+)
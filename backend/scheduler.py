@@ -0,0 +1,154 @@
+"""Background refresh of calendars so requests never wait on a scrape"""
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any
+
+from backend.calendar_control import CalendarControl
+
+
+class RefreshScheduler:
+    """Refresh each registered calendar on its own interval in a background thread.
+
+    Routes keep serving the last good ICS file while a refresh runs
+    (stale-while-revalidate); a failed refresh is retried after
+    ``retry_interval`` instead of waiting for the full refresh interval. When
+    another worker process holds the refresh, its result is picked up after
+    ``peer_poll_interval``.
+    """
+
+    retry_interval = timedelta(minutes=15)
+    peer_poll_interval = timedelta(seconds=30)
+
+    def __init__(self, calendars: Dict[str, CalendarControl]) -> None:
+        self.calendars = calendars
+        self.log = logging.getLogger(__name__)
+        self._wake = {name: threading.Event() for name in calendars}
+        self._locks = {name: threading.Lock() for name in calendars}
+        self._threads: Dict[str, threading.Thread] = {}
+        self._stopped = threading.Event()
+        self._state: Dict[str, Dict[str, Any]] = {
+            name: {
+                "running": False,
+                "last_started": None,
+                "last_finished": None,
+                "last_success": None,
+                "last_error": None,
+                "consecutive_failures": 0,
+                "last_result": None,
+                "next_run": None,
+            }
+            for name in calendars
+        }
+
+    def start(self) -> None:
+        """Start one daemon refresh thread per calendar."""
+        self._stopped.clear()
+        for name in self.calendars:
+            if name in self._threads and self._threads[name].is_alive():
+                continue
+            thread = threading.Thread(
+                target=self._run, args=(name,), name=f"refresh-{name}", daemon=True
+            )
+            self._threads[name] = thread
+            thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop all refresh threads, waiting up to ``timeout`` seconds for each."""
+        self._stopped.set()
+        for wake in self._wake.values():
+            wake.set()
+        for thread in self._threads.values():
+            thread.join(timeout)
+        self._threads.clear()
+
+    def refresh_if_stale(self, name: str) -> None:
+        """Wake the background thread for ``name`` if its calendar is due.
+
+        Never blocks; the request is a no-op while a refresh is running or a
+        failed refresh is waiting out ``retry_interval``.
+        """
+        if self._state[name]["running"] or self.seconds_until_due(name):
+            return
+        self._wake[name].set()
+
+    def refresh_now(self, name: str, force: bool = True) -> bool:
+        """Refresh ``name`` in the calling thread.
+
+        The refresh is single-flight across worker processes: if another worker
+        is already refreshing this calendar it is left to finish, and its file
+        is loaded on the next attempt instead of scraping again.
+
+        Args:
+            name (str): Calendar to refresh.
+            force (bool): Scrape even if another worker refreshed it recently.
+
+        Returns:
+            bool: True if the refresh succeeded.
+        """
+        calendar = self.calendars[name]
+        with self._locks[name]:
+            state = self._state[name]
+            state["running"] = True
+            state["last_started"] = datetime.now().isoformat()
+            try:
+                state["last_result"] = calendar.refresh(force=force)
+            except Exception as exc:
+                self.log.exception(f"Background refresh of {name} failed")
+                state["last_result"] = "failed"
+                state["last_error"] = str(exc)
+                state["consecutive_failures"] += 1
+                return False
+            else:
+                if state["last_result"] != "busy":
+                    state["last_success"] = datetime.now().isoformat()
+                    state["last_error"] = None
+                    state["consecutive_failures"] = 0
+                return True
+            finally:
+                state["running"] = False
+                state["last_finished"] = datetime.now().isoformat()
+
+    def seconds_until_due(self, name: str) -> float:
+        """Seconds until ``name`` should next be refreshed (0 if overdue)."""
+        calendar = self.calendars[name]
+        state = self._state[name]
+        if state["last_finished"] and (
+            state["consecutive_failures"] or state["last_result"] == "busy"
+        ):
+            finished = datetime.fromisoformat(state["last_finished"])
+            if state["consecutive_failures"]:
+                due = finished + self.retry_interval
+            else:
+                due = finished + self.peer_poll_interval
+            return max((due - datetime.now()).total_seconds(), 0)
+        if not calendar.last_update:
+            return 0
+        due = calendar.last_update + calendar.refresh_interval
+        return max((due - datetime.now(tz=calendar.UTC)).total_seconds(), 0)
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot of the refresh state of every calendar, for monitoring."""
+        return {
+            name: {
+                **self._state[name],
+                "last_update": self.calendars[name].get_last_updated_string(),
+                "is_stale": self.seconds_until_due(name) == 0,
+            }
+            for name in self.calendars
+        }
+
+    def _run(self, name: str) -> None:
+        wake = self._wake[name]
+        while not self._stopped.is_set():
+            delay = self.seconds_until_due(name)
+            if delay:
+                next_run = datetime.now() + timedelta(seconds=delay)
+                self._state[name]["next_run"] = next_run.isoformat()
+                wake.wait(delay)
+                if self._stopped.is_set():
+                    return
+            wake.clear()
+            self._state[name]["next_run"] = None
+            self.refresh_now(name, force=False)
@@ -0,0 +1,349 @@
+"""In-memory scraping statistics, flushed to disk in batches"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict
+
+from backend.locks import FileLock
+
+SERVICES = ("ufc", "onefc", "backend")
+# Today and the 30 days before it, the window daily_results has always covered.
+WINDOW_DAYS = 31
+# Days shown in daily_success_array.
+ARRAY_DAYS = 30
+STATS_KEYS = frozenset(
+    {
+        "daily_results",
+        "success_rate_30d",
+        "total_attempts_30d",
+        "total_success_30d",
+        "daily_success_array",
+        "last_update",
+        "last_events_count",
+    }
+)
+
+
+class ServiceStats:
+    """Daily success/failure counters for one service in a fixed-size ring buffer.
+
+    Slot ``day % WINDOW_DAYS`` holds the counts for ``day``. Totals over the
+    window are kept up to date as counts are added and days expire, so
+    recording a result and reading the 30-day aggregates are both O(1).
+    """
+
+    def __init__(self) -> None:
+        self.days: list[int | None] = [None] * WINDOW_DAYS
+        self.success = [0] * WINDOW_DAYS
+        self.failed = [0] * WINDOW_DAYS
+        self.total_success = 0
+        self.total_attempts = 0
+        self.today: int | None = None
+        self.last_update: str | None = None
+        self.last_events_count = 0
+        self.extra: Dict[str, Any] = {}
+        self._view: Dict[str, Any] | None = None
+
+    def _clear(self, slot: int) -> None:
+        self.total_success -= self.success[slot]
+        self.total_attempts -= self.success[slot] + self.failed[slot]
+        self.days[slot] = None
+        self.success[slot] = self.failed[slot] = 0
+
+    def advance(self, today: int) -> None:
+        """Expire the days that fell out of the window ending on ``today``."""
+        if today == self.today:
+            return
+        self.today = today
+        self._view = None
+        for slot, day in enumerate(self.days):
+            if day is not None and day <= today - WINDOW_DAYS:
+                self._clear(slot)
+
+    def add(self, day: int, success: int, failed: int) -> None:
+        """Add counts for ``day`` (a ``date.toordinal()``)."""
+        if self.today is None or day > self.today:
+            self.advance(day)
+        if day <= self.today - WINDOW_DAYS:
+            return
+        slot = day % WINDOW_DAYS
+        if self.days[slot] != day:
+            self._clear(slot)
+            self.days[slot] = day
+        self.success[slot] += success
+        self.failed[slot] += failed
+        self.total_success += success
+        self.total_attempts += success + failed
+        self._view = None
+
+    def set_meta(self, last_update: str, events_count: int | None, extra) -> None:
+        """Record the details of the latest refresh."""
+        self.last_update = last_update
+        if events_count is not None:
+            self.last_events_count = events_count
+        if extra:
+            self.extra.update(extra)
+        self._view = None
+
+    def as_dict(self, today: int) -> Dict[str, Any]:
+        """Stats in the JSON shape served by ``/stats``, cached until they change."""
+        self.advance(today)
+        if self._view is not None:
+            return self._view
+        daily_results = {}
+        for slot, day in enumerate(self.days):
+            if day is not None:
+                daily_results[date.fromordinal(day).isoformat()] = {
+                    "success": self.success[slot],
+                    "failed": self.failed[slot],
+                }
+        daily = []
+        for day in range(today - ARRAY_DAYS + 1, today + 1):
+            slot = day % WINDOW_DAYS
+            success_day = (
+                self.days[slot] == day and self.success[slot] > self.failed[slot]
+            )
+            daily.append(
+                {"date": date.fromordinal(day).isoformat(), "success": success_day}
+            )
+        self._view = {
+            **self.extra,
+            "daily_results": dict(sorted(daily_results.items())),
+            "success_rate_30d": (
+                self.total_success / self.total_attempts * 100
+                if self.total_attempts
+                else 0
+            ),
+            "total_attempts_30d": self.total_attempts,
+            "total_success_30d": self.total_success,
+            "daily_success_array": daily,
+            "last_update": self.last_update,
+            "last_events_count": self.last_events_count,
+        }
+        return self._view
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], today: int) -> "ServiceStats":
+        """Build the ring buffer from the JSON shape written by ``as_dict``."""
+        stats = cls()
+        stats.advance(today)
+        for day, result in data.get("daily_results", {}).items():
+            stats.add(
+                date.fromisoformat(day).toordinal(),
+                result.get("success", 0),
+                result.get("failed", 0),
+            )
+        stats.last_update = data.get("last_update")
+        stats.last_events_count = data.get("last_events_count", 0)
+        stats.extra = {
+            key: value for key, value in data.items() if key not in STATS_KEYS
+        }
+        return stats
+
+
+class StatsEngine:
+    """Per-service stats kept in memory and flushed to a JSON file in batches.
+
+    Results are counted in memory and also kept as pending deltas. The
+    background ticker started with ``start`` merges the deltas into the file
+    every ``flush_interval`` seconds (and once more at exit) under an
+    inter-process lock, writes it atomically and reloads what other workers
+    wrote. Each gunicorn worker only adds its own deltas, so no update from any
+    worker is lost.
+
+    Reads are served from an immutable snapshot that is republished after
+    every change, so ``snapshot`` never touches the disk or takes a lock.
+    """
+
+    def __init__(
+        self, stats_file: Path, lock_file: Path, flush_interval: float = 10
+    ) -> None:
+        self.stats_file = stats_file
+        self.lock_file = lock_file
+        self.flush_interval = flush_interval
+        self.log = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._services: Dict[str, ServiceStats] = {
+            service: ServiceStats() for service in SERVICES
+        }
+        self._pending: Dict[str, Dict[int, list[int]]] = {}
+        self._pending_meta: Dict[str, tuple] = {}
+        self._synced_at: datetime | None = None
+        self._snapshot: Dict[str, Any] = {}
+        self._ticker: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._publish()
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _today() -> int:
+        return date.today().toordinal()
+
+    def _read_file(self) -> Dict[str, Dict[str, Any]]:
+        """Read the stats file, normalizing the legacy flat shape to services."""
+        try:
+            with open(self.stats_file, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if "services" not in data:
+            return {"backend": data}
+        return data["services"]
+
+    def _load(self, today: int) -> Dict[str, ServiceStats]:
+        services = self._read_file()
+        return {
+            service: ServiceStats.from_dict(services.get(service, {}), today)
+            for service in {*SERVICES, *services}
+        }
+
+    def _publish(self) -> None:
+        today = self._today()
+        with self._lock:
+            self._snapshot = {
+                "services": {
+                    service: stats.as_dict(today)
+                    for service, stats in self._services.items()
+                }
+            }
+
+    def record(
+        self,
+        service: str,
+        success: bool,
+        events_count: int | None = None,
+        extra: Dict[str, Any] | None = None,
+    ) -> None:
+        """Count one refresh result for ``service`` in memory (O(1))."""
+        today = self._today()
+        now = datetime.now().isoformat()
+        counts = (1, 0) if success else (0, 1)
+        with self._lock:
+            if self._synced_at is None:
+                self.sync()
+            stats = self._services.setdefault(service, ServiceStats())
+            stats.add(today, *counts)
+            stats.set_meta(now, events_count, extra)
+            pending = self._pending.setdefault(service, {}).setdefault(today, [0, 0])
+            pending[0] += counts[0]
+            pending[1] += counts[1]
+            _, pending_count, pending_extra = self._pending_meta.get(
+                service, (None, None, {})
+            )
+            self._pending_meta[service] = (
+                now,
+                events_count if events_count is not None else pending_count,
+                {**pending_extra, **(extra or {})},
+            )
+            self._publish()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """All services in the ``/stats`` JSON shape, without any disk I/O.
+
+        Stats recorded by other workers show up after the next background sync.
+        """
+        return self._snapshot
+
+    def start(
+        self, heartbeat_service: str | None = None, heartbeat_interval: float = 300
+    ) -> None:
+        """Start the background ticker that syncs with the stats file.
+
+        Args:
+            heartbeat_service (str | None): Service to record a success for every
+                ``heartbeat_interval`` seconds, showing the process is alive.
+            heartbeat_interval (float): Seconds between heartbeats.
+        """
+        if self._ticker is not None and self._ticker.is_alive():
+            return
+        self._stopped.clear()
+        self._ticker = threading.Thread(
+            target=self._tick,
+            args=(heartbeat_service, heartbeat_interval),
+            name="stats-ticker",
+            daemon=True,
+        )
+        self._ticker.start()
+
+    def stop(self) -> None:
+        """Stop the background ticker and flush pending deltas."""
+        self._stopped.set()
+        if self._ticker is not None:
+            self._ticker.join()
+            self._ticker = None
+        self.flush()
+
+    def _tick(self, heartbeat_service: str | None, heartbeat_interval: float) -> None:
+        last_heartbeat = None
+        while not self._stopped.is_set():
+            now = datetime.now()
+            if heartbeat_service and (
+                last_heartbeat is None
+                or now - last_heartbeat >= timedelta(seconds=heartbeat_interval)
+            ):
+                self.record(heartbeat_service, True)
+                last_heartbeat = now
+            self.sync()
+            self._stopped.wait(self.flush_interval)
+
+    def flush(self) -> None:
+        """Merge pending deltas into the stats file now."""
+        self.sync()
+
+    def sync(self) -> None:
+        """Merge pending deltas into the file and reload what other workers wrote.
+
+        The file is only rewritten when this process has pending deltas.
+        """
+        with self._lock:
+            today = self._today()
+            try:
+                with FileLock(self.lock_file):
+                    services = self._load(today)
+                    for service, days in self._pending.items():
+                        stats = services.setdefault(service, ServiceStats())
+                        for day, (success, failed) in days.items():
+                            stats.add(day, success, failed)
+                    for service, meta in self._pending_meta.items():
+                        stats = services[service]
+                        if (stats.last_update or "") <= meta[0]:
+                            stats.set_meta(*meta)
+                    if self._pending or self._pending_meta:
+                        self._write(
+                            {
+                                "services": {
+                                    service: stats.as_dict(today)
+                                    for service, stats in services.items()
+                                }
+                            }
+                        )
+            except OSError:
+                self.log.exception(f"Failed to sync stats with {self.stats_file}")
+                return
+            self._services = services
+            self._pending.clear()
+            self._pending_meta.clear()
+            self._synced_at = datetime.now()
+            self._publish()
+
+    def _write(self, data: Dict[str, Any]) -> None:
+        tmp_file = self.stats_file.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_file, self.stats_file)
+
+    def reset(self) -> None:
+        """Drop all stats, in memory and on disk."""
+        with self._lock:
+            with FileLock(self.lock_file):
+                self.stats_file.unlink(missing_ok=True)
+            self._services = {service: ServiceStats() for service in SERVICES}
+            self._pending.clear()
+            self._pending_meta.clear()
+            self._synced_at = None
+            self._publish()
@@ -0,0 +1,200 @@
+"""Per-host rate limiting and circuit breaking for upstream requests"""
+
+import os
+import threading
+import time
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of sending a request to a host whose circuit is open."""
+
+
+class TokenBucket:
+    """Allow ``rate`` requests per second on average, in bursts of up to ``capacity``.
+
+    ``reserve`` takes a token and returns how long the caller must wait for
+    it. Tokens can be borrowed ahead, so concurrent callers queue up one
+    ``1 / rate`` apart instead of all waking at once. A ``rate`` of 0 disables
+    the limit.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token; returns the seconds to wait before it can be used."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            return max(-self._tokens / self.rate, 0.0)
+
+
+class CircuitBreaker:
+    """Stop sending requests to a host after ``threshold`` failures in a row.
+
+    Once open, requests are rejected with ``CircuitOpenError`` for
+    ``cooldown`` seconds. After that a single trial request is let through
+    (half-open): if it succeeds the circuit closes, otherwise it opens again
+    for another cooldown.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int, cooldown: float) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.rejected = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def before_request(self, host: str) -> None:
+        """Let a request through, or raise ``CircuitOpenError``."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    self.rejected += 1
+                    raise CircuitOpenError(
+                        f"Circuit for {host} is open after {self.failures} failures"
+                    )
+                self.state = self.HALF_OPEN
+            elif self.state == self.HALF_OPEN and self._trial:
+                self.rejected += 1
+                raise CircuitOpenError(f"Circuit for {host} is waiting on a trial")
+            if self.state == self.HALF_OPEN:
+                self._trial = True
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of a request let through by ``before_request``."""
+        with self._lock:
+            self._trial = False
+            if success:
+                self.state = self.CLOSED
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.threshold
+            ):
+                self.state = self.OPEN
+                self.opens += 1
+                self._opened_at = time.monotonic()
+
+    def retry_in(self) -> float:
+        """Seconds until an open circuit lets a trial request through."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(self._opened_at + self.cooldown - time.monotonic(), 0.0)
+
+
+class HostThrottle:
+    """Rate limit and circuit breaker for each upstream host.
+
+    Every request first calls ``acquire``, which fails fast while the host's
+    circuit is open and otherwise waits for a token from the host's bucket,
+    then reports its outcome with ``record``.
+
+    Settings can be overridden with the ``SCRAPER_RATE_LIMIT`` (requests per
+    second per host, 0 for no limit), ``SCRAPER_RATE_BURST``,
+    ``SCRAPER_BREAKER_THRESHOLD`` and ``SCRAPER_BREAKER_COOLDOWN`` (seconds)
+    environment variables.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: float | None = None,
+        threshold: int | None = None,
+        cooldown: float | None = None,
+    ) -> None:
+        self.rate = rate if rate is not None else float(
+            os.getenv("SCRAPER_RATE_LIMIT", 2)
+        )
+        self.burst = burst if burst is not None else float(
+            os.getenv("SCRAPER_RATE_BURST", 4)
+        )
+        self.threshold = threshold if threshold is not None else int(
+            os.getenv("SCRAPER_BREAKER_THRESHOLD", 5)
+        )
+        self.cooldown = cooldown if cooldown is not None else float(
+            os.getenv("SCRAPER_BREAKER_COOLDOWN", 300)
+        )
+        self._hosts: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _host(self, url: str) -> tuple[str, Dict[str, Any]]:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = {
+                    "bucket": TokenBucket(self.rate, self.burst),
+                    "breaker": CircuitBreaker(self.threshold, self.cooldown),
+                    "requests": 0,
+                    "throttled": 0,
+                    "throttle_seconds": 0.0,
+                    "max_delay": 0.0,
+                }
+            return host, self._hosts[host]
+
+    def acquire(self, url: str) -> float:
+        """Wait until a request to the host of ``url`` may be sent.
+
+        Returns:
+            float: Seconds spent waiting for the rate limit.
+
+        Raises:
+            CircuitOpenError: The host's circuit is open.
+        """
+        host, entry = self._host(url)
+        entry["breaker"].before_request(host)
+        delay = entry["bucket"].reserve()
+        with self._lock:
+            entry["requests"] += 1
+            if delay:
+                entry["throttled"] += 1
+                entry["throttle_seconds"] += delay
+                entry["max_delay"] = max(entry["max_delay"], delay)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    def record(self, url: str, success: bool) -> None:
+        """Record whether a request sent after ``acquire`` succeeded."""
+        _, entry = self._host(url)
+        entry["breaker"].record(success)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Circuit state and rate limit delays of every host, for monitoring."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {
+            host: {
+                "circuit": entry["breaker"].state,
+                "consecutive_failures": entry["breaker"].failures,
+                "opens": entry["breaker"].opens,
+                "rejected": entry["breaker"].rejected,
+                "retry_in": round(entry["breaker"].retry_in(), 1),
+                "requests": entry["requests"],
+                "throttled": entry["throttled"],
+                "throttle_seconds": round(entry["throttle_seconds"], 3),
+                "max_delay": round(entry["max_delay"], 3),
+            }
+            for host, entry in hosts.items()
+        }
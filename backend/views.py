@@ -0,0 +1,216 @@
+"""Filtered views of a calendar, served from an index and a cache of renders"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Mapping
+
+from backend.rendering import RenderedCalendar, render_fragments
+
+# Longest range a ``days`` view may cover
+MAX_DAYS = 366
+
+
+def normalize(text: str) -> str:
+    """Lowercase words of ``text`` without accents or punctuation, space separated."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def event_part(name: str | None) -> str | None:
+    """Part of the card an event covers, from names like "Main Card - UFC 300"."""
+    if not name or " - " not in name:
+        return None
+    return normalize(name.split(" - ", 1)[0]) or None
+
+
+def fighter_lines(description: str | None) -> list[str]:
+    """The "Red Corner vs Blue Corner" lines of an event description.
+
+    These are the lines the scrapers build with ``get_fighters_for_part``.
+    """
+    return [line for line in (description or "").splitlines() if " vs " in line]
+
+
+def _date(args: Mapping[str, str], name: str) -> date | None:
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a date like 2025-01-31") from None
+
+
+@dataclass(frozen=True)
+class CalendarQuery:
+    """Normalized filters of a calendar view.
+
+    Equal filters normalize to equal queries, however they were spelled, so a
+    query is the key of its rendered view. Every filter is optional; a query
+    without any is the full calendar.
+    """
+
+    part: str | None = None
+    fighter: str | None = None
+    start: datetime | None = None
+    end: datetime | None = None
+
+    @classmethod
+    def from_args(
+        cls, args: Mapping[str, str], today: date | None = None
+    ) -> CalendarQuery:
+        """Build a query from request arguments.
+
+        ``part`` is a part of the card (``main-card``, ``prelims``), matched
+        against the start of event names. ``fighter`` is a name found in the
+        event's name or fight lines. ``from`` and ``to`` are inclusive ISO
+        dates in UTC; ``days`` is the next number of days, starting today.
+
+        Raises:
+            ValueError: An argument has an invalid value.
+        """
+        start, end = _date(args, "from"), _date(args, "to")
+        if days := args.get("days"):
+            if not days.isdigit() or not 0 < int(days) <= MAX_DAYS:
+                raise ValueError(f"days must be a number from 1 to {MAX_DAYS}")
+            start = today or datetime.now(tz=timezone.utc).date()
+            end = start + timedelta(days=int(days) - 1)
+        if start and end and end < start:
+            raise ValueError("to must not be before from")
+        return cls(
+            part=normalize(args.get("part", "")) or None,
+            fighter=normalize(args.get("fighter", "")) or None,
+            start=datetime.combine(start, time(), timezone.utc) if start else None,
+            end=(
+                datetime.combine(end + timedelta(days=1), time(), timezone.utc)
+                if end
+                else None
+            ),
+        )
+
+    def __bool__(self) -> bool:
+        return any((self.part, self.fighter, self.start, self.end))
+
+
+class EventIndex:
+    """Inverted index over the names and fight lines of a league's events.
+
+    Events are kept in calendar order, so the positions in every posting list
+    are sorted and a date range is a pair of binary searches.
+    """
+
+    def __init__(self, rows: Iterable[Mapping[str, Any]]) -> None:
+        self.fragments: list[str] = []
+        self.begins: list[datetime] = []
+        self._texts: list[list[str]] = []
+        self._parts: Dict[str, list[int]] = {}
+        self._terms: Dict[str, list[int]] = {}
+        for position, row in enumerate(rows):
+            self.fragments.append(row["fragment"])
+            self.begins.append(datetime.fromisoformat(row["begin_at"]))
+            texts = [normalize(row["name"] or "")]
+            texts += [normalize(line) for line in fighter_lines(row["description"])]
+            self._texts.append(texts)
+            if part := event_part(row["name"]):
+                self._parts.setdefault(part, []).append(position)
+            for term in {term for text in texts for term in text.split()}:
+                self._terms.setdefault(term, []).append(position)
+
+    def _mentions(self, position: int, phrase: str) -> bool:
+        return any(f" {phrase} " in f" {text} " for text in self._texts[position])
+
+    def search(self, query: CalendarQuery) -> list[int]:
+        """Positions of the events matching ``query``, in calendar order."""
+        first = bisect_left(self.begins, query.start) if query.start else 0
+        last = bisect_left(self.begins, query.end) if query.end else len(self.begins)
+        candidates: set[int] | None = None
+        if query.part:
+            candidates = set(self._parts.get(query.part, ()))
+        if query.fighter:
+            for term in query.fighter.split():
+                postings = set(self._terms.get(term, ()))
+                candidates = postings if candidates is None else candidates & postings
+            candidates = {
+                position
+                for position in candidates
+                if self._mentions(position, query.fighter)
+            }
+        if candidates is None:
+            return list(range(first, last))
+        return sorted(position for position in candidates if first <= position < last)
+
+    def __len__(self) -> int:
+        return len(self.fragments)
+
+
+class CalendarViews:
+    """Rendered filtered views of one calendar, in a bounded LRU cache.
+
+    The index and the cache belong to one revision of the league's events;
+    the first view asked for after the revision moved rebuilds the index and
+    empties the cache. A popular view is then rendered once per change, like
+    the full calendar.
+
+    The number of cached views can be set with ``CALENDAR_VIEW_CACHE_SIZE``.
+    """
+
+    def __init__(self, max_entries: int | None = None) -> None:
+        if max_entries is None:
+            max_entries = int(os.getenv("CALENDAR_VIEW_CACHE_SIZE", 64))
+        self.max_entries = max_entries
+        self.revision: int | None = None
+        self.index: EventIndex | None = None
+        self._rendered: OrderedDict[CalendarQuery, RenderedCalendar] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        query: CalendarQuery,
+        revision: int,
+        rows: Callable[[], Iterable[Mapping[str, Any]]],
+    ) -> RenderedCalendar:
+        """The view for ``query``, rendered from the cache when possible.
+
+        Args:
+            query (CalendarQuery): Filters of the view.
+            revision (int): Current revision of the league's events.
+            rows (Callable): Loads the league's events in calendar order, only
+                called when the revision moved.
+
+        Returns:
+            RenderedCalendar: The matching events as a calendar.
+        """
+        with self._lock:
+            if revision != self.revision or self.index is None:
+                self.index = EventIndex(rows())
+                self.revision = revision
+                self._rendered.clear()
+            if (rendered := self._rendered.get(query)) is not None:
+                self._rendered.move_to_end(query)
+                self.hits += 1
+                return rendered
+            self.misses += 1
+            index = self.index
+        rendered = RenderedCalendar(
+            render_fragments(index.fragments[i] for i in index.search(query))
+        )
+        with self._lock:
+            if self.index is index and self.max_entries > 0:
+                self._rendered[query] = rendered
+                while len(self._rendered) > self.max_entries:
+                    self._rendered.popitem(last=False)
+        return rendered
+
+    def __len__(self) -> int:
+        return len(self._rendered)
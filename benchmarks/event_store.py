@@ -0,0 +1,73 @@
+"""Micro-benchmark: cost of one upsert as the calendar grows.
+
+Compares the indexed ``EventStore.upsert`` with the linear scan that
+``CalendarControl.update_existing_event`` used before it.
+
+    python -m benchmarks.event_store [--sizes 1000 5000 10000 20000 40000]
+"""
+
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from ics import Event
+
+from backend.event_store import EventStore
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def make_event(i: int) -> Event:
+    begin = START + timedelta(hours=3 * i)
+    return Event(
+        name=f"Main Card - Event {i}",
+        begin=begin,
+        end=begin + timedelta(hours=2),
+        url=f"https://www.ufc.com/event/{i}",
+    )
+
+
+def linear_upsert(events: set[Event], event: Event) -> None:
+    for existing_event in events:
+        if (
+            (event.name == existing_event.name)
+            or (event.begin == existing_event.begin and event.end == existing_event.end)
+            or (event.url == existing_event.url and event.name == existing_event.name)
+        ):
+            events.discard(existing_event)
+            events.add(event)
+            return
+    events.add(event)
+
+
+def time_per_upsert(upsert, size: int, rounds: int) -> float:
+    """Average microseconds per upsert of ``rounds`` new events into ``size`` events."""
+    incoming = [make_event(size + i) for i in range(rounds)]
+    start = time.perf_counter()
+    for event in incoming:
+        upsert(event)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 20000, 40000]
+    )
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'events':>8} {'indexed us/op':>14} {'linear us/op':>13}")
+    for size in args.sizes:
+        existing = [make_event(i) for i in range(size)]
+        store = EventStore(set(existing))
+        linear = set(existing)
+        indexed_us = time_per_upsert(store.upsert, size, args.rounds)
+        linear_us = time_per_upsert(
+            lambda event: linear_upsert(linear, event), size, args.rounds
+        )
+        print(f"{size:>8} {indexed_us:>14.1f} {linear_us:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
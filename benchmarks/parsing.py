@@ -0,0 +1,116 @@
+"""Benchmark: parse time and peak memory per page for each parser backend.
+
+Parses the saved sample pages in tests/fixtures/pages with the full
+``html.parser`` tree the scrapers used to build, and with each available
+backend limited to the regions the scrapers read.
+
+Peak memory is measured with tracemalloc, which sees the Python objects of
+the parse tree but not lxml's internal C buffers.
+
+With ``--pipeline N`` it also times extracting N UFC event pages through the
+fetch threads, parsing inline against parsing in the process pool.
+
+    python -m benchmarks.parsing [--runs 20] [--pipeline 48]
+"""
+
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from importlib.util import find_spec
+from pathlib import Path
+
+from backend.extraction import parse_ufc_event
+from backend.fetcher import FetchEngine
+from backend.onefc_calendar import OneFcCalendar
+from backend.parse_pool import ParsePool
+from backend.parsing import HtmlParser
+from backend.ufc_calendar import UfcCalendar
+
+PAGES = Path(__file__).resolve().parents[1] / "tests" / "fixtures" / "pages"
+SAMPLES = {
+    "ufc_events.html": UfcCalendar.listing_regions,
+    "ufc_event.html": UfcCalendar.document_regions,
+    "onefc_events.html": OneFcCalendar.listing_regions,
+    "onefc_event.html": OneFcCalendar.document_regions,
+}
+
+
+def measure(parser: HtmlParser, content: bytes, regions, runs: int):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        parser.parse(content, regions)
+        times.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    soup = parser.parse(content, regions)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del soup
+    return statistics.median(times), peak
+
+
+def pipeline(pages: int) -> None:
+    content = (PAGES / "ufc_event.html").read_bytes()
+    html_parser = HtmlParser()
+    urls = [f"https://www.ufc.com/event/{i}" for i in range(pages)]
+    engine = FetchEngine()
+    for label, parse_pool in (
+        ("inline", ParsePool(max_workers=0)),
+        ("process pool", ParsePool()),
+    ):
+        with parse_pool.session():
+            # Warm the pool up so process start-up is not timed
+            parse_pool.run(parse_ufc_event, urls[0], content, html_parser, None)
+            start = time.perf_counter()
+            engine.map(
+                lambda url, parse_pool=parse_pool: parse_pool.run(
+                    parse_ufc_event,
+                    url,
+                    content,
+                    html_parser,
+                    UfcCalendar.document_regions,
+                ),
+                urls,
+            )
+            elapsed = time.perf_counter() - start
+        print(
+            f"pipeline {label:<13} {pages} pages in {elapsed * 1000:>8.1f}ms "
+            f"({parse_pool.max_workers} workers)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--pipeline", type=int, default=0)
+    args = parser.parse_args()
+
+    backends = [("html.parser full (before)", HtmlParser("html.parser", False))]
+    backends.append(("html.parser regions", HtmlParser("html.parser", True)))
+    if find_spec("lxml"):
+        backends.append(("lxml full", HtmlParser("lxml", False)))
+        backends.append(("lxml regions", HtmlParser("lxml", True)))
+
+    print(
+        f"{'page':<18} {'backend':<26} {'parse':>10} {'peak mem':>10} {'speedup':>8}"
+    )
+    for page, regions in SAMPLES.items():
+        content = (PAGES / page).read_bytes()
+        baseline = None
+        for label, html_parser in backends:
+            seconds, peak = measure(html_parser, content, regions, args.runs)
+            baseline = baseline or seconds
+            print(
+                f"{page:<18} {label:<26} {seconds * 1000:>8.2f}ms "
+                f"{peak / 1024:>8.0f}KB {baseline / seconds:>7.1f}x"
+            )
+
+    if args.pipeline:
+        pipeline(args.pipeline)
+
+
+if __name__ == "__main__":
+    main()
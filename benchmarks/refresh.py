@@ -0,0 +1,194 @@
+"""Benchmark: end-to-end and per-phase time of a calendar refresh, offline.
+
+Runs ``update_calendar`` of both scrapers against a synthetic site built
+from the recorded pages in tests/fixtures/pages, scaled up to the given
+number of events, and served through ``ReplayAdapter`` with a synthetic
+latency per request. Each size is refreshed twice: a cold refresh that
+scrapes every event page, then a warm one that revalidates them (or skips
+them, with ``--plan``).
+
+    python -m benchmarks.refresh [--events 100 1000 10000] [--latency 0.02]
+"""
+
+import argparse
+import json
+import re
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from backend.calendar_control import CalendarControl
+from backend.http_client import HttpClient
+from backend.onefc_calendar import OneFcCalendar
+from backend.page_cache import PageCache
+from backend.planner import RefreshPlanner
+from backend.replay import RecordedResponse, Recording, ReplayAdapter
+from backend.repository import EventRepository
+from backend.throttle import HostThrottle
+from backend.ufc_calendar import UfcCalendar
+
+RECORDING = Recording(Path(__file__).resolve().parents[1] / "tests/fixtures/pages")
+WEEK = 7 * 24 * 3600
+PHASES = {
+    "links": "get_event_links",
+    "plan": "plan_refresh",
+    "scrape": "scrape_all",
+    "merge": "update_existing_event",
+    "compact": "compact",
+    "write": "write_calendar",
+}
+
+
+class SyntheticSite:
+    """Listing, event and API responses for ``pages`` events, made on request.
+
+    Every event page is the recorded one with its own title and times, so
+    each produces distinct events.
+    """
+
+    def __init__(self, pages: int) -> None:
+        self.pages = pages
+        self.requests: Counter[str] = Counter()
+        self.responses = {
+            "https://www.ufc.com/events": self.ufc_listing,
+            "https://www.onefc.com/events/": self.onefc_listing,
+        }
+
+    @staticmethod
+    def page(url: str) -> str:
+        return RECORDING.get(url).content.decode()
+
+    def ufc_listing(self) -> str:
+        listing = self.page("https://www.ufc.com/events")
+        first = listing.index("<article")
+        last = listing.rindex("</article>") + len("</article>")
+        article = re.search(r"<article.*?</article>", listing, re.DOTALL).group()
+        articles = "".join(
+            article.replace("/event/ufc-400", f"/event/ufc-{i}")
+            for i in range(self.pages)
+        )
+        return listing[:first] + articles + listing[last:]
+
+    def ufc_event(self, i: int) -> str:
+        page = self.page("https://www.ufc.com/event/ufc-400")
+        page = page.replace("UFC 400", f"UFC {i}")
+        return re.sub(
+            r'data-timestamp="(\d+)"',
+            lambda match: f'data-timestamp="{int(match.group(1)) + i * WEEK}"',
+            page,
+        )
+
+    def onefc_listing(self) -> str:
+        listing = self.page("https://www.onefc.com/events/")
+        upcoming = re.search(
+            r'(<div id="upcoming-events-section"[^>]*>)(.*?)(</div>\s*<div id="past)',
+            listing,
+            re.DOTALL,
+        )
+        card = re.search(
+            r'<div class="simple-post-card">.*?</div></div>', upcoming.group(2)
+        ).group()
+        cards = "".join(
+            card.replace("fight-night-0/", f"fight-night-{i}/")
+            for i in range(self.pages)
+        )
+        return listing[: upcoming.start(2)] + cards + listing[upcoming.end(2) :]
+
+    def onefc_event(self, i: int) -> str:
+        page = self.page("https://www.onefc.com/events/fight-night-0/")
+        page = page.replace("Fight Night 40", f"Fight Night {i}")
+        return page.replace('data-id="40"', f'data-id="{i}"')
+
+    def get(self, url: str) -> RecordedResponse | None:
+        self.requests[url.split("/")[2]] += 1
+        if url in self.responses:
+            return RecordedResponse(200, self.responses[url]().encode())
+        if match := re.fullmatch(r"https://www\.ufc\.com/event/ufc-(\d+)", url):
+            body = self.ufc_event(int(match.group(1)))
+        elif match := re.fullmatch(
+            r"https://www\.onefc\.com/events/fight-night-(\d+)/", url
+        ):
+            body = self.onefc_event(int(match.group(1)))
+        elif match := re.fullmatch(
+            r"https://www\.onefc\.com/wp-json/public/v2/events/(\d+)", url
+        ):
+            body = json.dumps({"utc_start": 1900000000 + int(match.group(1)) * WEEK})
+        else:
+            return None
+        return RecordedResponse(200, body.encode())
+
+
+def instrument(calendar: CalendarControl, phases: dict[str, float]) -> None:
+    """Add the time spent in each phase's method to ``phases``."""
+    for phase, method in PHASES.items():
+        original = getattr(calendar, method)
+
+        def timed(*args, _original=original, _phase=phase, **kwargs):
+            start = time.perf_counter()
+            try:
+                return _original(*args, **kwargs)
+            finally:
+                phases[_phase] += time.perf_counter() - start
+
+        setattr(calendar, method, timed)
+
+
+def run(calendar_class, events: int, args, directory: Path) -> None:
+    events_per_page = 3 if calendar_class is UfcCalendar else 1
+    site = SyntheticSite(-(-events // events_per_page))
+    client = HttpClient(throttle=HostThrottle(rate=0), max_retries=0)
+    client.session.mount(
+        "https://", ReplayAdapter(site, latency=args.latency, jitter=args.jitter)
+    )
+    calendar_class.repository = EventRepository(directory / "events.db")
+    calendar = calendar_class()
+    calendar.http_client = client
+    calendar.page_cache = PageCache(directory / "pages")
+    calendar.calendar_file_name = directory / calendar_class.calendar_file_name
+    calendar.planner = RefreshPlanner(enabled=args.plan)
+
+    for label in ("cold", "warm"):
+        phases: dict[str, float] = defaultdict(float)
+        instrument(calendar, phases)
+        site.requests.clear()
+        calendar.last_update = None
+        start = time.perf_counter()
+        calendar.update_calendar()
+        total = time.perf_counter() - start
+        print(
+            f"{calendar.league:<6} {events:>6} {label:<5} {total:>8.2f}s "
+            + " ".join(f"{phases[phase]:>8.2f}s" for phase in PHASES)
+            + f" {sum(site.requests.values()):>8}"
+        )
+        for method in PHASES.values():
+            delattr(calendar, method)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="Seconds added to each request."
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.01, help="Random extra seconds, up to."
+    )
+    parser.add_argument(
+        "--plan", action="store_true", help="Let the refresh planner skip pages."
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'league':<6} {'events':>6} {'run':<5} {'total':>9} "
+        + " ".join(f"{phase:>9}" for phase in PHASES)
+        + f" {'requests':>8}"
+    )
+    for events in args.events:
+        for calendar_class in (UfcCalendar, OneFcCalendar):
+            with tempfile.TemporaryDirectory() as directory:
+                run(calendar_class, events, args, Path(directory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Startup benchmark: time from a cold interpreter to the first calendar response.
+
+Each run starts a fresh Python process with outbound connections blocked,
+points the calendars at a warm event repository, imports ``backend.main`` and
+requests ``/ufc`` through the Flask test client. The run fails if anything tried to
+open a connection before the first response, or if the scraping and ICS
+libraries were imported at startup.
+
+    python -m benchmarks.startup [--runs 5] [--events 200]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from ics import Event
+
+from backend.repository import EventRepository
+
+CHILD = """
+import json, socket, sys, time
+from pathlib import Path
+
+attempts = []
+
+def blocked_connect(self, address, *args):
+    attempts.append(repr(address))
+    raise OSError("network disabled by startup benchmark")
+
+socket.socket.connect = blocked_connect
+socket.socket.connect_ex = blocked_connect
+
+start = time.perf_counter()
+from backend.ufc_calendar import UfcCalendar
+from backend.onefc_calendar import OneFcCalendar
+
+data_dir = Path(sys.argv[1])
+UfcCalendar.calendar_file_name = data_dir / "ufc.ics"
+OneFcCalendar.calendar_file_name = data_dir / "onefc.ics"
+
+import backend.main
+
+imported = time.perf_counter()
+heavy_modules = sorted(name for name in ("bs4", "ics") if name in sys.modules)
+response = backend.main.app.test_client().get("/ufc")
+first_response = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_response_ms": (first_response - start) * 1000,
+    "status": response.status_code,
+    "bytes": len(response.data),
+    "heavy_modules": heavy_modules,
+    "connect_attempts": attempts,
+}))
+"""
+
+
+def write_warm_repository(directory: Path, count: int) -> None:
+    repository = EventRepository(directory / "events.db")
+    start = datetime.now(tz=timezone.utc)
+    for league in ("ufc", "onefc"):
+        with repository.transaction():
+            for i in range(count):
+                begin = start + timedelta(days=i)
+                repository.upsert(
+                    league,
+                    Event(
+                        name=f"Main Card - {league} {i}",
+                        begin=begin,
+                        end=begin + timedelta(hours=3),
+                    ),
+                )
+        repository.finish_run(repository.start_run(league), "success", count)
+    repository.close()
+
+
+def run_once(data_dir: Path) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD, str(data_dir)],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=data_dir,
+        env={
+            "PYTHONPATH": str(Path(__file__).resolve().parents[1]),
+            "EVENTS_DB": str(data_dir / "events.db"),
+        },
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        write_warm_repository(data_dir, args.events)
+        results = [run_once(data_dir) for _ in range(args.runs)]
+
+    for result in results:
+        assert result["status"] == 200, result
+        assert not result["connect_attempts"], result["connect_attempts"]
+        assert not result["heavy_modules"], result["heavy_modules"]
+    print(f"{'':>18} {'median':>10} {'min':>10}")
+    for key in ("import_ms", "first_response_ms"):
+        values = [result[key] for result in results]
+        print(
+            f"{key:>18} {statistics.median(values):>8.1f}ms {min(values):>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Benchmark: per-page timing breakdown of UFC event extraction.
+
+Compares the per-part extractor the UFC scraper used to run, which selected
+the editorial description and a card section again for every part, with
+the single pass in ``backend.extraction``. The sample event page is
+rewritten to list 1 to 12 card parts, so the growth of selector time with
+the number of parts shows up next to the fixed parse time.
+
+    python -m benchmarks.ufc_extraction [--runs 50]
+"""
+
+import argparse
+import re
+import statistics
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from backend.extraction import UFC_PART_SECTIONS, ufc_fighters_by_section
+from backend.parsing import HtmlParser
+from backend.ufc_calendar import UfcCalendar
+
+PAGE = Path(__file__).resolve().parents[1] / "tests/fixtures/pages/ufc_event.html"
+PART = re.compile(r'<li class="c-listing-viewing-option-group__item">.*?</li>')
+TITLES = ("Main Card", "Prelims", "Early Prelims", "Fight Pass")
+
+
+def with_parts(content: str, parts: int) -> str:
+    """The sample page with its card parts replaced by ``parts`` parts."""
+    template = PART.search(content).group()
+    items = "".join(
+        template.replace("Main Card", TITLES[i % len(TITLES)]) for i in range(parts)
+    )
+    start = PART.search(content).start()
+    end = list(PART.finditer(content))[-1].end()
+    return content[:start] + items + content[end:]
+
+
+def legacy_fighters(part: str, soup) -> list[str]:
+    part_id = {"Prelims": "prelims-card", "Early Prelims": "early-prelims"}.get(
+        part, "main-card"
+    )
+    event_section = soup.select_one(f"#{part_id}")
+    if not event_section:
+        return []
+    red = [
+        name.get_text().replace("\n", " ").strip()
+        for name in event_section.select(".c-listing-fight__corner-name--red")
+    ]
+    blue = [
+        name.get_text().replace("\n", " ").strip()
+        for name in event_section.select(".c-listing-fight__corner-name--blue")
+    ]
+    return [f"{r} vs {b}" for r, b in zip(red, blue)]
+
+
+def legacy_select(soup) -> list[str]:
+    """Per-part selection, as the scraper did before the single pass."""
+    descriptions = []
+    for part in soup.select("ul ul li.c-listing-viewing-option-group__item"):
+        part_title = part.find(
+            "div", {"class": "c-listing-viewing-option__fight-card"}
+        ).get_text(strip=True)
+        datetime.fromtimestamp(
+            int(
+                part.find("div", {"class": "c-listing-viewing-option__time"})[
+                    "data-timestamp"
+                ]
+            ),
+            timezone.utc,
+        )
+        if editor := soup.select_one("div.editor-content p"):
+            editor = editor.get_text(strip=True)
+        fighters = "\n".join(legacy_fighters(part_title, soup))
+        descriptions.append(f"{editor}\n{fighters}")
+    return descriptions
+
+
+def single_pass_select(soup) -> list[str]:
+    """Selection as done by ``parse_ufc_event``."""
+    if editor := soup.select_one("div.editor-content p"):
+        editor = editor.get_text(strip=True)
+    fighters = ufc_fighters_by_section(soup)
+    descriptions = []
+    for part in soup.select("ul ul li.c-listing-viewing-option-group__item"):
+        part_title = part.find(
+            "div", {"class": "c-listing-viewing-option__fight-card"}
+        ).get_text(strip=True)
+        datetime.fromtimestamp(
+            int(
+                part.find("div", {"class": "c-listing-viewing-option__time"})[
+                    "data-timestamp"
+                ]
+            ),
+            timezone.utc,
+        )
+        section_id = UFC_PART_SECTIONS.get(part_title, "main-card")
+        part_fighters = fighters.get(section_id, [])
+        descriptions.append(f"{editor}\n" + "\n".join(part_fighters))
+    return descriptions
+
+
+def timed(func, *args, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    html_parser = HtmlParser()
+    sample = PAGE.read_text()
+    print(
+        f"{'parts':>5} {'parse':>10} {'select (before)':>16} "
+        f"{'select (after)':>15} {'speedup':>8}"
+    )
+    for parts in (1, 3, 6, 12):
+        content = with_parts(sample, parts).encode()
+        regions = UfcCalendar.document_regions
+        parse = timed(html_parser.parse, content, regions, runs=args.runs)
+        soup = html_parser.parse(content, regions)
+        assert legacy_select(soup) == single_pass_select(soup)
+        before = timed(legacy_select, soup, runs=args.runs)
+        after = timed(single_pass_select, soup, runs=args.runs)
+        print(
+            f"{parts:>5} {parse * 1000:>8.2f}ms {before * 1000:>14.2f}ms "
+            f"{after * 1000:>13.2f}ms {before / after:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
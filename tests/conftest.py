@@ -1,14 +1,64 @@
+import atexit
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
 import pytest
+from ics import Event
+
+# Keep the stats, page cache and event database the backend opens on import out
+# of the working tree; set before any backend module is imported. Parse pool
+# processes importing this module reuse the directory of the test run, which
+# is removed after the stats are flushed at exit (atexit runs in reverse).
+if "CALENDAR_TESTS_DIR" not in os.environ:
+    os.environ["CALENDAR_TESTS_DIR"] = tempfile.mkdtemp(prefix="calendar-tests-")
+    atexit.register(
+        shutil.rmtree, os.environ["CALENDAR_TESTS_DIR"], ignore_errors=True
+    )
+DATA_DIR = Path(os.environ["CALENDAR_TESTS_DIR"])
+os.environ["CALENDAR_DATA_DIR"] = str(DATA_DIR)
+os.environ["EVENTS_DB"] = str(DATA_DIR / "events.db")
+
+from backend import main  # noqa: E402 pylint: disable=wrong-import-position
+from backend.ufc_calendar import UfcCalendar
+from backend.onefc_calendar import OneFcCalendar
+from backend.http_client import HttpClient
+from backend.page_cache import PageCache
+from backend.parse_pool import ParsePool
+from backend.planner import RefreshPlanner
+from backend.replay import Recording, ReplayAdapter
+from backend.repository import EventRepository
+from backend.throttle import HostThrottle
+
+RECORDING = Path(__file__).parent / "fixtures" / "pages"
+
 
-from mmacalendar.ufc_calendar import UfcCalendar
-from mmacalendar.onefc_calendar import OneFcCalendar
-from mmacalendar.main import app
+def pytest_addoption(parser):
+    parser.addoption(
+        "--live",
+        action="store_true",
+        help="Scrape ufc.com and onefc.com instead of the recorded pages.",
+    )
 
 
 @pytest.fixture(scope="session")
-def flask_app():
-    app.config.update({"TESTING": True})
-    yield app
+def flask_app(upstream):
+    """The app, serving calendars scraped from the recorded pages.
+
+    The refresh scheduler and stats ticker are never started, so no request
+    scrapes in the background.
+    """
+    main.app.config.update({"TESTING": True})
+    main._background_started = True  # pylint: disable=protected-access
+    for calendar in main.scheduler.calendars.values():
+        upstream(calendar).refresh()
+    yield main.app
 
 
 @pytest.fixture()
@@ -22,12 +72,131 @@ def runner(flask_app):
 
 
 @pytest.fixture(scope="session")
-def one_fc() -> OneFcCalendar:
-    one_fc = OneFcCalendar()
+def upstream(request, tmp_path_factory):
+    """Point a calendar at the recorded pages, unless running with ``--live``."""
+    live = request.config.getoption("--live")
+
+    def setup(calendar):
+        if live:
+            return calendar
+        directory = tmp_path_factory.mktemp(calendar.league)
+        client = HttpClient(throttle=HostThrottle(rate=0))
+        client.session.mount("https://", ReplayAdapter(Recording(RECORDING)))
+        calendar.http_client = client
+        calendar.page_cache = PageCache(directory / "pages")
+        calendar.repository = EventRepository(directory / "events.db")
+        calendar.calendar_file_name = directory / calendar.calendar_file_name
+        calendar.last_update = None
+        return calendar
+
+    return setup
+
+
+@pytest.fixture(scope="session")
+def upstream_pause(request):
+    """Wait between rounds of scraping, only when hitting the live sites."""
+    live = request.config.getoption("--live")
+    return lambda: time.sleep(3) if live else None
+
+
+@pytest.fixture(scope="session")
+def one_fc(upstream) -> OneFcCalendar:
+    one_fc = upstream(OneFcCalendar())
+    one_fc.refresh()
     return one_fc
 
 
 @pytest.fixture(scope="session")
-def ufc() -> UfcCalendar:
-    ufc = UfcCalendar()
+def ufc(upstream) -> UfcCalendar:
+    ufc = upstream(UfcCalendar())
+    ufc.refresh()
     return ufc
+
+
+# Start of the events built by make_event
+BEGIN = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def make_event(name: str, hours: int = 0, **fields) -> Event:
+    """A two hour event starting ``hours`` after ``BEGIN``.
+
+    Other ``Event`` arguments, such as ``url`` or ``description``, are passed on.
+    """
+    begin = BEGIN + timedelta(hours=hours)
+    return Event(name=name, begin=begin, end=begin + timedelta(hours=2), **fields)
+
+
+class FakeResponse:
+    def __init__(self, content: bytes, status_code: int = 200, headers=None) -> None:
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class FakeHttpClient:
+    """Serve canned pages by URL and count how often each one is requested.
+
+    Pages carry an ETag derived from their content and conditional requests
+    for an unchanged page are answered with a 304. URLs in ``errors`` are
+    answered with an error page and that status instead.
+    """
+
+    get_page = HttpClient.get_page
+
+    def __init__(self, pages: dict[str, str], conditional: bool = True) -> None:
+        self.pages = pages
+        self.conditional = conditional
+        self.errors: dict[str, int] = {}
+        self.requests: Counter[str] = Counter()
+
+    def get(self, url: str, headers=None, **kwargs) -> FakeResponse:
+        self.requests[url] += 1
+        if url in self.errors:
+            return FakeResponse(b"<h1>Service Unavailable</h1>", self.errors[url])
+        content = self.pages[url].encode()
+        etag = f'"{hashlib.sha256(content).hexdigest()}"'
+        if self.conditional and (headers or {}).get("If-None-Match") == etag:
+            return FakeResponse(b"", 304)
+        return FakeResponse(content, headers={"ETag": etag})
+
+
+ONEFC_LISTING = """
+<div id="upcoming-events-section">
+  <div class="simple-post-card"><a class="title" href="https://www.onefc.com/events/one-1/">ONE 1</a></div>
+  <div class="simple-post-card"><a class="title" href="https://www.onefc.com/events/one-2/">ONE 2</a></div>
+</div>
+"""
+
+ONEFC_EVENT = """
+<div class="info-content"><h3>{title}</h3></div>
+<div class="status-countdown" data-id="{event_id}"></div>
+<div class="editor-content"><p>{title} is coming.</p></div>
+<div class="versus">Fighter A vs Fighter B</div>
+<div class="versus">Fighter C vs Fighter D</div>
+"""
+
+
+@pytest.fixture()
+def onefc_http(monkeypatch, tmp_path) -> FakeHttpClient:
+    pages = {"https://www.onefc.com/events/": ONEFC_LISTING}
+    for event_id in (1, 2):
+        pages[f"https://www.onefc.com/events/one-{event_id}/"] = ONEFC_EVENT.format(
+            title=f"ONE {event_id}", event_id=event_id
+        )
+        pages[f"https://www.onefc.com/wp-json/public/v2/events/{event_id}"] = json.dumps(
+            {"utc_start": 1893456000 + event_id * 86400}
+        )
+    client = FakeHttpClient(pages)
+    monkeypatch.setattr(OneFcCalendar, "http_client", client)
+    monkeypatch.setattr(OneFcCalendar, "page_cache", PageCache(tmp_path / "pages"))
+    monkeypatch.setattr(OneFcCalendar, "calendar_file_name", tmp_path / "onefc.ics")
+    monkeypatch.setattr(
+        OneFcCalendar, "repository", EventRepository(tmp_path / "events.db")
+    )
+    monkeypatch.setattr(OneFcCalendar, "parse_pool", ParsePool(max_workers=0))
+    # Fetch every listed page; tests that cover planning enable it themselves
+    monkeypatch.setattr(OneFcCalendar, "planner", RefreshPlanner(enabled=False))
+    return client
@@ -1,13 +1,14 @@
+from datetime import datetime, timedelta
 from pathlib import PosixPath
-import time
 
-from ics import Event
+from ics import Calendar, Event
 
-from mmacalendar.ufc_calendar import UfcCalendar
-from mmacalendar.onefc_calendar import OneFcCalendar
+from backend.ufc_calendar import UfcCalendar
+from backend.onefc_calendar import OneFcCalendar
+from backend.planner import RefreshPlanner
 
 
-def test_check_for_duplicate_event_ufc(ufc: UfcCalendar):
+def test_check_for_duplicate_event_ufc(ufc: UfcCalendar, upstream_pause):
     for _ in range(3):
         before_update = [event.name for event in ufc.event_calendar.events]
         ufc.last_update = None
@@ -16,10 +17,10 @@ def test_check_for_duplicate_event_ufc(ufc: UfcCalendar):
         assert (
             before_update.sort() == after_update.sort()
         ), f"The UFC calendar does not match from initial creation, to a follow up scan from the site.\nBefore update: {before_update.sort()}\nAfter update: {after_update.sort()}"
-        time.sleep(3)
+        upstream_pause()
 
 
-def test_check_for_duplicate_event_one_fc(one_fc: OneFcCalendar):
+def test_check_for_duplicate_event_one_fc(one_fc: OneFcCalendar, upstream_pause):
     for _ in range(3):
         before_update = [event.name for event in one_fc.event_calendar.events]
         one_fc.last_update = None
@@ -28,7 +29,7 @@ def test_check_for_duplicate_event_one_fc(one_fc: OneFcCalendar):
         assert (
             before_update.sort() == after_update.sort()
         ), f"The One FC calendar does not match from initial creation, to a follow up scan from the site.\nBefore update: {before_update.sort()}\nAfter update: {after_update.sort()}"
-        time.sleep(3)
+        upstream_pause()
 
 
 def test_get_event_links_onefc(one_fc: OneFcCalendar):
@@ -87,3 +88,199 @@ def test_update_calendar_ufc(ufc: UfcCalendar):
     assert file_path
     assert isinstance(file_path, PosixPath)
     assert file_path.exists()
+
+
+def test_construction_does_not_scrape(onefc_http):
+    one_fc = OneFcCalendar()
+    assert not onefc_http.requests
+    assert one_fc._event_calendar is None
+
+
+def test_onefc_fetches_each_event_page_once(onefc_http):
+    one_fc = OneFcCalendar()
+    one_fc.refresh()
+    event_pages = [url for url in onefc_http.pages if "/events/one-" in url]
+    assert all(onefc_http.requests[url] == 1 for url in event_pages)
+    assert one_fc.page_fetches == len(event_pages) == 2
+    assert len(one_fc.event_calendar.events) == 2
+    for event in one_fc.event_calendar.events:
+        assert "Fighter A vs Fighter B" in event.description
+
+
+def test_restarted_worker_is_warm_from_repository(onefc_http):
+    one_fc = OneFcCalendar()
+    assert one_fc.refresh() == "refreshed"
+    body = one_fc.get_rendered().body
+    one_fc.file_path.unlink()
+    onefc_http.requests.clear()
+
+    restarted = OneFcCalendar()
+    assert not restarted.time_to_update()
+    assert restarted.get_rendered().body == body
+    assert restarted.refresh() == "reloaded"
+    assert {event.name for event in restarted.event_calendar.events} == {
+        "ONE 1",
+        "ONE 2",
+    }
+    assert not onefc_http.requests
+    assert restarted.repository.runs("onefc")[0]["events_count"] == 2
+
+
+def test_unchanged_pages_reuse_extracted_events(onefc_http):
+    one_fc = OneFcCalendar()
+    one_fc.refresh()
+    assert one_fc.cache_counts["misses"] == 5
+    assert one_fc.fingerprint_counts == {"hits": 0, "misses": 2}
+
+    one_fc.last_update = None
+    one_fc.update_calendar()
+    assert one_fc.cache_counts == {"misses": 0, "not_modified": 5}
+    assert one_fc.fingerprint_counts == {"hits": 2, "misses": 0}
+    assert one_fc.page_fetches == len(one_fc.event_calendar.events) == 2
+
+    onefc_http.pages["https://www.onefc.com/wp-json/public/v2/events/2"] = (
+        '{"utc_start": 1900000000}'
+    )
+    one_fc.last_update = None
+    one_fc.update_calendar()
+    assert one_fc.cache_counts == {"misses": 1, "not_modified": 4}
+    assert one_fc.fingerprint_counts == {"hits": 1, "misses": 1}
+    assert one_fc.page_fetches == 2
+
+
+def test_worker_reloads_after_a_refresh_that_changed_nothing(onefc_http):
+    first, second = OneFcCalendar(), OneFcCalendar()
+    assert first.refresh() == "refreshed"
+    assert second.refresh() == "reloaded"
+
+    # A day later the first worker refreshes and upstream has not changed
+    second.last_update -= second.refresh_interval
+    assert first.refresh(force=True) == "refreshed"
+    onefc_http.requests.clear()
+    assert second.refresh() == "reloaded"
+    assert not onefc_http.requests
+
+
+def test_refresh_only_serializes_and_stores_changed_events(onefc_http):
+    one_fc = OneFcCalendar()
+    one_fc.refresh()
+    revision = one_fc.repository.revision("onefc")
+    mtime = one_fc.file_path.stat().st_mtime_ns
+
+    one_fc.refresh(force=True)
+    assert (one_fc.fragment_cache.hits, one_fc.fragment_cache.misses) == (2, 0)
+    assert one_fc.repository.revision("onefc") == revision
+    assert one_fc.file_path.stat().st_mtime_ns == mtime
+
+    onefc_http.pages["https://www.onefc.com/wp-json/public/v2/events/2"] = (
+        '{"utc_start": 1900000000}'
+    )
+    one_fc.refresh(force=True)
+    assert (one_fc.fragment_cache.hits, one_fc.fragment_cache.misses) == (1, 1)
+    assert one_fc.repository.revision("onefc") == revision + 1
+    assert one_fc.file_path.read_bytes() == one_fc.get_rendered().body
+
+
+def test_workers_scraping_unchanged_pages_store_nothing(onefc_http):
+    workers = [OneFcCalendar(), OneFcCalendar()]
+    workers[0].refresh()
+    revision = workers[0].repository.revision("onefc")
+    uids = {row["uid"] for row in workers[0].repository.events("onefc")}
+
+    # Each worker parses the pages itself, so ics gives its events new UIDs
+    for worker in workers * 2:
+        worker.refresh(force=True)
+    assert workers[0].repository.revision("onefc") == revision
+    assert {row["uid"] for row in workers[0].repository.events("onefc")} == uids
+    assert {event.uid for event in workers[1].event_calendar.events} == uids
+
+
+def test_unchanged_content_skips_parsing_without_304(onefc_http):
+    onefc_http.conditional = False
+    one_fc = OneFcCalendar()
+    one_fc.refresh()
+    assert one_fc.page_fetches == 2
+
+    for url in list(onefc_http.pages):
+        if "/events/one-" in url:
+            onefc_http.pages[url] += "<script>var token = 'rotated';</script>"
+    one_fc.last_update = None
+    one_fc.update_calendar()
+    assert one_fc.cache_counts == {"misses": 5, "not_modified": 0}
+    assert one_fc.fingerprint_counts == {"hits": 2, "misses": 0}
+    assert one_fc.page_fetches == 2
+
+
+def test_error_pages_are_not_recorded_as_changes(onefc_http):
+    url = "https://www.onefc.com/events/one-1/"
+    OneFcCalendar().refresh()
+    changed_at = OneFcCalendar.repository.page(url)["changed_at"]
+
+    onefc_http.errors[url] = 503
+    assert OneFcCalendar().fetch_page(url).status == 503
+    del onefc_http.errors[url]
+    OneFcCalendar().fetch_page(url)
+    page = OneFcCalendar.repository.page(url)
+    assert page["change_count"] == 0 and page["changed_at"] == changed_at
+
+
+def test_planned_refresh_skips_distant_event_pages(onefc_http, monkeypatch):
+    monkeypatch.setattr(OneFcCalendar, "planner", RefreshPlanner(enabled=True))
+    one_fc = OneFcCalendar()
+    one_fc.refresh()
+    assert one_fc.plan_counts == {"due": 2, "skipped": 0}
+    revision = one_fc.repository.revision("onefc")
+
+    onefc_http.requests.clear()
+    one_fc.refresh(force=True)
+    assert one_fc.plan_counts == {"due": 0, "skipped": 2}
+    assert list(onefc_http.requests) == ["https://www.onefc.com/events/"]
+    assert one_fc.repository.revision("onefc") == revision
+    assert len(one_fc.event_calendar.events) == 2
+
+
+def test_compact_archives_events_outside_retention(onefc_http):
+    one_fc = OneFcCalendar()
+    one_fc.refresh()
+    now = datetime.now(tz=one_fc.UTC)
+    for days_ago in (400, 300):
+        begin = now - timedelta(days=days_ago)
+        one_fc.update_existing_event(
+            Event(name=f"ONE {days_ago}", begin=begin, end=begin + timedelta(hours=3))
+        )
+    recent = now - timedelta(days=10)
+    one_fc.update_existing_event(
+        Event(name="ONE recent", begin=recent, end=recent + timedelta(hours=3))
+    )
+
+    report = one_fc.compact()
+    assert report["pruned"] == 2
+    assert report["kept"] == 3
+    assert report["bytes_saved"] > 0
+    names = {event.name for event in one_fc.event_calendar.events}
+    assert "ONE recent" in names and "ONE 400" not in names
+
+    archive = Calendar(one_fc.archive_path.read_text(encoding="UTF-8"))
+    assert {event.name for event in archive.events} == {"ONE 400", "ONE 300"}
+    assert one_fc.compact()["pruned"] == 0
+
+
+def test_compact_rolled_back_does_not_archive_events_twice(onefc_http):
+    one_fc = OneFcCalendar()
+    one_fc.refresh()
+    begin = datetime.now(tz=one_fc.UTC) - timedelta(days=400)
+    one_fc.update_existing_event(
+        Event(name="ONE 400", begin=begin, end=begin + timedelta(hours=3))
+    )
+    try:
+        with one_fc.repository.transaction():
+            one_fc.compact()
+            raise RuntimeError("refresh failed")
+    except RuntimeError:
+        one_fc._event_calendar = one_fc._event_store = None
+
+    assert one_fc.compact()["pruned"] == 1
+    archive = one_fc.archive_path.read_bytes().decode("UTF-8")
+    assert archive.count("SUMMARY:ONE 400") == 1
+    assert "\n" not in archive.replace("\r\n", "")
+    assert not list(one_fc.archive_path.parent.glob("*.tmp"))
@@ -0,0 +1,102 @@
+from types import SimpleNamespace
+
+import pytest
+from ics import Calendar
+
+from backend import combined
+from backend.combined import CombinedCalendar, merge_events
+from backend.rendering import RenderedCalendar, render_fragments
+from backend.repository import EventRepository
+from tests.conftest import make_event
+
+
+def add_event(repository, league: str, name: str, hours: int) -> None:
+    repository.upsert(league, make_event(name, hours))
+
+
+class LeagueCalendar(SimpleNamespace):
+    def get_rendered(self) -> RenderedCalendar:
+        return RenderedCalendar(
+            render_fragments(self.repository.fragments(self.league))
+        )
+
+
+def league_calendars(repository) -> dict[str, LeagueCalendar]:
+    return {
+        league: LeagueCalendar(repository=repository, league=league)
+        for league in ("ufc", "onefc")
+    }
+
+
+@pytest.fixture()
+def calendars(tmp_path):
+    repository = EventRepository(tmp_path / "events.db")
+    for name, hours in (("UFC 1", 0), ("UFC 2", 48), ("UFC 3", 96)):
+        add_event(repository, "ufc", name, hours)
+    for name, hours in (("ONE 1", 24), ("ONE 2", 72)):
+        add_event(repository, "onefc", name, hours)
+    return league_calendars(repository)
+
+
+def test_merge_events_keeps_calendar_order():
+    first = [{"begin_at": "1", "name": "a"}, {"begin_at": "3", "name": "a"}]
+    second = [{"begin_at": "2", "name": None}, {"begin_at": "3", "name": None}]
+    merged = [
+        (event["begin_at"], event["name"]) for event in merge_events([first, second])
+    ]
+    assert merged == [("1", "a"), ("2", None), ("3", None), ("3", "a")]
+
+
+def test_leagues_are_normalized_and_checked(calendars):
+    feed = CombinedCalendar(calendars)
+    assert feed.leagues() == ("onefc", "ufc")
+    assert feed.leagues("UFC, onefc,") == ("onefc", "ufc")
+    assert feed.leagues("ufc") == ("ufc",)
+    with pytest.raises(ValueError):
+        feed.leagues("ufc,bellator")
+
+
+def test_combined_calendar_is_streamed_then_kept(calendars, monkeypatch):
+    monkeypatch.setattr(combined, "CHUNK_SIZE", 1)
+    feed = CombinedCalendar(calendars)
+    leagues = feed.leagues()
+    assert feed.get_rendered(leagues) is None
+
+    chunks = list(feed.stream(leagues))
+    assert len(chunks) == 7, "Expected the header, one chunk per event and the end."
+    body = b"".join(chunks)
+    names = [
+        event.name
+        for event in sorted(Calendar(body.decode()).events, key=lambda e: e.begin)
+    ]
+    assert names == ["UFC 1", "ONE 1", "UFC 2", "ONE 2", "UFC 3"]
+    assert feed.get_rendered(leagues).body == body
+
+    etag = feed.etag(leagues)
+    add_event(calendars["onefc"].repository, "onefc", "ONE 3", 120)
+    assert feed.get_rendered(leagues) is None, "A changed league was not picked up."
+    assert feed.etag(leagues) != etag
+
+
+def test_etag_changes_with_content_when_revisions_restart(tmp_path):
+    etags = []
+    for name in ("UFC 1", "UFC 2"):
+        repository = EventRepository(tmp_path / f"{name}.db")
+        add_event(repository, "ufc", name, 0)
+        assert repository.revision("ufc") == 1
+        etags.append(CombinedCalendar(league_calendars(repository)).etag(("ufc",)))
+    assert etags[0] != etags[1]
+
+
+def test_combined_calendar_route(client):
+    response = client.get("/mma")
+    assert response.status_code == 200
+    assert response.data.startswith(b"BEGIN:VCALENDAR")
+    assert response.data.endswith(b"END:VCALENDAR")
+    etag = response.headers["ETag"]
+
+    response = client.get("/mma", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.get("/mma?leagues=ufc,bellator")
+    assert response.status_code == 400
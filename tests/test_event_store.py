@@ -0,0 +1,35 @@
+from backend.event_store import EventStore
+from tests.conftest import make_event
+
+
+def test_upsert_replaces_event_with_same_name():
+    store = EventStore()
+    original = make_event("Main Card - UFC 400")
+    store.upsert(original)
+    moved = make_event("Main Card - UFC 400", hours=5)
+    assert store.upsert(moved) is original
+    assert store.events == {moved}
+    assert store.find_match(make_event("Main Card - UFC 400", hours=9)) is moved
+
+
+def test_upsert_replaces_event_with_same_times():
+    store = EventStore()
+    original = make_event("Main Card - UFC 400")
+    store.upsert(original)
+    renamed = make_event("Main Card - UFC 400: Jones vs Aspinall")
+    assert store.upsert(renamed) is original
+    assert store.events == {renamed}
+
+
+def test_upsert_adds_unrelated_event():
+    events = set()
+    store = EventStore(events)
+    store.upsert(make_event("Main Card - UFC 400"))
+    store.upsert(make_event("Prelims - UFC 400", hours=-2))
+    assert len(events) == 2
+
+
+def test_rebuild_indexes_existing_events():
+    existing = make_event("Main Card - UFC 400")
+    store = EventStore({existing})
+    assert store.find_match(make_event("Main Card - UFC 400", hours=1)) is existing
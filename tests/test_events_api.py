@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.events_api import (
+    SyncTokenExpired,
+    decode_cursor,
+    list_events,
+    parse_limit,
+    sync_events,
+)
+from backend.repository import EventRepository
+from tests.conftest import make_event
+
+
+@pytest.fixture()
+def repository(tmp_path) -> EventRepository:
+    repository = EventRepository(tmp_path / "events.db")
+    for number in range(5):
+        repository.upsert("ufc", make_event(f"UFC {number}", hours=24 * number))
+    repository.upsert("onefc", make_event("ONE 1"))
+    return repository
+
+
+def test_events_are_listed_in_pages_by_start_time(repository):
+    names, cursor, tokens = [], None, set()
+    while True:
+        page = list_events(repository, "ufc", cursor, limit=2)
+        names += [event["name"] for event in page["events"]]
+        tokens.add(page["sync_token"])
+        if (cursor := page["next_cursor"]) is None:
+            break
+        # Changes made while paging do not move the listing's token
+        repository.upsert("ufc", make_event(f"UFC early {len(names)}", hours=-1))
+    assert names == ["UFC 0", "UFC 1", "UFC 2", "UFC 3", "UFC 4"]
+    assert tokens == {"5"}
+
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor")
+    with pytest.raises(ValueError):
+        parse_limit("1000")
+
+
+def test_sync_returns_only_changes_since_the_token(repository):
+    token = int(list_events(repository, "ufc")["sync_token"])
+    assert sync_events(repository, "ufc", token)["events"] == []
+
+    renamed = make_event("UFC 1: Jones vs Aspinall", hours=24)
+    repository.upsert("ufc", renamed)
+    repository.upsert("ufc", make_event("UFC 5", hours=120))
+    removed_id = list_events(repository, "ufc")["events"][0]["id"]
+    repository.delete("ufc", [repository.events("ufc")[0]["uid"]])
+    repository.upsert("onefc", make_event("ONE 2"))
+
+    delta = sync_events(repository, "ufc", token)
+    assert [event["name"] for event in delta["events"]] == [
+        "UFC 1: Jones vs Aspinall",
+        "UFC 5",
+    ]
+    assert delta["removed"] == [removed_id]
+    assert not delta["has_more"]
+
+    first = sync_events(repository, "ufc", token, limit=2)
+    assert first["has_more"]
+    rest = sync_events(repository, "ufc", int(first["sync_token"]))
+    assert rest["removed"] == [removed_id]
+    assert rest["sync_token"] == delta["sync_token"]
+    assert sync_events(repository, "ufc", int(rest["sync_token"]))["events"] == []
+
+
+def test_tokens_older_than_the_kept_change_log_expire(repository):
+    assert repository.prune_changes("ufc", datetime.now(tz=timezone.utc)) == 5
+    with pytest.raises(SyncTokenExpired):
+        sync_events(repository, "ufc", 0)
+    token = int(list_events(repository, "ufc")["sync_token"])
+    assert token == 5
+    repository.upsert("ufc", make_event("UFC 5", hours=120))
+    assert [e["name"] for e in sync_events(repository, "ufc", token)["events"]] == [
+        "UFC 5"
+    ]
+
+
+def test_events_api_route(client):
+    response = client.get("/api/ufc/events?limit=1")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert set(body) == {"events", "next_cursor", "sync_token"}
+
+    response = client.get(f"/api/ufc/events?since={body['sync_token']}")
+    assert response.status_code == 200
+    assert response.get_json()["sync_token"] == body["sync_token"]
+
+    assert client.get("/api/ufc/events?cursor=nope").status_code == 400
+    assert client.get("/api/bellator/events").status_code == 404
@@ -0,0 +1,57 @@
+import threading
+import time
+
+import pytest
+
+from backend.fetcher import FetchEngine
+
+
+def test_map_preserves_input_order():
+    engine = FetchEngine(max_workers=8)
+    delays = [0.05, 0.0, 0.03, 0.01]
+
+    def work(delay):
+        time.sleep(delay)
+        return delay
+
+    assert engine.map(work, delays) == delays
+
+
+def test_map_runs_concurrently():
+    engine = FetchEngine(max_workers=8)
+    start = time.perf_counter()
+    engine.map(time.sleep, [0.2] * 8)
+    elapsed = time.perf_counter() - start
+    assert elapsed < 0.2 * 3, f"Eight 200ms tasks took {elapsed:.2f}s."
+
+
+def test_host_slot_bounds_concurrency_per_host():
+    engine = FetchEngine(max_workers=8, per_host=2)
+    in_flight = {"a": 0, "b": 0}
+    peak = {"a": 0, "b": 0}
+    lock = threading.Lock()
+
+    def work(url):
+        host = url.split("/")[2]
+        with engine.host_slot(url):
+            with lock:
+                in_flight[host] += 1
+                peak[host] = max(peak[host], in_flight[host])
+            time.sleep(0.05)
+            with lock:
+                in_flight[host] -= 1
+
+    engine.map(work, [f"https://{host}/{i}" for i in range(6) for host in "ab"])
+    assert peak == {"a": 2, "b": 2}
+
+
+def test_map_reraises_first_failure():
+    engine = FetchEngine()
+
+    def work(item):
+        if item:
+            raise ValueError(item)
+        return item
+
+    with pytest.raises(ValueError, match="first"):
+        engine.map(work, [0, "first", "second"])
@@ -1,3 +1,5 @@
+import gzip
+
 import pytest
 
 
@@ -41,3 +43,21 @@ def test_direct_link(client):
         f"One FC calendar direct link returned {response.status_code}"
     )
     assert b"BEGIN:VCALENDAR" in response.data, "One FC direct calendar link did not contain calendar data."
+
+
+def test_calendar_etag_and_compression(client):
+    response = client.get("/ufc", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(response.data).startswith(b"BEGIN:VCALENDAR")
+    etag = response.headers["ETag"]
+
+    response = client.get(
+        "/ufc", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert response.status_code == 304, "Unchanged calendar was sent again."
+    assert not response.data
+
+    response = client.get("/ufc", headers={"If-None-Match": etag})
+    assert response.status_code == 200, "ETag of another encoding matched."
+    assert response.data.startswith(b"BEGIN:VCALENDAR")
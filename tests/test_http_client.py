@@ -0,0 +1,91 @@
+import pytest
+import requests
+
+from backend.http_client import HttpClient
+from backend.throttle import CircuitOpenError, HostThrottle
+
+
+class FakeResponse:
+    def __init__(self, status_code: int) -> None:
+        self.status_code = status_code
+        self.content = b""
+
+
+def make_client(monkeypatch, outcomes: list, **kwargs) -> tuple[HttpClient, list]:
+    client = HttpClient(backoff=0, **kwargs)
+    calls = []
+
+    def fake_get(url, **request_kwargs):
+        calls.append(request_kwargs)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return FakeResponse(outcome)
+
+    monkeypatch.setattr(client.session, "get", fake_get)
+    return client, calls
+
+
+def test_user_agent_and_timeout_are_applied(monkeypatch):
+    client, calls = make_client(
+        monkeypatch, [200], user_agent="test-agent", connect_timeout=1, read_timeout=2
+    )
+    assert client.get("https://www.ufc.com/events").status_code == 200
+    assert client.session.headers["User-Agent"] == "test-agent"
+    assert calls[0]["timeout"] == (1, 2)
+
+
+def test_retryable_status_is_retried(monkeypatch):
+    client, calls = make_client(monkeypatch, [503, 502, 200], max_retries=2)
+    assert client.get("https://www.ufc.com/events").status_code == 200
+    assert len(calls) == 3
+
+
+def test_retries_are_bounded(monkeypatch):
+    client, calls = make_client(monkeypatch, [503, 503, 503], max_retries=1)
+    assert client.get("https://www.ufc.com/events").status_code == 503
+    assert len(calls) == 2
+
+    client, calls = make_client(
+        monkeypatch, [requests.ConnectionError(), requests.Timeout()], max_retries=1
+    )
+    with pytest.raises(requests.Timeout):
+        client.get("https://www.onefc.com/events/")
+    assert len(calls) == 2
+
+
+def test_backoff_delay_is_jittered_and_grows():
+    client = HttpClient(backoff=1)
+    for attempt in range(1, 5):
+        assert 0 <= client.backoff_delay(attempt) <= 2 ** (attempt - 1)
+
+
+def test_failing_host_is_not_requested_while_its_circuit_is_open(monkeypatch):
+    host_throttle = HostThrottle(rate=0, threshold=3, cooldown=60)
+    client, calls = make_client(
+        monkeypatch, [503, 503, 503, 200], max_retries=1, throttle=host_throttle
+    )
+    assert client.get("https://www.ufc.com/events").status_code == 503
+    with pytest.raises(CircuitOpenError):
+        client.get("https://www.ufc.com/event/1")
+    assert len(calls) == 3
+    assert host_throttle.status()["www.ufc.com"]["circuit"] == "open"
+
+
+def test_any_request_error_during_the_trial_reopens_the_circuit(monkeypatch):
+    host_throttle = HostThrottle(rate=0, threshold=1, cooldown=0)
+    client, calls = make_client(
+        monkeypatch,
+        [503, requests.exceptions.ChunkedEncodingError(), 200],
+        max_retries=0,
+        throttle=host_throttle,
+    )
+    assert client.get("https://www.ufc.com/events").status_code == 503
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        client.get("https://www.ufc.com/events")
+    assert host_throttle.status()["www.ufc.com"]["opens"] == 2
+
+    # The failed trial was recorded, so the next one is let through
+    assert client.get("https://www.ufc.com/events").status_code == 200
+    assert host_throttle.status()["www.ufc.com"]["circuit"] == "closed"
+    assert len(calls) == 3
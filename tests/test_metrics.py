@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from backend.metrics import Counter, Histogram, Metrics
+from backend.onefc_calendar import OneFcCalendar
+
+
+def test_counter_renders_one_line_per_series():
+    counter = Counter("bytes_total", "Bytes.", ("host",))
+    counter.inc(10, host="www.ufc.com")
+    counter.inc(5, host="www.ufc.com")
+    counter.inc(1, host='a "quoted" host')
+    assert counter.value(host="www.ufc.com") == 15
+    assert counter.render() == (
+        "# HELP bytes_total Bytes.\n"
+        "# TYPE bytes_total counter\n"
+        'bytes_total{host="a \\"quoted\\" host"} 1\n'
+        'bytes_total{host="www.ufc.com"} 15\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram("seconds", "Seconds.", ("phase",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 3):
+        histogram.observe(value, phase="scrape")
+    assert histogram.count(phase="scrape") == 4
+    assert histogram.render().splitlines()[2:] == [
+        'seconds_bucket{phase="scrape",le="0.1"} 1',
+        'seconds_bucket{phase="scrape",le="1"} 3',
+        'seconds_bucket{phase="scrape",le="+Inf"} 4',
+        'seconds_sum{phase="scrape"} 4.25',
+        'seconds_count{phase="scrape"} 4',
+    ]
+
+
+def test_histogram_times_blocks_that_raise():
+    histogram = Histogram("seconds", "Seconds.")
+    with pytest.raises(ValueError):
+        with histogram.time():
+            raise ValueError
+    assert histogram.count() == 1
+
+
+def test_refresh_records_each_phase(onefc_http, monkeypatch):
+    metrics = Metrics()
+    monkeypatch.setattr(OneFcCalendar, "metrics", metrics)
+    calendar = OneFcCalendar()
+    calendar.last_update = None
+    calendar.refresh()
+
+    for phase in ("links", "scrape", "merge", "compact", "write"):
+        assert metrics.refresh_phase_seconds.count(league="onefc", phase=phase) == 1
+    assert metrics.refresh_seconds.count(league="onefc", result="success") == 1
+    assert metrics.parse_seconds.count(league="onefc") == 2
+    assert metrics.events_upserted.value(league="onefc") == 2
+    assert metrics.events_stored.value(league="onefc") == 2
+
+
+def test_metrics_endpoint_reports_requests_by_route(client):
+    client.get("/onefc/apple")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    pid = f'pid="{os.getpid()}"'
+    assert "# TYPE http_request_seconds histogram" in body
+    assert (
+        "http_request_seconds_count"
+        f'{{route="/onefc/apple",method="GET",status="302",{pid}}}' in body
+    )
+    assert f'http_response_bytes_count{{route="/onefc/apple",{pid}}}' in body
+    samples = [line for line in body.splitlines() if not line.startswith("#")]
+    assert all(pid in line for line in samples), "A series has no worker label."
@@ -0,0 +1,19 @@
+import os
+
+from backend.parse_pool import ParsePool
+
+
+def test_runs_in_pool_processes_during_a_session():
+    parse_pool = ParsePool(max_workers=2)
+    assert parse_pool.run(os.getpid) == os.getpid()
+    with parse_pool.session():
+        with parse_pool.session():
+            assert parse_pool.run(os.getpid) != os.getpid()
+        assert parse_pool._executor is not None
+    assert parse_pool._executor is None
+
+
+def test_without_workers_runs_inline():
+    parse_pool = ParsePool(max_workers=0)
+    with parse_pool.session():
+        assert parse_pool.run(os.getpid) == os.getpid()
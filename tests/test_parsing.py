@@ -0,0 +1,126 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+from backend.extraction import parse_ufc_event, ufc_fighters_by_section
+from backend.onefc_calendar import OneFcCalendar
+from backend.page_cache import PageCache
+from backend.parse_pool import ParsePool
+from backend.parsing import HtmlParser, PageRegions
+from backend.repository import EventRepository
+from backend.ufc_calendar import UfcCalendar
+from tests.conftest import FakeHttpClient
+
+PAGES = Path(__file__).parent / "fixtures" / "pages"
+UFC_EVENT = "https://www.ufc.com/event/ufc-400"
+ONEFC_EVENT = "https://www.onefc.com/events/fight-night-40/"
+BACKENDS = [
+    features
+    for features in ("html.parser", "lxml")
+    if features == "html.parser" or importlib.util.find_spec(features)
+]
+
+
+@pytest.fixture()
+def sample_pages(monkeypatch, tmp_path) -> FakeHttpClient:
+    client = FakeHttpClient(
+        {
+            "https://www.ufc.com/events": (PAGES / "ufc_events.html").read_text(),
+            UFC_EVENT: (PAGES / "ufc_event.html").read_text(),
+            "https://www.onefc.com/events/": (PAGES / "onefc_events.html").read_text(),
+            ONEFC_EVENT: (PAGES / "onefc_event.html").read_text(),
+            "https://www.onefc.com/wp-json/public/v2/events/40": json.dumps(
+                {"utc_start": 1900000000}
+            ),
+        }
+    )
+    for calendar in (UfcCalendar, OneFcCalendar):
+        monkeypatch.setattr(calendar, "http_client", client)
+        monkeypatch.setattr(calendar, "page_cache", PageCache(tmp_path / "pages"))
+        monkeypatch.setattr(
+            calendar, "repository", EventRepository(tmp_path / "events.db")
+        )
+        monkeypatch.setattr(calendar, "parse_pool", ParsePool(max_workers=0))
+    return client
+
+
+def scrape(calendar_class, parser: HtmlParser, parse_pool: ParsePool | None = None):
+    calendar = calendar_class()
+    calendar.html_parser = parser
+    if parse_pool is not None:
+        calendar.parse_pool = parse_pool
+    with calendar.refresh_cache():
+        links = calendar.get_event_links()
+        url = UFC_EVENT if calendar_class is UfcCalendar else ONEFC_EVENT
+        events = calendar.get_events_from_url(url)
+    return links, [
+        (event.name, event.begin, event.end, event.description) for event in events
+    ]
+
+
+@pytest.mark.parametrize("calendar_class", [UfcCalendar, OneFcCalendar])
+@pytest.mark.parametrize("features", BACKENDS)
+def test_partial_parsing_extracts_the_same_events(
+    sample_pages, calendar_class, features
+):
+    links, events = scrape(calendar_class, HtmlParser(features, partial=True))
+    assert (links, events) == scrape(
+        calendar_class, HtmlParser("html.parser", partial=False)
+    )
+    assert links and events
+
+
+def test_ufc_sample_page_is_fully_extracted(sample_pages):
+    _, events = scrape(UfcCalendar, HtmlParser(partial=True))
+    assert [name for name, *_ in events] == [
+        "Main Card - UFC 400 Pereira vs Hill",
+        "Prelims - UFC 400 Pereira vs Hill",
+        "Early Prelims - UFC 400 Pereira vs Hill",
+    ]
+    assert all(description.count(" vs ") == 5 for *_, description in events)
+
+
+def test_ufc_card_is_read_in_one_pass():
+    content = (
+        b'<div class="c-hero__header">UFC 1</div><ul><ul>'
+        b'<li class="c-listing-viewing-option-group__item">'
+        b'<div class="c-listing-viewing-option__fight-card">Prelims</div>'
+        b'<div class="c-listing-viewing-option__time" data-timestamp="200"></div></li>'
+        b'<li class="c-listing-viewing-option-group__item">'
+        b'<div class="c-listing-viewing-option__fight-card">Fight Pass</div>'
+        b'<div class="c-listing-viewing-option__time" data-timestamp="100"></div></li>'
+        b'</ul></ul><div id="main-card">'
+        b'<div class="c-listing-fight__corner-name--blue">B</div>'
+        b'<div class="c-listing-fight__corner-name--red">A</div></div>'
+    )
+    soup = HtmlParser("html.parser").parse(content)
+    assert ufc_fighters_by_section(soup) == {"main-card": ["A vs B"]}
+
+    prelims, fight_pass = parse_ufc_event("url", content, HtmlParser(), None)
+    assert prelims.description == "Featured fighters:\n"
+    # Unknown parts fall back to the main card
+    assert fight_pass.description == "Featured fighters:\nA vs B"
+
+
+def test_regions_keep_only_matching_subtrees():
+    regions = PageRegions(
+        tags=frozenset({"ul"}), ids=frozenset({"card"}), classes=frozenset({"x"})
+    )
+    soup = HtmlParser("html.parser").parse(
+        b"<script>var a = 1;</script><ul><li>kept</li></ul><p>dropped</p>"
+        b'<div id="card"><p>kept</p></div><div class="y x">kept</div>',
+        regions,
+    )
+    assert soup.get_text() == "keptkeptkept"
+    assert soup.select_one("#card p").get_text() == "kept"
+
+
+def test_parse_pool_processes_extract_the_same_events(sample_pages):
+    parse_pool = ParsePool(max_workers=2)
+    for calendar_class in (UfcCalendar, OneFcCalendar):
+        assert scrape(calendar_class, HtmlParser(), parse_pool) == scrape(
+            calendar_class, HtmlParser()
+        )
+    assert parse_pool._executor is None, "Pool outlived the refresh."
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+from backend.planner import RefreshPlanner
+
+NOW = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def history(begins_in: timedelta, fetched_ago: timedelta, changed_ago=None):
+    """Page history; the page never changed unless ``changed_ago`` is given."""
+    return {
+        "fetched_at": (NOW - fetched_ago).isoformat(),
+        "changed_at": (NOW - (changed_ago or fetched_ago)).isoformat(),
+        "change_count": int(changed_ago is not None),
+        "begin_at": (NOW + begins_in).isoformat(),
+        "end_at": (NOW + begins_in + timedelta(hours=6)).isoformat(),
+    }
+
+
+def test_new_pages_are_due():
+    planner = RefreshPlanner(enabled=True)
+    never_scraped = history(timedelta(days=90), timedelta(hours=1))
+    never_scraped["begin_at"] = never_scraped["end_at"] = None
+    assert planner.plan(["new", "empty"], {"empty": never_scraped}, NOW) == (
+        ["new", "empty"],
+        [],
+    )
+
+
+def test_near_events_are_fetched_every_refresh():
+    planner = RefreshPlanner(enabled=True)
+    pages = {
+        "fight-week": history(timedelta(days=3), timedelta(minutes=5)),
+        "underway": history(timedelta(hours=-2), timedelta(minutes=5)),
+        "next-month": history(timedelta(days=20), timedelta(days=1)),
+        "next-month-stale": history(timedelta(days=20), timedelta(days=3)),
+        "distant": history(timedelta(days=90), timedelta(days=6)),
+        "distant-stale": history(timedelta(days=90), timedelta(days=7)),
+    }
+    due, skipped = planner.plan(pages, pages, NOW)
+    assert due == ["fight-week", "underway", "next-month-stale", "distant-stale"]
+    assert skipped == ["next-month", "distant"]
+
+
+def test_recently_changed_pages_are_fetched_more_often():
+    planner = RefreshPlanner(enabled=True)
+    settled = history(timedelta(days=90), timedelta(days=4), timedelta(days=60))
+    changed = history(timedelta(days=90), timedelta(days=4), timedelta(days=4))
+    assert planner.interval(settled, NOW) == timedelta(days=7)
+    assert planner.interval(changed, NOW) == timedelta(days=3.5)
+    pages = {"settled": settled, "changed": changed}
+    assert planner.plan(pages, pages, NOW) == (["changed"], ["settled"])
+
+
+def test_disabled_planner_fetches_everything():
+    pages = {"distant": history(timedelta(days=90), timedelta(minutes=5))}
+    assert RefreshPlanner(enabled=False).plan(pages, pages, NOW) == (["distant"], [])
@@ -0,0 +1,57 @@
+from ics import Calendar
+
+from backend.rendering import (
+    CALENDAR_HEADER,
+    FragmentCache,
+    content_hash,
+    render_calendar,
+)
+from tests.conftest import make_event
+
+
+def test_header_matches_ics():
+    assert Calendar().serialize().removesuffix("END:VCALENDAR") == CALENDAR_HEADER
+
+
+def test_content_hash_follows_serialized_fields():
+    event = make_event("Main Card - UFC 400")
+    key = content_hash(event)
+    assert key == content_hash(event)
+    event.description = "Jones vs Aspinall"
+    assert content_hash(event) != key
+
+
+def test_content_hash_ignores_the_generated_uid():
+    first, second = make_event("Main Card - UFC 400"), make_event("Main Card - UFC 400")
+    assert first.uid != second.uid
+    assert content_hash(first) == content_hash(second)
+
+    cache = FragmentCache()
+    assert cache.serialize(first)[1] == first.serialize()
+    assert cache.serialize(second)[1] == second.serialize()
+
+
+def test_fragment_cache_serializes_only_changed_events():
+    events = [make_event(f"UFC {i}", hours=24 * i) for i in range(3)]
+    cache = FragmentCache()
+    body = render_calendar(events, cache)
+    assert body == render_calendar(events)
+    assert (cache.hits, cache.misses) == (0, 3)
+
+    cache.sweep()
+    events[1].description = "Jones vs Aspinall"
+    assert render_calendar(events, cache) == render_calendar(events)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_sweep_drops_unused_fragments():
+    cache = FragmentCache()
+    kept, dropped = make_event("UFC 1"), make_event("UFC 2", hours=24)
+    cache.serialize(kept)
+    cache.serialize(dropped)
+    cache.sweep()
+    cache.serialize(kept)
+    cache.sweep()
+    assert len(cache) == 1
+    assert cache.serialize(kept)[1] == kept.serialize()
+    assert cache.hits == 1
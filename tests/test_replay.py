@@ -0,0 +1,65 @@
+import time
+
+from requests import Response
+from requests.adapters import HTTPAdapter
+
+from backend.http_client import HttpClient
+from backend.page_cache import PageCache
+from backend.replay import Recording, RecordedResponse, RecordingAdapter, ReplayAdapter
+from backend.throttle import HostThrottle
+from tests.conftest import RECORDING
+
+UFC_EVENTS = "https://www.ufc.com/events"
+
+
+def replay_client(recording, **kwargs) -> HttpClient:
+    client = HttpClient(throttle=HostThrottle(rate=0), max_retries=0)
+    client.session.mount("https://", ReplayAdapter(recording, **kwargs))
+    return client
+
+
+def test_recorded_pages_are_replayed_with_conditional_requests(tmp_path):
+    client = replay_client(Recording(RECORDING))
+    page_cache = PageCache(tmp_path)
+    page = client.get_page(UFC_EVENTS, page_cache)
+    assert page.content == (RECORDING / "ufc_events.html").read_bytes()
+    assert not page.not_modified
+    assert client.get_page(UFC_EVENTS, page_cache).not_modified
+    assert client.get("https://www.ufc.com/not-recorded").status_code == 404
+    api = client.get("https://www.onefc.com/wp-json/public/v2/events/40")
+    assert api.json()["utc_start"] == 1900000000
+
+
+def test_replay_adds_synthetic_latency():
+    client = replay_client(Recording(RECORDING), latency=0.05)
+    start = time.perf_counter()
+    client.get(UFC_EVENTS)
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_live_responses_are_recorded_in_full(monkeypatch, tmp_path):
+    sent = []
+
+    def upstream(self, request, **kwargs):
+        sent.append(dict(request.headers))
+        response = Response()
+        response.status_code = 200
+        response._content = b"<p>live</p>"
+        response.headers["ETag"] = '"1"'
+        response.headers["Set-Cookie"] = "session=1"
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, "send", upstream)
+    client = HttpClient(throttle=HostThrottle(rate=0))
+    client.session.mount("https://", RecordingAdapter(Recording(tmp_path)))
+    page_cache = PageCache(tmp_path / "pages")
+    client.get_page(UFC_EVENTS, page_cache)
+    client.get_page(UFC_EVENTS, page_cache)
+    assert "If-None-Match" not in sent[1]
+
+    recorded = Recording(tmp_path).get(UFC_EVENTS)
+    assert recorded == RecordedResponse(200, b"<p>live</p>", {"ETag": '"1"'})
+
+
+def test_unknown_recording_directory_is_empty(tmp_path):
+    assert len(Recording(tmp_path / "missing")) == 0
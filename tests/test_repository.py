@@ -0,0 +1,118 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.page_cache import CachedPage
+from backend.repository import MIGRATIONS, EventRepository
+from tests.conftest import BEGIN, make_event
+
+
+@pytest.fixture()
+def repository(tmp_path) -> EventRepository:
+    return EventRepository(tmp_path / "events.db")
+
+
+def test_upsert_matches_like_event_store(repository):
+    original = make_event("Main Card - UFC 400")
+    assert repository.upsert("ufc", original) is None
+    moved = make_event("Main Card - UFC 400", hours=5)
+    assert repository.upsert("ufc", moved) == original.uid
+    renamed = make_event("Main Card - UFC 400: Jones vs Aspinall", hours=5)
+    assert repository.upsert("ufc", renamed) == moved.uid
+    repository.upsert("ufc", make_event("Prelims - UFC 400", hours=-2))
+    repository.upsert("onefc", make_event("Main Card - UFC 400"))
+
+    rows = repository.events("ufc")
+    assert [row["name"] for row in rows] == [
+        "Prelims - UFC 400",
+        "Main Card - UFC 400: Jones vs Aspinall",
+    ]
+    assert rows[1]["fragment"] == renamed.serialize()
+    assert repository.count("onefc") == 1
+
+
+def test_revision_moves_with_every_change(repository):
+    assert repository.revision("ufc") == 0
+    event = make_event("Main Card - UFC 400")
+    repository.upsert("ufc", event)
+    assert repository.revision("ufc") == 1
+    with repository.transaction():
+        repository.upsert("ufc", make_event("Prelims - UFC 400", hours=-2))
+        repository.upsert("ufc", make_event("Main Card - UFC 401", hours=24))
+    assert repository.revision("ufc") == 3
+    assert repository.delete("ufc", [event.uid]) == 1
+    assert repository.delete("ufc", ["missing"]) == 0
+    assert repository.revision("ufc") == 4
+    assert repository.revision("onefc") == 0
+
+
+def test_failed_transaction_is_rolled_back(repository):
+    with pytest.raises(RuntimeError):
+        with repository.transaction():
+            repository.upsert("ufc", make_event("Main Card - UFC 400"))
+            raise RuntimeError("scrape failed")
+    assert repository.count("ufc") == 0
+    assert repository.revision("ufc") == 0
+
+
+def test_events_in_date_range(repository):
+    for day in range(5):
+        repository.upsert("ufc", make_event(f"UFC {day}", hours=24 * day))
+    rows = repository.events(
+        "ufc", start=BEGIN + timedelta(days=1), end=BEGIN + timedelta(days=3)
+    )
+    assert [row["name"] for row in rows] == ["UFC 1", "UFC 2"]
+
+
+def test_writes_are_visible_to_other_workers(repository, tmp_path):
+    other_worker = EventRepository(tmp_path / "events.db")
+    repository.upsert("ufc", make_event("Main Card - UFC 400"))
+    assert other_worker.fragments("ufc") == repository.fragments("ufc")
+    assert other_worker.revision("ufc") == 1
+    mode = other_worker.connection.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_scrape_runs(repository):
+    assert repository.last_success("ufc") is None
+    run_id = repository.start_run("ufc")
+    repository.finish_run(run_id, "success", events_count=3)
+    failed = repository.start_run("ufc")
+    repository.finish_run(failed, "failed", error="upstream down")
+    assert [row["status"] for row in repository.runs("ufc")] == ["failed", "success"]
+    assert repository.last_success("ufc") == datetime.fromisoformat(
+        repository.runs("ufc")[1]["finished_at"]
+    )
+
+
+def test_record_page_tracks_changes(repository):
+    url = "https://www.ufc.com/events"
+    repository.record_page("ufc", CachedPage(url, b"<p>one</p>", etag='"1"'))
+    first = repository.page(url)
+    assert first["change_count"] == 0 and first["etag"] == '"1"'
+
+    repository.record_page("ufc", CachedPage(url, b"<p>one</p>", not_modified=True))
+    unchanged = repository.page(url)
+    assert unchanged["change_count"] == 0
+    assert unchanged["changed_at"] == first["changed_at"]
+
+    repository.record_page("ufc", CachedPage(url, b"<p>two</p>", etag='"2"'))
+    changed = repository.page(url)
+    assert changed["change_count"] == 1 and changed["etag"] == '"2"'
+    assert repository.page("https://www.ufc.com/other") is None
+
+
+def test_existing_database_is_migrated(tmp_path):
+    path = tmp_path / "events.db"
+    connection = sqlite3.connect(path)
+    connection.executescript(MIGRATIONS[0])
+    connection.close()
+
+    repository = EventRepository(path)
+    event = make_event("Main Card - UFC 400")
+    repository.upsert("ufc", event, content_hash="abc")
+    assert repository.upsert("ufc", event, content_hash="abc") == event.uid
+    assert repository.revision("ufc") == 1
+    version = repository.connection.execute("PRAGMA user_version").fetchone()[0]
+    assert version == len(MIGRATIONS)
@@ -0,0 +1,104 @@
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from backend.calendar_control import CalendarControl
+from backend.locks import FileLock
+from backend.repository import EventRepository
+from backend.scheduler import RefreshScheduler
+
+
+class FakeCalendar(CalendarControl):
+    calendar_file_name = "fake.ics"
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.calls = 0
+        self.refreshed = threading.Event()
+        super().__init__()
+
+    def get_event_links(self) -> list[str]:
+        return []
+
+    def get_events_from_url(self, url: str) -> list:
+        return []
+
+    def update_calendar(self) -> Path:
+        if not self.time_to_update():
+            return self.file_path
+        self.calls += 1
+        self.refreshed.set()
+        if self.fail:
+            raise RuntimeError("upstream down")
+        self.last_update = datetime.now(tz=self.UTC)
+        return self.write_calendar()
+
+
+@pytest.fixture(autouse=True)
+def calendar_file(tmp_path, monkeypatch) -> Path:
+    monkeypatch.setattr(FakeCalendar, "calendar_file_name", tmp_path / "fake.ics")
+    monkeypatch.setattr(
+        FakeCalendar, "repository", EventRepository(tmp_path / "events.db")
+    )
+    return tmp_path / "fake.ics"
+
+
+def test_refresh_runs_in_background():
+    calendar = FakeCalendar()
+    calendar.last_update = None
+    calendar.refreshed.clear()
+    scheduler = RefreshScheduler({"fake": calendar})
+    scheduler.start()
+    try:
+        assert calendar.refreshed.wait(5), "Background refresh never ran."
+    finally:
+        scheduler.stop(timeout=5)
+    status = scheduler.status()["fake"]
+    assert status["last_success"]
+    assert not status["is_stale"]
+
+
+def test_refresh_if_stale_does_not_wake_fresh_calendar():
+    calendar = FakeCalendar()
+    calendar.refresh()
+    scheduler = RefreshScheduler({"fake": calendar})
+    scheduler.refresh_if_stale("fake")
+    assert not scheduler._wake["fake"].is_set()
+
+
+def test_failed_refresh_keeps_last_update_and_backs_off():
+    calendar = FakeCalendar(fail=True)
+    last_update = datetime.now(tz=calendar.UTC)
+    calendar.last_update = last_update
+    scheduler = RefreshScheduler({"fake": calendar})
+    assert not scheduler.refresh_now("fake")
+    assert calendar.last_update == last_update
+    status = scheduler.status()["fake"]
+    assert status["consecutive_failures"] == 1
+    assert status["last_error"] == "upstream down"
+    assert scheduler.seconds_until_due("fake") > 0
+
+
+def test_refresh_is_single_flight_across_workers(calendar_file):
+    first = FakeCalendar()
+    assert first.refresh() == "refreshed"
+    assert first.calls == 1 and calendar_file.exists()
+
+    second = FakeCalendar()
+    assert second.refresh() == "reloaded"
+    assert second.calls == 0, "Second worker scraped a calendar that was fresh."
+    assert second.get_rendered().body == first.get_rendered().body
+
+    lock = FileLock(calendar_file.with_name("fake.lock"))
+    assert lock.acquire(blocking=False)
+    try:
+        assert first.refresh(force=True) == "busy"
+        scheduler = RefreshScheduler({"fake": first})
+        assert scheduler.refresh_now("fake")
+        assert scheduler.status()["fake"]["last_result"] == "busy"
+        assert 0 < scheduler.seconds_until_due("fake") <= 30
+    finally:
+        lock.release()
+    assert first.refresh(force=True) == "refreshed"
@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+from backend.stats import ServiceStats, StatsEngine
+
+
+def make_engine(tmp_path) -> StatsEngine:
+    return StatsEngine(
+        tmp_path / "scraping_stats.json", tmp_path / "scraping_stats.lock"
+    )
+
+
+def test_snapshot_keeps_stats_shape(tmp_path):
+    engine = make_engine(tmp_path)
+    engine.record("ufc", True, events_count=12, extra={"last_page_fetches": 4})
+    engine.record("ufc", False)
+    ufc = engine.snapshot()["services"]["ufc"]
+    today = date.today().isoformat()
+    assert ufc["daily_results"] == {today: {"success": 1, "failed": 1}}
+    assert ufc["success_rate_30d"] == 50
+    assert ufc["total_attempts_30d"] == 2
+    assert ufc["total_success_30d"] == 1
+    assert len(ufc["daily_success_array"]) == 30
+    assert ufc["daily_success_array"][-1] == {"date": today, "success": False}
+    assert ufc["last_events_count"] == 12
+    assert ufc["last_page_fetches"] == 4
+    assert {"onefc", "backend"} <= set(engine.snapshot()["services"])
+    assert not (tmp_path / "scraping_stats.json").exists(), "Flushed too early."
+
+
+def test_workers_merge_their_counts(tmp_path):
+    first, second = make_engine(tmp_path), make_engine(tmp_path)
+    first.record("onefc", True)
+    second.record("onefc", True)
+    second.record("onefc", False)
+    first.flush()
+    second.flush()
+    first.sync()
+    merged = first.snapshot()["services"]["onefc"]
+    assert merged["total_attempts_30d"] == 3
+    assert merged["total_success_30d"] == 2
+
+
+def test_ring_buffer_expires_old_days():
+    stats = ServiceStats()
+    today = date.today().toordinal()
+    stats.add(today - 40, 5, 0)
+    stats.add(today - 30, 1, 0)
+    stats.add(today, 1, 1)
+    assert stats.total_attempts == 3
+    stats.advance(today + 1)
+    assert stats.total_attempts == 2
+    view = stats.as_dict(today + 1)
+    assert (date.today() - timedelta(days=30)).isoformat() not in view["daily_results"]
+
+
+def test_snapshot_does_no_disk_io(tmp_path, monkeypatch):
+    engine = make_engine(tmp_path)
+    engine.record("ufc", True)
+    engine.flush()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("snapshot touched the stats file")
+
+    monkeypatch.setattr(engine, "_read_file", fail)
+    monkeypatch.setattr(engine, "_write", fail)
+    for _ in range(3):
+        assert engine.snapshot()["services"]["ufc"]["total_attempts_30d"] == 1
+
+
+def test_ticker_records_heartbeat_and_flushes(tmp_path):
+    engine = StatsEngine(
+        tmp_path / "scraping_stats.json",
+        tmp_path / "scraping_stats.lock",
+        flush_interval=0.05,
+    )
+    engine.start(heartbeat_service="backend", heartbeat_interval=60)
+    engine.stop()
+    stored = make_engine(tmp_path)
+    stored.sync()
+    assert stored.snapshot()["services"]["backend"]["total_success_30d"] == 1
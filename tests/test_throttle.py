@@ -0,0 +1,76 @@
+import pytest
+
+from backend import throttle
+from backend.throttle import CircuitBreaker, CircuitOpenError, HostThrottle, TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture()
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(throttle.time, "monotonic", clock)
+    monkeypatch.setattr(throttle.time, "sleep", lambda seconds: None)
+    return clock
+
+
+def test_token_bucket_allows_bursts_then_spaces_requests(clock):
+    bucket = TokenBucket(rate=2, capacity=2)
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+    clock.now += 2
+    assert bucket.reserve() == 0
+    assert TokenBucket(rate=0, capacity=0).reserve() == 0
+
+
+def test_circuit_opens_after_failures_and_recovers_after_cooldown(clock):
+    breaker = CircuitBreaker(threshold=2, cooldown=60)
+    for _ in range(2):
+        breaker.before_request("www.ufc.com")
+        breaker.record(success=False)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("www.ufc.com")
+
+    clock.now += 60
+    breaker.before_request("www.ufc.com")
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("www.ufc.com")
+    breaker.record(success=False)
+    assert breaker.state == CircuitBreaker.OPEN and breaker.opens == 2
+
+    clock.now += 60
+    breaker.before_request("www.ufc.com")
+    breaker.record(success=True)
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+    assert breaker.rejected == 2
+
+
+def test_hosts_are_throttled_independently(clock):
+    host_throttle = HostThrottle(rate=1, burst=1, threshold=1, cooldown=60)
+    assert host_throttle.acquire("https://www.ufc.com/events") == 0
+    assert host_throttle.acquire("https://www.ufc.com/event/1") == 1
+    assert host_throttle.acquire("https://www.onefc.com/events/") == 0
+    host_throttle.record("https://www.ufc.com/event/1", success=False)
+    with pytest.raises(CircuitOpenError):
+        host_throttle.acquire("https://www.ufc.com/event/2")
+
+    status = host_throttle.status()
+    assert status["www.ufc.com"] == {
+        "circuit": "open",
+        "consecutive_failures": 1,
+        "opens": 1,
+        "rejected": 1,
+        "retry_in": 60.0,
+        "requests": 2,
+        "throttled": 1,
+        "throttle_seconds": 1.0,
+        "max_delay": 1.0,
+    }
+    assert status["www.onefc.com"]["circuit"] == "closed"
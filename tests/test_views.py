@@ -0,0 +1,122 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from backend.onefc_calendar import OneFcCalendar
+from backend.views import CalendarQuery, CalendarViews, EventIndex
+
+
+def row(name, begin, description=""):
+    return {
+        "name": name,
+        "begin_at": begin,
+        "description": description,
+        "fragment": f"BEGIN:VEVENT\r\nSUMMARY:{name}\r\nEND:VEVENT",
+    }
+
+
+ROWS = [
+    row(
+        "Prelims - UFC 300",
+        "2025-04-13T22:00:00+00:00",
+        "Fights:\nJosé Aldo vs Jon Smith",
+    ),
+    row(
+        "Main Card - UFC 300",
+        "2025-04-14T02:00:00+00:00",
+        "Fights:\nAlex Pereira vs Jamahal Hill",
+    ),
+    row(
+        "Main Card - UFC 301",
+        "2025-05-04T02:00:00+00:00",
+        "Fights:\nBob Jones vs Jon Doe",
+    ),
+    row("ONE Fight Night 40", "2025-06-01T12:00:00+00:00", "Rodtang vs Jacob Smith"),
+]
+
+
+def test_query_normalizes_arguments():
+    query = CalendarQuery.from_args({"part": "Main-Card", "fighter": " JOSÉ  Aldo"})
+    assert query == CalendarQuery.from_args(
+        {"part": "main card", "fighter": "jose aldo"}
+    )
+    assert query.part == "main card"
+    assert query.fighter == "jose aldo"
+    assert not CalendarQuery.from_args({})
+
+    window = CalendarQuery.from_args({"days": "30"}, today=date(2025, 4, 1))
+    assert window == CalendarQuery.from_args(
+        {"from": "2025-04-01", "to": "2025-04-30"}
+    )
+    assert window.end == datetime(2025, 5, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        {"days": "0"},
+        {"days": "soon"},
+        {"from": "April"},
+        {"from": "2025-05-01", "to": "2025-04-01"},
+    ],
+)
+def test_query_rejects_invalid_arguments(args):
+    with pytest.raises(ValueError):
+        CalendarQuery.from_args(args)
+
+
+def test_index_filters_by_part_fighter_and_date():
+    index = EventIndex(ROWS)
+
+    def search(**args):
+        return index.search(CalendarQuery.from_args(args))
+
+    assert search(part="main-card") == [1, 2]
+    assert search(part="prelims") == [0]
+    assert search(fighter="jose aldo") == [0]
+    assert search(fighter="rodtang") == [3]
+    # Both names are on the card, but not as one fighter
+    assert search(fighter="jon jones") == []
+    assert search(fighter="ufc 300") == [0, 1]
+    assert search(**{"from": "2025-04-14", "to": "2025-05-31"}) == [1, 2]
+    assert search(part="main card", **{"from": "2025-05-01"}) == [2]
+
+
+def test_views_are_cached_until_the_revision_moves():
+    views = CalendarViews(max_entries=1)
+    loads = []
+
+    def rows():
+        loads.append(1)
+        return ROWS
+
+    main_card = CalendarQuery.from_args({"part": "main-card"})
+    rendered = views.get(main_card, 1, rows)
+    assert b"UFC 301" in rendered.body and b"Prelims" not in rendered.body
+    assert views.get(main_card, 1, rows) is rendered
+    assert (views.hits, views.misses, len(loads)) == (1, 1, 1)
+
+    views.get(CalendarQuery.from_args({"part": "prelims"}), 1, rows)
+    assert len(views) == 1, "The least recently used view was not evicted."
+    assert views.get(main_card, 2, rows) is not rendered
+    assert len(loads) == 2
+
+
+def test_calendar_serves_filtered_views(onefc_http):
+    calendar = OneFcCalendar()
+    calendar.refresh()
+
+    rendered = calendar.get_view(CalendarQuery.from_args({"fighter": "ONE 2"}))
+    assert b"SUMMARY:ONE 2" in rendered.body
+    assert b"SUMMARY:ONE 1" not in rendered.body
+    assert calendar.get_view(CalendarQuery()) is calendar.get_rendered()
+
+
+def test_filtered_calendar_route(client):
+    response = client.get("/ufc?part=main-card&days=30")
+    assert response.status_code == 200
+    assert b"BEGIN:VCALENDAR" in response.data
+
+    response = client.get("/ufc?days=never")
+    assert response.status_code == 400
+    assert "days" in response.get_json()["error"]